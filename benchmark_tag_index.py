@@ -0,0 +1,155 @@
+"""
+Compares the memory and build time of the tag type index against the flat dictionary it replaced,
+with no structures expanded, a few dozen expanded and every structure expanded.
+
+Usage: python benchmark_tag_index.py [number of top level tags]
+"""
+import sys
+import time
+import tracemalloc
+
+from tag_index import build_tag_index
+
+
+def make_udt(name, members):
+    return {
+        'name': name,
+        'internal_tags': members,
+        'attributes': list(members),
+    }
+
+
+def make_tags_json(tag_count):
+    """
+    Builds tag definitions shaped like a large machine program: an array of
+    stations with nested axis, recipe and fault structures.
+    """
+    atomic = lambda data_type, array=0: {'tag_type': 'atomic', 'data_type': data_type, 'array': array}
+    struct = lambda data_type, array=0: {'tag_type': 'struct', 'data_type': data_type, 'array': array}
+
+    string = make_udt('STRING', {'LEN': atomic('DINT'), 'DATA': atomic('SINT', 82)})
+    axis = make_udt('AxisData', {
+        'Position': atomic('REAL'), 'Velocity': atomic('REAL'), 'Torque': atomic('REAL'),
+        'Enabled': atomic('BOOL'), 'Homed': atomic('BOOL'), 'Faulted': atomic('BOOL'),
+        'FaultCode': atomic('DINT'), 'Setpoints': atomic('REAL', 10),
+        'ZZZZZZZZZZAxisData0': atomic('SINT'),
+    })
+    recipe = make_udt('RecipeData', {
+        'Name': struct(string), 'Speed': atomic('REAL'), 'Pressure': atomic('REAL'),
+        'Temperature': atomic('REAL'), 'Steps': atomic('DINT', 20),
+    })
+    fault = make_udt('FaultData', {
+        'Active': atomic('BOOL'), 'Code': atomic('DINT'), 'Message': struct(string),
+    })
+    station = make_udt('StationData', {
+        'Axis': struct(axis, 4), 'X': struct(axis), 'Y': struct(axis), 'Z': struct(axis),
+        'Recipe': struct(recipe), 'Faults': struct(fault, 8), 'Count': atomic('DINT'),
+        'CycleTime': atomic('REAL'), 'Running': atomic('BOOL'),
+    })
+
+    tags = {}
+    for i in range(tag_count):
+        if i % 4 == 0:
+            tags[f'Program:Line{i % 10}.Station_{i:05d}'] = {
+                'tag_type': 'struct', 'data_type': station, 'dimensions': [0, 0, 0]}
+        else:
+            tags[f'Station_{i:05d}'] = {
+                'tag_type': 'struct', 'data_type': station, 'dimensions': [0, 0, 0]}
+        tags[f'Counter_{i:05d}'] = {
+            'tag_type': 'atomic', 'data_type': 'DINT', 'dimensions': [10, 0, 0]}
+
+    return tags
+
+
+def legacy_get_tags(data):
+    """
+    The dictionary of dictionaries built for every tag before the tag index.
+    """
+    tag_list = {}
+
+    for tag_name, tag_info in data.items():
+        tag_data_type = tag_info['data_type']
+        tag_dimensions = list(tag_info.get('dimensions', [0, 0, 0]))
+
+        if tag_info['tag_type'] == 'atomic':
+            tag_list[tag_name] = {'data_type': tag_data_type, 'dimensions': tag_dimensions, 'structure': False}
+        else:
+            tag_list[tag_name] = {'data_type': tag_data_type['name'], 'dimensions': tag_dimensions,
+                                  'structure': tag_data_type['name'] != 'STRING'}
+            if tag_data_type['name'] != 'STRING':
+                legacy_extract_children(tag_data_type['internal_tags'], tag_list, tag_name)
+
+    return tag_list
+
+
+def legacy_extract_children(structure, array, name):
+    for child_name, child_info in structure.items():
+        if child_name.startswith('_') or child_name.startswith('ZZZZZZZZZZ'):
+            continue
+
+        full_tag_name = f'{name}.{child_name}'
+        child_data_type = child_info['data_type']
+
+        if child_info['tag_type'] == 'atomic':
+            array[full_tag_name] = {'data_type': child_data_type,
+                                    'dimensions': [child_info.get('array', 0), 0, 0], 'structure': False}
+        else:
+            array[full_tag_name] = {'data_type': child_data_type['name'],
+                                    'dimensions': [child_info.get('array', 0), 0, 0],
+                                    'structure': child_data_type['name'] != 'STRING'}
+            if child_data_type['name'] != 'STRING':
+                legacy_extract_children(child_data_type['internal_tags'], array, full_tag_name)
+
+    return array
+
+
+def measure(build, tags_json):
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = build(tags_json)
+    elapsed = time.perf_counter() - start
+    size, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return result, elapsed, size, peak
+
+
+def build_expanded(tags_json):
+    index = build_tag_index(tags_json)
+    len(index)
+    return index
+
+
+def build_and_touch(tags_json):
+    """
+    Builds the lazy index and looks up a few dozen members, like an operator session.
+    """
+    index = build_tag_index(tags_json)
+    for tag in list(tags_json)[::max(1, len(tags_json) // 40)]:
+        index.children(tag)
+    return index
+
+
+def main():
+    tag_count = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    tags_json = make_tags_json(tag_count)
+
+    legacy, legacy_time, legacy_size, legacy_peak = measure(legacy_get_tags, tags_json)
+    member_count = len(legacy)
+    del legacy
+
+    print(f'{len(tags_json)} tags, {member_count} tags and members')
+    print(f'{"":18}{"build (s)":>12}{"memory (MB)":>14}{"peak (MB)":>12}')
+    print(f'{"dict":18}{legacy_time:12.3f}{legacy_size / 1e6:14.1f}{legacy_peak / 1e6:12.1f}')
+
+    for name, build in (('TagIndex (lazy)', build_tag_index),
+                        ('TagIndex (40 used)', build_and_touch),
+                        ('TagIndex (all)', build_expanded)):
+        index, index_time, index_size, index_peak = measure(build, tags_json)
+        print(f'{name:18}{index_time:12.3f}{index_size / 1e6:14.1f}{index_peak / 1e6:12.1f}')
+
+    assert len(index) == member_count
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,93 @@
+"""
+Compares the throughput of the pure Python YAML loader and dumper against the libyaml ones used by yaml_io,
+on trend results shaped like the ones written by the trend tab.
+
+Usage: python benchmark_yaml.py [number of rows]
+"""
+import io
+import sys
+import time
+import tracemalloc
+
+import yaml
+
+import yaml_io
+
+
+def make_rows(row_count):
+    """
+    Builds trend rows of a DINT, a REAL, a BOOL and a small structure, sampled every 100 ms.
+    """
+    for i in range(row_count):
+        yield {
+            'Trend Duration': i * 100.0,
+            'Counter': i,
+            'Pressure': round(50 + (i % 200) * 0.25, 2),
+            'Running': i % 3 != 0,
+            'Axis': {'Position': i * 0.5, 'Velocity': 12.5, 'Faulted': False},
+        }
+
+
+def measure(run, trace=True):
+    """
+    Times a run, then repeats it with tracemalloc to get the peak memory, which would slow down the timed run.
+    """
+    start = time.perf_counter()
+    result = run()
+    elapsed = time.perf_counter() - start
+    peak = 0
+
+    if trace:
+        tracemalloc.start()
+        run()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+    return result, elapsed, peak
+
+
+def main():
+    row_count = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    rows = list(make_rows(row_count))
+
+    if not yaml_io.LIBYAML:
+        print('PyYAML was built without libyaml, only the pure Python loader and dumper are available')
+
+    def python_dump():
+        return yaml.dump(rows, Dumper=yaml.SafeDumper, default_flow_style=False)
+
+    def libyaml_dump():
+        return yaml_io.dump(rows)
+
+    def libyaml_dump_items():
+        stream = io.StringIO()
+        yaml_io.dump_items(make_rows(row_count), stream)
+        return stream.getvalue()
+
+    text, _, _ = measure(python_dump, trace=False)
+    size = len(text.encode('utf-8'))
+
+    def python_load():
+        return yaml.load(text, Loader=yaml.SafeLoader)
+
+    def libyaml_load():
+        return yaml_io.load(text)
+
+    def libyaml_iter_items():
+        return sum(1 for _ in yaml_io.iter_items(io.StringIO(text)))
+
+    print(f'{row_count} rows, {size / 1e6:.1f} MB of YAML')
+    print(f'{"":22}{"time (s)":>10}{"rows/s":>12}{"MB/s":>8}{"peak (MB)":>12}')
+
+    for name, run in (('dump (Python)', python_dump),
+                      ('dump (libyaml)', libyaml_dump),
+                      ('dump_items (libyaml)', libyaml_dump_items),
+                      ('load (Python)', python_load),
+                      ('load (libyaml)', libyaml_load),
+                      ('iter_items (libyaml)', libyaml_iter_items)):
+        _, elapsed, peak = measure(run)
+        print(f'{name:22}{elapsed:10.2f}{row_count / elapsed:12.0f}{size / 1e6 / elapsed:8.1f}{peak / 1e6:12.1f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,362 @@
+from plc_session import ConnectionLost
+from tag_address import parse_tag_address
+from write_planner import WritePlan
+
+# the smallest CIP connection size, used when the driver does not report one
+DEFAULT_PACKET_SIZE = 500
+
+# bytes used by the multiple service packet and write request around each tag
+WRITE_OVERHEAD = 12
+
+# bytes of packet headers that are not available for requests
+PACKET_OVERHEAD = 40
+
+# bytes used by a value of each data type, other types are estimated from the value
+DATA_SIZES = {
+    'BOOL': 1,
+    'SINT': 1,
+    'USINT': 1,
+    'INT': 2,
+    'UINT': 2,
+    'DINT': 4,
+    'UDINT': 4,
+    'REAL': 4,
+    'LINT': 8,
+    'ULINT': 8,
+    'LREAL': 8,
+    'STRING': 88,
+}
+
+INTEGER_TYPES = {'SINT', 'USINT', 'INT', 'UINT', 'DINT', 'UDINT', 'LINT', 'ULINT'}
+FLOAT_TYPES = {'REAL', 'LREAL'}
+
+
+def to_bool(value):
+    if isinstance(value, str):
+        value = value.strip().lower()
+
+        if value in ('1', 'true'):
+            return True
+        if value in ('0', 'false', ''):
+            return False
+
+        raise ValueError(f'{value} is not a BOOL')
+
+    return bool(value)
+
+
+def to_int(value):
+    if isinstance(value, str):
+        value = value.strip()
+
+        if value.lower() in ('true', 'false'):
+            return int(value.lower() == 'true')
+
+        if value.lower().lstrip('+-').startswith('0x'):
+            return int(value, 16)
+
+        try:
+            return int(value)
+        except ValueError:
+            # decimal or exponent input, e.g. 1.0 or 1e3, is only accepted for whole numbers
+            value = float(value)
+
+    if isinstance(value, float) and not value.is_integer():
+        raise ValueError(f'{value} is not an integer')
+
+    return int(value)
+
+
+def to_float(value):
+    return float(value.strip() if isinstance(value, str) else value)
+
+
+def to_string(value):
+    return '' if value is None else str(value)
+
+
+def guess(value):
+    """
+    Converts a value of a tag that is not in the tag index, numbers and booleans are recognized, anything else is kept as is.
+    """
+    if not isinstance(value, str):
+        return value
+
+    text = value.strip()
+
+    if text.lower() in ('true', 'false'):
+        return text.lower() == 'true'
+
+    for convert in (int, float):
+        try:
+            return convert(text)
+        except ValueError:
+            pass
+
+    return value
+
+
+def converter(data_type):
+    """
+    Gets the function that converts a value read from a file to a data type.
+
+    Args:
+        data_type (str): The data type of the tag, None if unknown.
+
+    Returns:
+        callable: The converter, it raises ValueError if the value cannot be converted.
+    """
+    if data_type == 'BOOL':
+        return to_bool
+    elif data_type in INTEGER_TYPES:
+        return to_int
+    elif data_type in FLOAT_TYPES:
+        return to_float
+    elif data_type == 'STRING':
+        return to_string
+
+    return guess
+
+
+class ValueCoercer:
+    """
+    Converts values read from a file to the data type of their tag.
+
+    The converter of each tag is looked up in the tag index once and kept,
+    so a file that writes every element of a large array only looks the
+    array up once.
+
+    Attributes:
+    - tag_types (TagIndex): the tag type index
+    - converters (dict): the converter and data type of each tag already seen, keyed by the tag without indexes
+    """
+
+    def __init__(self, tag_types):
+        self.tag_types = tag_types
+        self.converters = {}
+
+    def lookup(self, tag):
+        """
+        Gets the converter and data type of a tag.
+
+        Args:
+            tag (str): The tag address.
+
+        Returns:
+            tuple: The converter and the data type, None if the tag is not in the index.
+        """
+        base = parse_tag_address(tag).base
+        found = self.converters.get(base)
+
+        if found is None:
+            data_type = None
+
+            if self.tag_types is not None and base in self.tag_types:
+                data_type = self.tag_types[base].data_type
+
+            found = self.converters[base] = (converter(data_type), data_type)
+
+        return found
+
+    def __call__(self, tag, value):
+        """
+        Converts a value to the data type of its tag.
+
+        Args:
+            tag (str): The tag address.
+            value (any): The value read from the file.
+
+        Returns:
+            tuple: The converted value and the data type of the tag.
+
+        Raises:
+            ValueError: If the value cannot be converted.
+        """
+        convert, data_type = self.lookup(tag)
+
+        try:
+            return convert(value), data_type
+        except (TypeError, ValueError):
+            raise ValueError(f'Could not convert {value} to {data_type}') from None
+
+
+def write_size(tag, value, data_type):
+    """
+    Estimates the bytes a tag write adds to a request packet.
+
+    Args:
+        tag (str): The tag address.
+        value (any): The value to write.
+        data_type (str): The data type of the tag, None if unknown.
+
+    Returns:
+        int: The estimated size in bytes.
+    """
+    # each member of the path is a symbolic segment padded to an even length, each index adds a few bytes
+    path = len(tag) + 2 * (tag.count('.') + tag.count('[') + 1)
+
+    if isinstance(value, (list, tuple)):
+        size = sum(write_size('', item, data_type) - WRITE_OVERHEAD - 2 for item in value)
+    elif data_type in DATA_SIZES:
+        size = DATA_SIZES[data_type]
+    elif isinstance(value, str):
+        size = len(value) + 4
+    elif isinstance(value, dict):
+        size = len(str(value))
+    else:
+        size = 8
+
+    return WRITE_OVERHEAD + path + size
+
+
+def usable_packet_size(plc):
+    """
+    Gets the bytes available for requests in one packet to a PLC.
+
+    Args:
+        plc (SessionManager): The connection.
+
+    Returns:
+        int: The usable packet size.
+    """
+    try:
+        size = plc.connection_size or DEFAULT_PACKET_SIZE
+    except Exception:
+        size = DEFAULT_PACKET_SIZE
+
+    return size - PACKET_OVERHEAD
+
+
+class BulkWriter:
+    """
+    Writes a stream of (tag, value) pairs to the PLC in packet sized batches.
+
+    Values are converted to the data type of their tag as they are read,
+    and pairs are collected until the next one would not fit in a request
+    packet, then written. Only one batch is held in memory, so files with
+    tens of thousands of values can be written. Values that cannot be
+    converted or that the PLC rejects are reported per tag and do not stop
+    the rest of the file from being written.
+
+    Attributes:
+    - plc (SessionManager): the connection to write to
+    - tag_types (TagIndex): the tag type index
+    - coerce (ValueCoercer): converts the values to the tag data types
+    - packet_size (int): the bytes available for requests in a packet
+    - written (int): the number of values written
+    - failures (list): the (tag, error) of each value that was not written
+    """
+
+    def __init__(self, plc, tag_types, packet_size=None):
+        self.plc = plc
+        self.tag_types = tag_types
+        self.coerce = ValueCoercer(tag_types)
+        self.packet_size = packet_size if packet_size is not None else usable_packet_size(plc)
+        self.written = 0
+        self.failures = []
+
+    def batches(self, items):
+        """
+        Converts the values and groups them into packet sized batches.
+
+        Args:
+            items (iterable): The (tag, value) pairs.
+
+        Yields:
+            list: The (tag, value) pairs of a batch.
+        """
+        batch = []
+        size = 0
+        next_element = None
+
+        for tag, value in items:
+            tag = tag.strip()
+
+            try:
+                value, data_type = self.coerce(tag, value)
+            except ValueError as e:
+                self.failures.append((tag, str(e)))
+                continue
+
+            item_size = write_size(tag, value, data_type)
+
+            # the next element of an array is merged into the same ranged write, only its value is added,
+            # except for BOOL arrays which are written element by element
+            address = parse_tag_address(tag)
+            element = (address.array_name, address.start_index) if len(address.indices) == 1 else None
+
+            if element is not None and element == next_element and not address.has_count and data_type != 'BOOL':
+                item_size = DATA_SIZES.get(data_type, item_size)
+
+            if batch and size + item_size > self.packet_size:
+                yield batch
+                batch = []
+                size = 0
+                item_size = write_size(tag, value, data_type)
+
+            next_element = (element[0], element[1] + address.element_count) if element is not None else None
+
+            batch.append((tag, value))
+            size += item_size
+
+        if batch:
+            yield batch
+
+    def write_batch(self, batch):
+        """
+        Writes a batch, merging consecutive array elements and whole structures, recording the tags that failed.
+
+        Args:
+            batch (list): The (tag, value) pairs.
+
+        Returns:
+            int: The number of values written.
+        """
+        try:
+            results = WritePlan(batch, self.tag_types).write(self.plc)
+        except ConnectionLost as e:
+            self.failures.extend((tag, str(e)) for tag, _ in batch)
+            raise
+        except Exception as e:
+            self.failures.extend((tag, str(e)) for tag, _ in batch)
+            return 0
+
+        written = 0
+
+        for (tag, _), result in zip(batch, results):
+            if result.error:
+                self.failures.append((tag, result.error))
+            else:
+                written += 1
+
+        self.written += written
+
+        return written
+
+    def write(self, items, progress=None, keep_running=None):
+        """
+        Writes every pair.
+
+        Args:
+            items (iterable): The (tag, value) pairs, read lazily.
+            progress (callable, optional): Called after each batch with the batch number, the values written in the batch and the values written so far.
+            keep_running (callable, optional): Checked before each batch, writing stops when it returns False.
+
+        Returns:
+            tuple: The number of values written and the list of (tag, error) failures.
+        """
+        for number, batch in enumerate(self.batches(items), start=1):
+            if keep_running is not None and not keep_running():
+                break
+
+            try:
+                written = self.write_batch(batch)
+            except ConnectionLost:
+                self.failures.append(('', 'Connection lost, the rest of the values were not written'))
+                break
+
+            if progress is not None:
+                progress(number, written, self.written)
+
+        return self.written, self.failures
+
@@ -0,0 +1,78 @@
+from bisect import bisect_left
+
+import numpy as np
+
+
+def lttb(x, y, threshold):
+    """
+    Downsamples a line with the Largest-Triangle-Three-Buckets algorithm.
+
+    The first and last points are kept and the points between them are
+    split into threshold - 2 buckets. From each bucket the point that makes
+    the largest triangle with the point kept from the bucket before and the
+    average of the bucket after is kept, so peaks and steps survive the
+    downsampling where plain decimation would drop them.
+
+    Args:
+        x (numpy.ndarray): The x values, sorted.
+        y (numpy.ndarray): The y values.
+        threshold (int): The number of points to keep.
+
+    Returns:
+        tuple: The x and y values of the kept points, the given arrays if there are no more than threshold points.
+    """
+    count = len(x)
+
+    if threshold >= count or threshold < 3:
+        return x, y
+
+    # bucket edges of the points between the first and the last
+    edges = np.linspace(1, count - 1, threshold - 1).astype(np.intp)
+
+    # the average of each bucket, with the last point as the bucket after the last bucket
+    sizes = np.diff(edges)
+    average_x = np.append(np.add.reduceat(x[1:count - 1], edges[:-1] - 1) / sizes, x[-1])
+    average_y = np.append(np.add.reduceat(y[1:count - 1], edges[:-1] - 1) / sizes, y[-1])
+
+    kept = np.empty(threshold, dtype=np.intp)
+    kept[0] = 0
+    kept[-1] = count - 1
+    previous = 0
+
+    for bucket in range(threshold - 2):
+        start, end = edges[bucket], edges[bucket + 1]
+        bucket_x = x[start:end]
+        bucket_y = y[start:end]
+
+        # twice the triangle area, the constant factor does not change which point is largest
+        area = np.abs((x[previous] - average_x[bucket + 1]) * (bucket_y - y[previous])
+                      - (x[previous] - bucket_x) * (average_y[bucket + 1] - y[previous]))
+
+        previous = start + int(area.argmax())
+        kept[bucket + 1] = previous
+
+    return x[kept], y[kept]
+
+
+def nearest(x, value):
+    """
+    Finds the point closest to an x value with a bisect over the sorted x values.
+
+    Args:
+        x (numpy.ndarray or list): The x values, sorted.
+        value (float): The x value to look for.
+
+    Returns:
+        int: The index of the closest point, None if there are no points.
+    """
+    if len(x) == 0:
+        return None
+
+    index = bisect_left(x, value)
+
+    if index == len(x):
+        return index - 1
+    if index > 0 and value - x[index - 1] <= x[index] - value:
+        return index - 1
+
+    return index
@@ -1,6 +1,7 @@
-import yaml
 import csv
 
+import yaml_io
+
 def serialize_to_yaml(data, **kwargs):
     """
     Serialize data to YAML format and write to a file.
@@ -17,9 +18,7 @@ def serialize_to_yaml(data, **kwargs):
 
     with open(yaml_file, 'w') as f:
 
-        data = data_to_dict(data)
-
-        yaml.safe_dump(data, f, default_flow_style=False)
+        yaml_io.dump_items(data_to_dict(data), f)
 
 
 def data_to_dict(data):
@@ -49,10 +48,10 @@ def deserialize_from_yaml(yaml_name):
     Returns:
     - tag_values (list of dict): A list of dictionaries containing tag-value pairs.
     """
+    tag_values = []
+
     with open(yaml_name, 'r') as f:
-        yaml_data = yaml.safe_load(f)
-        tag_values = []
-        for item in yaml_data:
+        for item in yaml_io.iter_items(f):
             for key, value in item.items():
                 tag_values.append({'tag': key, 'value': value})
 
@@ -115,13 +114,38 @@ def process_csv_read(csv_file):
     Returns:
         list: A list of processed data.
     """
-    with open(csv_file, 'r') as f:
-        reader = csv.DictReader(f)
-        processed_data = []
-        for row in reader:
-            processed_data.append(
-                (row['tag'], row['value']))
-    return processed_data
+    return list(iter_csv_read(csv_file))
+
+
+def iter_csv_read(csv_file):
+    """
+    Reads the tag and value pairs of a CSV file one row at a time.
+
+    Args:
+        csv_file (str): The name of the CSV file to read.
+
+    Yields:
+        tuple: The tag and the value as text.
+    """
+    with open(csv_file, 'r', newline='') as f:
+        for row in csv.DictReader(f):
+            yield row['tag'], row['value']
+
+
+def iter_yaml_read(yaml_name):
+    """
+    Reads the tag and value pairs of a YAML file one item at a time, structures and lists are split into their members.
+
+    Args:
+        yaml_name (str): The name of the YAML file to read.
+
+    Yields:
+        tuple: The tag of each member and its value.
+    """
+    with open(yaml_name, 'r') as f:
+        for item in yaml_io.iter_items(f):
+            for key, value in item.items():
+                yield from iterate_value(key, value, [])
 
 
 def crawl_and_format(obj, name, data, start_index=0):
@@ -171,12 +195,9 @@ def flatten_dict(d, parent_key='', sep='.'):
 
 
 def yaml_to_csv(yaml_file, csv_file):
+    # each item is converted as it is read so the whole file is never loaded
     with open(yaml_file, 'r') as jf:
-        data = yaml.safe_load(jf)
-
-    flattened_data = [flatten_dict(item) for item in data]
-
-    write_to_csv(flattened_data, csv_file)
+        write_to_csv((flatten_dict(item) for item in yaml_io.iter_items(jf)), csv_file)
 
 
 def write_to_csv(data, csv_file):
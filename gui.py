@@ -1,13 +1,30 @@
 import sys
+import os
 import input_checks
 import time
 from functools import wraps
 from pycomm3 import LogixDriver
 import file_helper
+import tag_cache
+from plc_session import PLCSession, ConnectionLost
+from session_manager import SessionManager
+from tag_address import parse_tag_address, parse_tag_list, split_tag_list, is_valid_format
+from tag_index import build_tag_index, split_tag_path
+from read_planner import ReadPlan
+from bulk_write import BulkWriter
+from write_planner import WritePlan
+from scheduler import FixedRateScheduler
+from trend_groups import TrendGroups, parse_trend_groups, MIN_TICK_MS
+from recording import RecordingFilter, StepHolder, hold_steps, parse_recording_policies
+from trend_store import TrendStore, DEFAULT_CAPACITY
+from collections import deque
+from trend_writer import TrendWriter
+from downsample import lttb, nearest
+from trend_file import TrendFileWriter, TrendFileReader, export_csv, EXTENSION as TREND_FILE_EXTENSION
 # from offline_read import LogixDriver
-from PySide6.QtCharts import QChart, QChartView, QLineSeries
+from PySide6.QtCharts import QChart, QChartView, QLineSeries, QValueAxis
 import qdarktheme
-from PySide6.QtCore import Qt, QThread, Signal, QObject, QTimer, QRegularExpression, QSettings, QPointF
+from PySide6.QtCore import Qt, QThread, QTimer, Signal, QObject, QRegularExpression, QSettings, QPointF, QAbstractItemModel, QModelIndex
 from PySide6.QtWidgets import (
     QApplication,
     QCheckBox,
@@ -21,7 +38,7 @@ from PySide6.QtWidgets import (
     QTabWidget,
     QRadioButton,
     QWidget,
-    QTextEdit,
+    QPlainTextEdit,
     QLabel,
     QMessageBox,
     QComboBox,
@@ -29,6 +46,7 @@ from PySide6.QtWidgets import (
     QListView,
     QButtonGroup,
     QTreeWidget,
+    QTreeView,
     QTreeWidgetItem,
     QTextBrowser,
     QCompleter,
@@ -37,14 +55,17 @@ from PySide6.QtWidgets import (
     QGraphicsTextItem,
     QInputDialog,
     QDialog,
+    QProgressBar,
+    QScrollBar,
+    QSpinBox,
 
 )
 from PySide6 import QtGui
 from PySide6.QtGui import QRegularExpressionValidator, QTextCursor, QPixmap, QMouseEvent, QPainter, QStandardItem
-import yaml
-import re
+import yaml_io
 import datetime
 import matplotlib.pyplot as plt
+import numpy as np
 import csv
 from globals import *
 
@@ -87,12 +108,10 @@ def check_tag_decorator(func):
         ok_to_proceed = True
 
         # split tag name(s) into a list
-        tags = [name.strip() for name in tags.split(',')]
+        for address in parse_tag_list(tags):
+            tag = address.tag
 
-        for tag in tags:
-            formatted_tag = re.sub(r"(\[\d+\])|(\{\d+\})", "", tag)
-
-            if formatted_tag in tag_types:
+            if address.base in tag_types:
                 if not input_checks.check_tag_range(tag, tag_types):
                     ok_to_proceed = False
                     window.print_results(
@@ -128,22 +147,24 @@ def connect_to_plc(ip, connect_button, main_window):
         plc = None
         main_window.stop_plc_connection_check()
     else:
-        # Open a new connection
-        plc = LogixDriver(ip)
+        # Open a new connection, the tag list is loaded from the cache when possible
+        plc = SessionManager()
+        session = PLCSession(LogixDriver(ip, init_tags=False))
 
         try:
-            plc.open()
+            session.open()
 
-            if plc.connected:
-                tag_types = get_tags_from_plc(plc)
+            if session.connected:
+                with session.lock:
+                    plc.add('', session, load_tags(session.driver))
+                tag_types = plc.tag_types
 
                 main_window.set_autocomplete()
                 connect_button.setText("Disconnect")
-                plc.get_plc_name()
                 main_window.menu_status.setText(
                     f"Connected to {plc.get_plc_name()} at {ip}")
 
-            main_window.start_plc_connection_check()
+            main_window.start_plc_connection_check(ip)
             main_window.enable_buttons()
             main_window.showConnectedDialog()
         except:
@@ -152,10 +173,141 @@ def connect_to_plc(ip, connect_button, main_window):
                 f"Error: Could not connect to PLC at {ip}.<br>", 'red')
 
 
+def load_tags(plc, refresh=False):
+    """
+    Loads the tag definitions for a connected PLC, using the on-disk cache when the PLC is unchanged.
+
+    Args:
+        plc (LogixDriver): An open LogixDriver instance created with init_tags=False.
+        refresh (bool, optional): Ignore the cache and upload the tag list from the PLC. Defaults to False.
+
+    Returns:
+        TagIndex: The tag type index.
+    """
+    identity = tag_cache.get_plc_identity(plc)
+
+    cache = None if refresh else tag_cache.load_tag_cache(identity)
+
+    if cache is not None:
+        try:
+            plc._tags, plc._data_types = tag_cache.restore_driver_tags(
+                cache['tags_json'])
+            return build_tag_index(plc._tags)
+        except Exception as e:
+            print(f"Error restoring cached tags, uploading from PLC: {e}")
+
+    plc.get_tag_list(program='*')
+    tags_json = plc.tags_json
+
+    tag_cache.save_tag_cache(identity, tags_json)
+
+    return get_tags_from_plc(tags_json)
+
+
+def refresh_tags(main_window):
+    """
+    Discards the cached tag definitions of the connected PLC and uploads them again.
+
+    Args:
+        main_window (MainWindow): The main window object.
+
+    Returns:
+        None
+    """
+    global tag_types
+
+    if check_plc_connection(plc, main_window):
+        try:
+            with plc.lock:
+                plc.indexes[''] = load_tags(plc.driver, refresh=True)
+            main_window.set_autocomplete()
+            main_window.print_results(
+                f"Reloaded {len(tag_types.children())} tags from PLC.<br>")
+        except Exception as e:
+            main_window.print_results(
+                f"Error: Could not reload tags from PLC: {e}<br>", 'red')
+    else:
+        main_window.showNotConnectedDialog()
+
+
+def add_plc(main_window):
+    """
+    Connects to another PLC so its tags can be used as plcname::Tag alongside the main PLC.
+
+    Args:
+        main_window (MainWindow): The main window object.
+
+    Returns:
+        None
+    """
+    if not check_plc_connection(plc, main_window):
+        main_window.showNotConnectedDialog()
+        return
+
+    name, ok = QInputDialog.getText(
+        main_window, 'Add PLC', 'Name to address the PLC with (Name::Tag)')
+
+    if not ok:
+        return
+
+    name = name.strip()
+
+    if not is_valid_format(f'{name}::Tag'):
+        main_window.print_results(f"Error: {name} is not a valid PLC name.<br>", 'red')
+        return
+
+    ip, ok = QInputDialog.getText(main_window, 'Add PLC', f'IP address of {name}')
+
+    if not ok:
+        return
+
+    session = PLCSession(LogixDriver(ip.strip(), init_tags=False))
+
+    try:
+        session.open()
+
+        with session.lock:
+            plc.add(name, session, load_tags(session.driver))
+
+        main_window.print_results(
+            f"Connected to {session.info.get('name')} at {ip.strip()} as {name}.<br>")
+    except Exception as e:
+        session.close()
+        main_window.print_results(
+            f"Error: Could not connect to PLC at {ip.strip()}: {e}<br>", 'red')
+
+
+def remove_plc(main_window):
+    """
+    Disconnects one of the PLCs added with add_plc.
+
+    Args:
+        main_window (MainWindow): The main window object.
+
+    Returns:
+        None
+    """
+    names = plc.names() if plc is not None else []
+
+    if not names:
+        main_window.print_results("No other PLCs are connected.<br>")
+        return
+
+    name, ok = QInputDialog.getItem(
+        main_window, 'Remove PLC', 'PLC to disconnect', names, 0, False)
+
+    if ok:
+        plc.remove(name)
+        main_window.print_results(f"Disconnected from {name}.<br>")
+
+
 def check_plc_connection(plc, main_window):
     """
     Check if the PLC is connected and return True if it is, False otherwise.
 
+    The connection state is kept up to date by the ConnectionSupervisor so
+    this does not send a request to the PLC.
+
     Args:
         plc (PLC): The PLC object to check connection for.
         main_window (MainWindow): The main window object.
@@ -163,21 +315,9 @@ def check_plc_connection(plc, main_window):
     Returns:
         bool: True if the PLC is connected, False otherwise.
     """
-    if plc != None:
-        if plc.connected:
-            try:
-                plc.get_plc_name()
-                return True
-            except:
-                main_window.stop_plc_connection_check()
-                plc = None
-                main_window.print_results(
-                    f"Lost connection to PLC.<br>", 'red')
-                return False
-        else:
-            main_window.stop_plc_connection_check()
-            
-            return False
+    if plc is not None and plc.connected:
+        return main_window.connection_supervisor.connected
+
     return False
 
 
@@ -199,10 +339,10 @@ def read_tag(tag_names, plc, result_window, **kwargs):
     """
 
     tree_data = []
-    pattern = r'\{[^}]*\}'
 
     # split tag name(s) into a list
-    tag_names = [name.strip() for name in tag_names.split(',')]
+    addresses = parse_tag_list(tag_names)
+    tag_names = [address.tag for address in addresses]
 
     store_to_file = kwargs.get('store_to_file', False)
     file_selection = kwargs.get('file_selection', 0)
@@ -221,29 +361,22 @@ def read_tag(tag_names, plc, result_window, **kwargs):
             result_window.print_results(
                 f'Reading Tags: {", " .join(tag_names)}<br>')
 
-        # get the tag data from the PLC
-        read_result = plc.read(*tag_names)
+        # get the tag data from the PLC, overlapping reads are merged into fewer requests
+        read_results = ReadPlan(tag_names, tag_types).read(plc)
+        read_result = read_results if len(read_results) > 1 else read_results[0]
 
         # Loop through each tag in the list
-        if len(tag_names) == 1:
-            if read_result.error is None:
-                entry_tag = tag_names[0]
+        for address, result in zip(addresses, read_results):
+            if result.error is None:
+                start_index = address.start_index
 
-                match = re.search(r'\[(\d+)\]', entry_tag)
-                if match:
-                    start_index = int(match.group(1))
+                # arrays read with {} are listed by element under the array name
+                if address.has_count:
+                    tag_name_formatted = address.array_name
                 else:
-                    start_index = 0
+                    tag_name_formatted = address.tag
 
-                # check if tag has {}
-                if re.search(r'\{[^}]*\}', entry_tag):
-                    tag_name_formatted = re.sub(pattern, '', entry_tag)
-                    tag_name_formatted = re.sub(
-                        r'\[\d+\]', '', tag_name_formatted)
-                else:
-                    tag_name_formatted = entry_tag
-
-                value = read_result.value
+                value = result.value
                 tag_data.append(file_helper.crawl_and_format(
                     value, tag_name_formatted, {}, start_index))
                 if isinstance(value, list):
@@ -253,58 +386,7 @@ def read_tag(tag_names, plc, result_window, **kwargs):
                 else:
                     tree_data.append({tag_name_formatted: value})
             else:
-                result_window.print_results(f"Error: {read_result.error}")
-
-        else:
-
-            for i, tag in enumerate(tag_names):
-                if read_result[i].error is None:
-                    entry_tag = tag_names[i]
-
-                    match = re.search(r'\[(\d+)\]', entry_tag)
-                    if match:
-                        start_index = int(match.group(1))
-                    else:
-                        start_index = 0
-
-                    if re.search(r'\{[^}]*\}', entry_tag):
-                        tag_name_formatted = re.sub(pattern, '', entry_tag)
-                        tag_name_formatted = re.sub(
-                            r'\[\d+\]', '', tag_name_formatted)
-                    else:
-                        tag_name_formatted = entry_tag
-
-                    value = read_result[i].value
-                    tag_data.append(file_helper.crawl_and_format(
-                        value, tag_name_formatted, {}, start_index))
-                    if isinstance(value, list):
-                        for y, v in enumerate(value):
-
-                            # check if tag has {}
-                            if re.search(r'\{[^}]*\}', entry_tag):
-                                tag_name_formatted = re.sub(
-                                    pattern, '', entry_tag)
-                                tag_name_formatted = re.sub(
-                                    r'\[\d+\]', '', tag_name_formatted)
-                            else:
-                                tag_name_formatted = entry_tag
-
-                            tree_data.append(
-                                {f'{tag_name_formatted}[{y + start_index}]': v})
-                    else:
-                        # check if tag has {}
-                        if re.search(r'\{[^}]*\}', tag_names[i]):
-                            tag_name_formatted = re.sub(
-                                pattern, '', tag_names[i])
-                            tag_name_formatted = re.sub(
-                                r'\[\d+\]', '', tag_name_formatted)
-                        else:
-                            tag_name_formatted = entry_tag
-
-                        tree_data.append({tag_name_formatted: value})
-                else:
-                    result_window.print_results(
-                        f"Error: {read_result[i].error}", 'red')
+                result_window.print_results(f"Error: {result.error}", 'red')
 
         if store_to_file:
             if file_selection == 0:
@@ -317,15 +399,12 @@ def read_tag(tag_names, plc, result_window, **kwargs):
             result_window.print_results(
                 f'Successfully wrote to file: {file_name}<br>')
 
-        result_window.add_to_tree(
-            tree_data, result_window.tree.invisibleRootItem(), True)
+        result_window.add_to_tree(tree_data, True)
 
         results_to_print = ''
 
         for result in tag_data:
             for tag, value in result.items():
-
-                tag = re.sub(pattern, '', tag)
                 results_to_print += f'{tag} = {value}<br>'
 
         result_window.print_results(results_to_print, 'yellow')
@@ -334,85 +413,23 @@ def read_tag(tag_names, plc, result_window, **kwargs):
         print(f"Error in read_tags: {e}")
 
 
-def get_tags_from_plc(plc):
-    tag_list = {}
+def get_tags_from_plc(tags_json):
+    """
+    Builds the tag index from the tag definitions uploaded from the PLC.
+
+    Args:
+        tags_json (dict): The tag definitions from LogixDriver.tags_json.
 
+    Returns:
+        TagIndex or None: The tag index or None if it could not be built.
+    """
     try:
-        data = plc.tags_json
-
-        for tag_name, tag_info in data.items():
-            tag_data_type = tag_info['data_type']
-            tag_type = tag_info['tag_type']
-            tag_dimensions = tag_info.get('dimensions', [0, 0, 0])
-
-            if tag_type == 'atomic':
-                tag_list[tag_name] = {
-                    'data_type': tag_data_type,
-                    'dimensions': tag_dimensions,
-                    'structure': False
-                }
-            elif tag_type == 'struct':
-                # Store the parent structure
-                if tag_data_type['name'] == 'STRING':
-                    tag_list[tag_name] = {
-                        'data_type': tag_data_type['name'],
-                        'dimensions': tag_dimensions,
-                        'structure': False
-                    }
-                else:
-                    tag_list[tag_name] = {
-                        'data_type': tag_data_type['name'],
-                        'dimensions': tag_dimensions,
-                        'structure': True
-                    }
-                # Recursively store children
-                if tag_data_type['name'] != 'STRING':
-                    tag_list = extract_child_data_types(
-                        tag_data_type['internal_tags'], tag_list, tag_name)
-        return tag_list
+        return build_tag_index(tags_json)
     except Exception as e:
         print(f"Error in get_tags_from_plc function: {e}")
         return None
 
 
-def extract_child_data_types(structure, array, name):
-    for child_name, child_info in structure.items():
-        child_data_type = child_info['data_type']
-        child_tag_type = child_info['tag_type']
-        child_array_length = child_info.get('array', 0)
-
-        if child_name.startswith('_') or child_name.startswith('ZZZZZZZZZZ'):
-            continue
-
-        full_tag_name = f'{name}.{child_name}'
-        if child_tag_type == 'atomic':
-            array[full_tag_name] = {
-                'data_type': child_data_type,
-                'dimensions': [child_array_length, 0, 0],
-                'structure': False
-            }
-        elif child_tag_type == 'struct':
-            # Store the structure itself
-            if child_data_type['name'] == 'STRING':
-                array[full_tag_name] = {
-                    'data_type': child_data_type['name'],
-                    'dimensions': [child_array_length, 0, 0],
-                    'structure': False
-                }
-            else:
-                array[full_tag_name] = {
-                    'data_type': child_data_type['name'],
-                    'dimensions': [child_array_length, 0, 0],
-                    'structure': True
-                }
-            # Recursively store children
-            if child_data_type['name'] != 'STRING':
-                array = extract_child_data_types(
-                    child_data_type['internal_tags'], array, full_tag_name)
-
-    return array
-
-
 def set_data_type(value, tag):
     """
     Converts the given value to the data type specified by the tag.
@@ -431,8 +448,8 @@ def set_data_type(value, tag):
         # Check if the tag is in the tag_list
         if tag in tag_types:
             # Get the data type from the tag_list
-            type = tag_types[tag]['data_type']
-            dimensions = tag_types[tag]['dimensions']
+            type = tag_types[tag].data_type
+            dimensions = tag_types[tag].dimensions
 
             # Set the data type based on the type from the tag_list
             if type == 'STRING':
@@ -505,7 +522,7 @@ def write_tag(tags, values, main_window, plc, **kwargs):
         plc (LogixDriver): An existing LogixDriver instance to use instead of creating a new one.
 
     Returns:
-        bool: True if the write was successful, False otherwise.
+        list: A pycomm3 Tag for each tag written when writing from the tag input, None otherwise.
     """
 
     file_enabled = kwargs.get('file_enabled', False)
@@ -517,7 +534,7 @@ def write_tag(tags, values, main_window, plc, **kwargs):
 
     if not file_enabled:
         if not isinstance(tags, list):
-            tags = [t.strip() for t in tags.split(',')]
+            tags = split_tag_list(tags)
 
         if type(values) == str:
             values = [t.strip() for t in values.split(',')]
@@ -532,125 +549,99 @@ def write_tag(tags, values, main_window, plc, **kwargs):
             write_data.append((tag, values[i]))
 
         try:
-            write_result = plc.write(*write_data)
-            if write_result:
-                main_window.print_results(
-                    f"Successfully wrote to tags to PLC<br>")
-            else:
-                main_window.print_results(f'{write_result.error}<br>', 'red')
-        except Exception as e:
-            print(f"Error in write_tag: {e}")
-            return None
-    else:
-        if file_selection == 0:
-            tags = file_helper.process_yaml_read(file_helper.deserialize_from_yaml(file_name))
-        elif file_selection == 1:
-            _tags = file_helper.process_csv_read(file_name)
-
-            tags = []
-
-            # format tag values to their proper values
-            for i in _tags:
-                if '[' in i[0] and ']' in i[0]:
-                    # strip string[x] to string
-                    tag = re.sub(r'\[\d+\]', '', i[0])
-                    tags.append((i[0], set_data_type(i[1], tag)))
-                else:
-                    tags.append((i[0], set_data_type(i[1], i[0])))
+            write_results = WritePlan(write_data, tag_types).write(plc)
+            failed = [result for result in write_results if result.error]
 
-        try:
-            write_result = plc.write(*tags)
-            if write_result:
+            if not failed:
                 main_window.print_results(
                     f"Successfully wrote to tags to PLC<br>")
             else:
-                main_window.print_results(f'{write_result.error}<br>', 'red')
+                for result in failed:
+                    main_window.print_results(f'{result.tag}: {result.error}<br>', 'red')
         except Exception as e:
-            main_window.print_results(f"Error in write_tag: {e}")
+            main_window.print_results(f"Error in write_tag: {e}<br>", 'red')
             return None
 
+        return write_results
+    else:
+        # the file is written on the file writer thread so the GUI keeps running
+        main_window.start_file_write(file_name, file_selection)
 
-def process_trend_data(tag, results, timestamps, single_tag, file_enabled, file_name, file_format):
-    """
-    Process trend data and write it to a YAML file if enabled.
-
-    Args:
-        tag (str): The tag name.
-        results (list): The list of trend results.
-        timestamps (list): The list of timestamps.
-        single_tag (bool): Whether the tag is a single tag or a list of tags.
-        yaml_enabled (bool): Whether to write the trend data to a YAML file.
-        yaml_file (str): The YAML file to write the trend data to.
 
-    Returns:
-        None
+class ConnectionSupervisor(QObject):
     """
-    if file_enabled:
-        if file_name == '':
-            if file_format == 0:
-                file_name = f'{tag}_trend_results.yaml'
-            else:
-                file_name = f'{tag}_trend_results.csv'
+    A class to check the PLC connection in the background.
 
-        if type(results[0]) == dict:
-            # get keys from first dict in list
-            keys = ['Trend Duration']
-            keys = keys + [key for key in results[0].keys()]
-        else:
-            keys = ['Trend Duration', 'Value']
+    The PLC name is requested at a fixed interval over a seperate
+    connection so the check never waits on, or gets in the way of, requests
+    made on the main connection. The result is cached for button handlers
+    and changes are signalled to the GUI.
 
-        with open(file_name, 'w') as f:
+    Attributes:
+    -----------
+    state_changed : Signal
+        A signal emitted with the new state when the connection is lost or restored.
+    latency_updated : Signal
+        A signal emitted with the round trip time in milliseconds of each check.
+    finished : Signal
+        A signal to indicate that the thread has finished.
+    """
 
-            if file_format == 0:
+    state_changed = Signal(bool)
+    latency_updated = Signal(float)
+    finished = Signal()
 
-                yaml_data = []
+    def __init__(self):
+        super(ConnectionSupervisor, self).__init__()
+        self.ip = None
+        self.interval = 5000
+        self.running = False
+        self.connected = False
+        self.latency = None
 
-                if single_tag:
-                    for i, val in enumerate(results):
-                        data = {}
+    def set_connected(self, connected):
+        if connected != self.connected:
+            self.connected = connected
+            self.state_changed.emit(connected)
 
-                        td = timestamps[i]
-                        data['Trend Duration'] = td
-                        data[tag.strip()] = val
+    def run(self):
+        """
+        Checks the connection every interval until stopped.
+        """
+        driver = LogixDriver(self.ip, init_tags=False)
 
-                        yaml_data.append(data)
-                else:
-                    formatted_tag = [t.strip() for t in tag.split(',')]
+        while self.running:
+            start = time.perf_counter()
 
-                    # loop through the length of the trend results
-                    for i in range(len(results[0])):
-                        data = {}
-                        td = timestamps[i]
-                        data['Trend Duration'] = td
+            try:
+                if not driver.connected:
+                    driver.open()
 
-                        for y in range(len(results)):
-                            data[formatted_tag[y]] = results[y][i]
+                driver.get_plc_name()
 
-                        yaml_data.append(data)
+                self.latency = (time.perf_counter() - start) * 1000
+                self.latency_updated.emit(self.latency)
+                self.set_connected(True)
+            except Exception as e:
+                print(f"Error in ConnectionSupervisor: {e}")
+                driver.close()
+                self.latency = None
+                self.set_connected(False)
 
-                yaml.safe_dump(yaml_data, f, default_flow_style=False)
-            else:
-                writer = csv.DictWriter(
-                    f, fieldnames=keys, lineterminator='\n')
-                writer.writeheader()
-
-                if single_tag:
-                    for i, val in enumerate(results):
-                        writer.writerow(
-                            {'Trend Duration': timestamps[i], 'Value': val})
-                else:
-                    formatted_tag = [t.strip() for t in tag.split(',')]
+            # wait in short steps so stopping does not wait a full interval
+            wait_until = start + self.interval / 1000
+            while self.running and time.perf_counter() < wait_until:
+                QThread.msleep(100)
 
-                    # loop through the length of the trend results
-                    for i in range(len(results[0])):
-                        data = {}
-                        td = timestamps[i]
-                        data['Trend Duration'] = td
+        driver.close()
+        self.finished.emit()
 
-                        for y in range(len(results)):
-                            data[formatted_tag[y]] = results[y][i]
+    def stop(self):
+        """
+        Stops checking the connection.
+        """
+        self.running = False
 
-                        writer.writerow(data)
 
 class Actioner(QObject):
     """
@@ -669,8 +660,8 @@ class Actioner(QObject):
 
     update = Signal(str, str, bool)
     finished = Signal()
-    read_tag = Signal(str, LogixDriver, QTextBrowser)
-    write_tag = Signal(str, str, LogixDriver, QTextBrowser)
+    read_tag = Signal(str, SessionManager, QTextBrowser)
+    write_tag = Signal(str, str, SessionManager, QTextBrowser)
     toggle_button = Signal()
 
     def __init__(self):
@@ -798,6 +789,129 @@ class Actioner(QObject):
         self.running = False
         self.finished.emit()
 
+class StructureReader(QObject):
+    """
+    A class to read the values shown in the write tree without blocking the GUI.
+
+    Each tag is read with one request, an element count (Recipe[0]{200})
+    is read as one ranged read and split into its elements afterwards.
+
+    Attributes:
+    - update (Signal): a signal for updating the GUI with messages
+    - progress (Signal): a signal with the number of tags read and the number of tags
+    - structure_read (Signal): a signal with the (tag, value) of each item to add to the tree
+    - finished (Signal): a signal for indicating that the read has finished
+    - tags (str): the comma-separated tags to read
+    - plc (SessionManager): the connection to read with
+    """
+
+    update = Signal(str, str)
+    progress = Signal(int, int)
+    structure_read = Signal(object)
+    finished = Signal()
+
+    def __init__(self):
+        super(StructureReader, self).__init__()
+        self.tags = ''
+        self.plc = None
+
+    def run(self):
+        """
+        Reads every tag and emits the values for the tree.
+        """
+        addresses = parse_tag_list(self.tags)
+        items = []
+
+        for count, address in enumerate(addresses, start=1):
+            tag = address.tag
+
+            if address.base not in tag_types:
+                self.update.emit(f'{tag} is not a valid tag<br>', 'red')
+                self.progress.emit(count, len(addresses))
+                continue
+
+            try:
+                result = self.plc.read(tag)
+            except Exception as e:
+                print(f"Error in StructureReader: {e}")
+                self.update.emit(f'Error reading {tag}: {e}<br>', 'red')
+                break
+
+            if result.error:
+                self.update.emit(f'Error reading {tag}: {result.error}<br>', 'red')
+            elif address.has_count:
+                values = result.value if isinstance(result.value, list) else [result.value]
+                items.extend((address.element(i), value) for i, value in enumerate(values))
+            else:
+                items.append((tag, result.value))
+
+            self.progress.emit(count, len(addresses))
+
+        self.structure_read.emit(items)
+        self.finished.emit()
+
+
+class FileWriter(QObject):
+    """
+    A class to write the tag values of a file to the PLC without blocking the GUI.
+
+    The file is read, converted and written a packet at a time by a
+    BulkWriter, the result of each batch and the values that failed are
+    sent to the GUI as messages.
+
+    Attributes:
+    - update (Signal): a signal for updating the GUI with messages
+    - finished (Signal): a signal for indicating that the write has finished
+    - file_name (str): the file to write
+    - file_selection (int): 0 for a YAML file, 1 for a CSV file
+    - plc (SessionManager): the connection to write with
+    - running (bool): False to stop before the next batch
+    """
+
+    update = Signal(str, str)
+    finished = Signal()
+
+    def __init__(self):
+        super(FileWriter, self).__init__()
+        self.file_name = ''
+        self.file_selection = 0
+        self.plc = None
+        self.running = False
+
+    def run(self):
+        """
+        Writes every value of the file and reports the result.
+        """
+        if self.file_selection == 0:
+            tags = file_helper.iter_yaml_read(self.file_name)
+        else:
+            tags = file_helper.iter_csv_read(self.file_name)
+
+        def progress(batch, batch_written, total_written):
+            self.update.emit(f"Batch {batch}: wrote {batch_written} values ({total_written} total)<br>", 'white')
+
+        try:
+            writer = BulkWriter(self.plc, tag_types)
+            written, failures = writer.write(tags, progress, lambda: self.running)
+        except Exception as e:
+            print(f"Error in FileWriter: {e}")
+            self.update.emit(f"Error in write_tag: {e}<br>", 'red')
+            self.finished.emit()
+            return
+
+        # a file full of bad values would flood the console, the rest are only counted
+        for tag, error in failures[:100]:
+            self.update.emit(f"{tag}: {error}<br>" if tag else f"{error}<br>", 'red')
+
+        if failures:
+            self.update.emit(f"Wrote {written} values to PLC, {len(failures)} failed<br>", 'red')
+        else:
+            self.update.emit(f"Successfully wrote {written} values to PLC<br>", 'white')
+
+        self.running = False
+        self.finished.emit()
+
+
 class Trender(QObject):
     """
     A class to read and update PLC tags and emit signals for GUI updates.
@@ -807,7 +921,7 @@ class Trender(QObject):
     update : Signal
         A signal to update the GUI with a message.
     update_trend_data : Signal
-        A signal to update the GUI with the trend data.
+        A signal that new samples are waiting in deltas.
     finished : Signal
         A signal to indicate that the thread has finished.
 
@@ -820,9 +934,9 @@ class Trender(QObject):
     """
 
     update = Signal(str, str)
-    update_trend_data = Signal(list, list)
+    update_trend_data = Signal()
     finished = Signal()
-    add_to_tree = Signal(dict, QTreeWidgetItem)
+    add_to_tree = Signal(dict)
 
     def __init__(self):
         super(Trender, self).__init__()
@@ -830,27 +944,60 @@ class Trender(QObject):
         self.ip = None
         self.tags = None
         self.interval = 1
-        self.results = []
-        self.timestamps = []
+        self.store = None
+        self.deltas = deque()
+        self.file_enabled = False
+        self.file_name = ''
+        self.file_format = 0
+        self.writer = None
+        self.capacity = DEFAULT_CAPACITY
         self.first_pass = True
         self.single_tag = True
         self.plc = None
         self.tag_data = []
         self.main_window = None
         self.formatted_tags = None
+        self.groups = ''
+        self.trend_groups = None
+        self.policies = ''
+        self.recording = None
+        self.catch_up = False
+        self.scheduler = None
 
     def run(self):
         """
         A method to start the thread and read PLC tags.
         """
-        start_time = datetime.datetime.now()
-
         self.first_pass = True
-        self.results = []
-        self.timestamps = []
 
         # Convert tag input to a list
-        self.formatted_tags = [t.strip() for t in self.tags.split(',')]
+        self.formatted_tags = split_tag_list(self.tags)
+
+        # the tags of the tag input are read at the trend interval and each trend group at its own period
+        self.trend_groups = TrendGroups(
+            [(self.formatted_tags, self.interval / 1000)] + parse_trend_groups(self.groups), tag_types)
+        self.formatted_tags = self.trend_groups.tags
+
+        for group_tags, period, adjusted in self.trend_groups.adjusted:
+            self.update.emit(
+                f'Trend period of {", ".join(group_tags)} changed from {period:g} s to {adjusted:g} s, '
+                f'the trend cannot tick faster than every {MIN_TICK_MS / 1000:g} s<br>', 'red')
+
+        self.recording = RecordingFilter(self.formatted_tags, parse_recording_policies(self.policies))
+
+        # samples are taken on a fixed grid so read and formatting time does not add to the interval
+        self.scheduler = FixedRateScheduler(self.trend_groups.period, self.catch_up)
+
+        if self.store is not None:
+            self.store.close()
+
+        self.store = TrendStore(
+            self.formatted_tags,
+            [input_checks.get_tag_type(tag, tag_types) for tag in self.formatted_tags],
+            self.capacity,
+            recording=None if self.recording.records_all else self.recording.describe())
+
+        self.writer = self.open_writer() if self.file_enabled else None
 
         try:
             self.plc = plc
@@ -859,24 +1006,46 @@ class Trender(QObject):
 
         self.update.emit('Starting Trend...<br>', 'white')
 
-        while self.running:
+        while self.running and self.scheduler.wait(lambda: self.running):
+
+            # the groups due on this tick are read with one merged request
+            due = self.trend_groups.due(self.scheduler.tick)
+
+            if not due:
+                continue
 
             self.tag_data = []
+            timestamp = self.scheduler.elapsed() * 1000
+            read_plan, columns = self.trend_groups.plan(due)
 
             try:
-                result = self.plc.read(*self.formatted_tags)
-
-                if not isinstance(result, list):
-                    result = [result]
+                result = read_plan.read(self.plc)
 
                 if self.first_pass:
                     if len(result) > 1:
                         self.single_tag = False
 
-                    for i in range(len(result)):
-                        self.results.append([])
-
                     self.first_pass = False
+
+                # tags of groups that were not due are missing from the sample
+                values = [None] * len(self.formatted_tags)
+                read = [False] * len(self.formatted_tags)
+
+                for column, r in zip(columns, result):
+                    values[column] = r.value
+                    read[column] = True
+
+                # values left out by the recording policies are not stored, shown or written
+                if not self.recording.records_all:
+                    recorded = self.recording.apply(timestamp, values, read)
+
+                    if recorded is None:
+                        continue
+
+                    values, read = recorded
+                    result = [r for column, r in zip(columns, result) if read[column]]
+                    columns = [column for column in columns if read[column]]
+
                 self.update.emit(
                     f'Timestamp: {datetime.datetime.now().strftime("%I:%M:%S:%f %p")}<br>', 'white')
 
@@ -885,71 +1054,191 @@ class Trender(QObject):
                         result[0].value, self.formatted_tags[0], {})
                     for tag, value in self.tag_data.items():
                         self.update.emit(f'{tag} = {value}', 'yellow')
-                    self.results[0].append(result[0].value)
                     self.add_to_tree.emit(
-                        {self.formatted_tags[0]: result[0].value}, self.main_window.tree.invisibleRootItem())
+                        {self.formatted_tags[0]: result[0].value})
                     self.update.emit('', 'white')
                 else:
-                    for i, r in enumerate(result):
+                    for column, r in zip(columns, result):
                         self.tag_data.append(file_helper.crawl_and_format(
-                            r.value, self.formatted_tags[i], {}))
-                        self.results[i].append(r.value)
+                            r.value, self.formatted_tags[column], {}))
 
                     self.add_to_tree.emit(
-                        {self.formatted_tags[i]: r.value}, self.main_window.tree.invisibleRootItem())
+                        {self.formatted_tags[column]: r.value for column, r in zip(columns, result)})
 
-                    for result in self.tag_data:
-                        for tag, value in result.items():
+                    for tag_values in self.tag_data:
+                        for tag, value in tag_values.items():
                             self.update.emit(f'{tag} = {value}', 'yellow')
 
                     self.update.emit('', 'white')
 
-                self.timestamps.append(
-                    (datetime.datetime.now() - start_time).total_seconds() * 1000)
-
-                self.update_trend_data.emit(self.results, self.timestamps)
+                self.record(timestamp, values, read)
+            except ConnectionLost as e:
+                print(f"Error in Trender: {e}")
+                self.mark_gap(timestamp)
+                self.update.emit(
+                    'Lost connection to PLC, trend paused until it is restored...<br>', 'red')
+
+                # the read is made again once the connection is back
+                if self.plc.reconnect(lambda: self.running):
+                    self.update.emit('Connection to PLC restored, trend resumed.<br>', 'white')
+                    self.scheduler.skip_missed()
+                elif self.running:
+                    # the connection was closed, there is no PLC left to read from
+                    self.update.emit('Disconnected from PLC, trend stopped.<br>', 'red')
+                    self.stop()
             except Exception as e:
                 print(f"Error in Trender: {e}")
 
-            QThread.msleep(self.interval)
+        self.flush_held()
 
-    def stop(self):
+        if self.writer is not None:
+            self.writer.close()
+            self.update.emit(f'Trend written to {", ".join(self.writer.files)}<br>', 'white')
+
+        stats = self.scheduler.stats()
+        self.update.emit(
+            f"Trend timing: {stats['samples']} samples, {stats['overruns']} overruns, "
+            f"{stats['dropped']} skipped, jitter mean {stats['jitter_mean_ms']:.1f} ms, "
+            f"std dev {stats['jitter_stdev_ms']:.1f} ms, max {stats['jitter_max_ms']:.1f} ms<br>", 'white')
+
+    def mark_gap(self, timestamp):
         """
-        A method to stop the thread.
+        Adds an empty sample for every tag so the lost connection shows as a gap in the trend data.
+
+        Args:
+            timestamp (float): The time of the failed read in milliseconds since the trend was started.
         """
-        self.running = False
-        self.finished.emit()
+        if self.first_pass:
+            return
 
+        self.flush_held()
+        self.store.append_gap(timestamp)
+        self.publish()
 
-class Monitorer(QObject):
-    """
-    A class for monitoring PLC tags and writing to them.
+        if self.writer is not None:
+            self.writer.write(timestamp, [None] * len(self.formatted_tags))
 
-    Attributes:
-    - update (Signal): a signal for updating the GUI with messages
-    - update_trend_data (Signal): a signal for updating the GUI with trend data
-    - finished (Signal): a signal for indicating that the monitoring has finished
-    - tags_to_read_write (str): a comma-separated string of tags to read or write to
-    - values_to_write (str): a comma-separated string of values to write to the tags
-    - read_selected (bool): a flag indicating whether read is selected
-    - write_selected (bool): a flag indicating whether write is selected
-    - hold (bool): a flag indicating whether the tag value is being held
-    - first_event (bool): a flag indicating whether this is the first event
-    - previous_timestamp (datetime): the timestamp of the previous event
-    - yaml_data (list): a list of YAML data
-    - running (bool): a flag indicating whether the monitoring is running
-    - ip (str): the IP address of the PLC
-    - value (str): the value of the tag being monitored
-    - tag (str): the name of the tag being monitored
-    - interval (int): the interval between reads in milliseconds
-    - first_pass (bool): a flag indicating whether this is the first pass
-    - single_tag (bool): a flag indicating whether only one tag is being monitored
-    - plc (LogixDriver): a driver for communicating with the PLC
-    - read_write_tag_list (list): a list of tags to read or write to
-    """
+        # values are not held across the gap
+        self.recording.reset()
+
+    def record(self, timestamp, values, read):
+        """
+        Stores a sample, queues it for the GUI and writes it to the trend file.
+
+        Args:
+            timestamp (float): The time of the sample in milliseconds.
+            values (list): The value of each tag, None where it is missing.
+            read (list): False for each tag that is missing from the sample.
+        """
+        self.store.append(timestamp, values, read)
+        self.publish()
+
+        if self.writer is not None:
+            files = len(self.writer.files)
+            self.writer.write(timestamp, values)
+
+            # a new file starts with the next value of every tag so it can be read on its own
+            if files and len(self.writer.files) > files:
+                self.recording.reset()
+
+    def flush_held(self):
+        """
+        Records the last values left out by the recording policies, so the trend ends on the values last read.
+        """
+        held = self.recording.flush() if self.recording is not None else None
+
+        if held is not None:
+            self.record(*held)
+
+    def open_writer(self):
+        """
+        Opens the file the trend samples are written to as they are taken.
+
+        Returns:
+            TrendWriter or TrendFileWriter or None: The writer or None if the file could not be opened.
+        """
+        file_name = self.file_name
+
+        if self.file_format == 2:
+            file_name = os.path.splitext(file_name)[0] or f'{self.tags}_trend_results'
+            file_name += TREND_FILE_EXTENSION
+
+            try:
+                return TrendFileWriter(file_name, self.formatted_tags, self.store.data_types,
+                                       recording=None if self.recording.records_all else self.recording.describe())
+            except OSError as e:
+                self.update.emit(f'Error: Could not open {file_name}: {e}<br>', 'red')
+                return None
+
+        if file_name == '':
+            if self.file_format == 0:
+                file_name = f'{self.tags}_trend_results.yaml'
+            else:
+                file_name = f'{self.tags}_trend_results.csv'
+
+        if len(self.formatted_tags) > 1:
+            columns = self.formatted_tags
+        elif self.file_format == 0:
+            columns = [self.tags.strip()]
+        else:
+            columns = ['Value']
+
+        try:
+            return TrendWriter(file_name, columns, self.file_format)
+        except OSError as e:
+            self.update.emit(f'Error: Could not open {file_name}: {e}<br>', 'red')
+            return None
+
+    def publish(self):
+        """
+        Queues the newest sample for the GUI.
+
+        Only the new row is sent, and the GUI is only signalled when the
+        queue was empty, it takes every waiting sample when it handles the
+        signal.
+        """
+        self.deltas.append(self.store.delta(len(self.store) - 1))
+
+        if len(self.deltas) == 1:
+            self.update_trend_data.emit()
+
+    def stop(self):
+        """
+        A method to stop the thread.
+        """
+        self.running = False
+        self.finished.emit()
+
+
+class Monitorer(QObject):
+    """
+    A class for monitoring PLC tags and writing to them.
+
+    Attributes:
+    - update (Signal): a signal for updating the GUI with messages
+    - update_trend_data (Signal): a signal for updating the GUI with trend data
+    - finished (Signal): a signal for indicating that the monitoring has finished
+    - tags_to_read_write (str): a comma-separated string of tags to read or write to
+    - values_to_write (str): a comma-separated string of values to write to the tags
+    - read_selected (bool): a flag indicating whether read is selected
+    - write_selected (bool): a flag indicating whether write is selected
+    - hold (bool): a flag indicating whether the tag value is being held
+    - first_event (bool): a flag indicating whether this is the first event
+    - previous_timestamp (datetime): the timestamp of the previous event
+    - yaml_data (list): a list of YAML data
+    - running (bool): a flag indicating whether the monitoring is running
+    - ip (str): the IP address of the PLC
+    - value (str): the value of the tag being monitored
+    - tag (str): the name of the tag being monitored
+    - interval (int): the interval between reads in milliseconds
+    - first_pass (bool): a flag indicating whether this is the first pass
+    - single_tag (bool): a flag indicating whether only one tag is being monitored
+    - plc (LogixDriver): a driver for communicating with the PLC
+    - read_write_tag_list (list): a list of tags to read or write to
+    """
 
     update = Signal(str, str)
-    add_to_tree = Signal(dict, QTreeWidgetItem)
+    add_to_tree = Signal(dict)
     update_trend_data = Signal(list, list)
     finished = Signal()
 
@@ -975,6 +1264,7 @@ class Monitorer(QObject):
         self.single_tag = True
         self.plc = None
         self.read_write_tag_list = None
+        self.read_plan = None
         self.read_once = True
         self.read_time = None
         self.read_loop_enabled = False
@@ -991,8 +1281,8 @@ class Monitorer(QObject):
         self.read_loop_enabled = False
 
         if self.tags_to_read_write != None:
-            self.read_write_tag_list = [
-                t.strip() for t in self.tags_to_read_write.split(',')]
+            self.read_write_tag_list = split_tag_list(self.tags_to_read_write)
+            self.read_plan = ReadPlan(self.read_write_tag_list, tag_types)
 
         self.update.emit('Starting Monitor...<br>', 'white')
 
@@ -1006,8 +1296,7 @@ class Monitorer(QObject):
 
                 if read_total_time <= self.read_time:
                     try:
-                        read_event_results = plc.read(
-                            *self.read_write_tag_list)
+                        read_event_results = self.read_plan.read(self.plc)
 
                         # if there were muliple tags in the read event
                         if type(read_event_results) is list:
@@ -1018,7 +1307,7 @@ class Monitorer(QObject):
                                     f'{self.read_write_tag_list[i]} = {tag_result.value}', 'yellow')
 
                                 self.add_to_tree.emit(
-                                    {self.read_write_tag_list[i]: tag_result.value}, self.main_window.tree.invisibleRootItem())
+                                    {self.read_write_tag_list[i]: tag_result.value})
 
                             self.update.emit('', 'white')
                         else:
@@ -1028,12 +1317,16 @@ class Monitorer(QObject):
                                 f'{self.read_write_tag_list[0]} = {read_event_results.value}', 'yellow')
 
                             self.add_to_tree.emit(
-                                {self.read_write_tag_list[0]: read_event_results.value}, self.main_window.tree.invisibleRootItem())
+                                {self.read_write_tag_list[0]: read_event_results.value})
 
                         self.update.emit('', 'white')
 
                         self.yaml_data.append(yaml_temp)
 
+                    except ConnectionLost as e:
+                        print(f"Error in monitorer: {e}")
+                        self.wait_for_connection()
+                        continue
                     except Exception as e:
                         print(f"Error in monitorer: {e}")
                 else:
@@ -1043,7 +1336,7 @@ class Monitorer(QObject):
                     result = self.plc.read(self.tag)
 
                     self.add_to_tree.emit(
-                        {self.tag: result.value}, self.main_window.tree.invisibleRootItem())
+                        {self.tag: result.value})
 
                     if result.value == self.value and self.hold == False:
 
@@ -1071,8 +1364,7 @@ class Monitorer(QObject):
                             yaml_temp['Time Since Last Event'] = time_since_last_event
 
                         if self.read_write_tag_list != None and self.read_selected:
-                            read_event_results = plc.read(
-                                *self.read_write_tag_list)
+                            read_event_results = self.read_plan.read(self.plc)
 
                             # if there were muliple tags in the read event
                             if type(read_event_results) is list:
@@ -1083,7 +1375,7 @@ class Monitorer(QObject):
                                         f'{self.read_write_tag_list[i]} = {tag_result.value}', 'yellow')
 
                                     self.add_to_tree.emit(
-                                        {self.read_write_tag_list[i]: tag_result.value}, self.main_window.tree.invisibleRootItem())
+                                        {self.read_write_tag_list[i]: tag_result.value})
 
                                 self.update.emit('', 'white')
                             else:
@@ -1093,288 +1385,991 @@ class Monitorer(QObject):
                                     f'{self.read_write_tag_list[0]} = {read_event_results.value}', 'yellow')
                                 self.update.emit('', 'white')
 
-                                self.add_to_tree.emit(
-                                    {self.read_write_tag_list[0]: read_event_results.value}, self.main_window.tree.invisibleRootItem())
+                                self.add_to_tree.emit(
+                                    {self.read_write_tag_list[0]: read_event_results.value})
+
+                            if not self.read_once:
+                                self.read_loop_enabled = True
+                                self.read_time_timestamp_start = datetime.datetime.now()
+
+                        elif self.read_write_tag_list != None and self.write_selected:
+
+                            tag_write_data = []
+
+                            for i, value in enumerate([t.strip() for t in self.values_to_write.split(',')]):
+                                tag_write_data.append(
+                                    (self.read_write_tag_list[i], set_data_type(value, self.tags_to_read_write[i])))
+
+                            self.plc.write(*tag_write_data)
+                            self.update.emit(
+                                f'Successfully wrote to tags: {self.tags_to_read_write}<br>', 'white')
+
+                        self.yaml_data.append(yaml_temp)
+
+                    if result.value != self.value:
+                        self.hold = False
+
+                except ConnectionLost as e:
+                    print(f"Error in monitorer: {e}")
+                    self.wait_for_connection()
+                    continue
+                except Exception as e:
+                    print(f"Error in monitorer: {e}")
+
+            QThread.msleep(self.interval)
+
+    def wait_for_connection(self):
+        """
+        Pauses monitoring until the connection to the PLC is restored.
+
+        The outage is recorded in the event data and the timing of the next
+        event starts over, so no time is measured across the gap.
+        """
+        lost_at = datetime.datetime.fromtimestamp(self.plc.lost_at or time.time())
+
+        self.update.emit(
+            'Lost connection to PLC, monitor paused until it is restored...<br>', 'red')
+
+        if not self.plc.reconnect(lambda: self.running):
+            if self.running:
+                # the connection was closed, there is no PLC left to read from
+                self.update.emit('Disconnected from PLC, monitor stopped.<br>', 'red')
+                self.stop()
+
+            return
+
+        outage = (datetime.datetime.now() - lost_at).total_seconds()
+
+        self.yaml_data.append({
+            'Timestamp': lost_at.strftime("%I:%M:%S:%f %p"),
+            'Time Since Last Event': f'Connection lost for {outage:.1f} s',
+        })
+
+        self.first_event = True
+        self.hold = False
+        self.update.emit('Connection to PLC restored, monitor resumed.<br>', 'white')
+
+    def stop(self):
+        """
+        Stops the monitoring process.
+        """
+        self.running = False
+        self.finished.emit()
+
+
+class AboutWindow(QWidget):
+    """
+    This "window" is a QWidget. If it has no parent, it
+    will appear as a free-floating window as we want.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.setWindowTitle("About")
+        layout = QVBoxLayout()
+        self.name_label = QLabel("PLC Tag Utility")
+        self.version_label = QLabel("Version 1.0")
+        self.author_label = QLabel("Created by: Parker Mojsiejenko")
+        self.description_label = QLabel(
+            "This app is a bridge between you Allen Bradley PLC and your PC. It has many features including reading and writing tags, trending tags, and monitoring tags for changes. It can also read and write to files in YAML and CSV format.")
+        self.description_label.setWordWrap(True)
+        self.about_label = QLabel(
+            "This project relies on the pycomm3 library made by ottowayi for communicating with Allen-Bradley PLCs and would not be possible without it.")
+        self.name_label.setAlignment(Qt.AlignCenter)
+        self.version_label.setAlignment(Qt.AlignCenter)
+        self.author_label.setAlignment(Qt.AlignCenter)
+        self.about_label.setAlignment(Qt.AlignCenter)
+        self.description_label.setAlignment(Qt.AlignCenter)
+        self.name_label.setFont(QtGui.QFont("Arial", 20))
+        layout.addWidget(self.name_label)
+        layout.addWidget(self.version_label)
+        layout.addWidget(self.author_label)
+        layout.addWidget(self.about_label)
+        layout.addWidget(self.description_label)
+        self.setLayout(layout)
+
+
+class HelpWindow(QWidget):
+    """
+    This "window" is a QWidget. If it has no parent, it
+    will appear as a free-floating window as we want.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.setWindowTitle("Help")
+
+        layout = QVBoxLayout()
+
+        self.text_browser = QTextBrowser()
+        text = '<h1>PLC Tag Utility Help</h1>\
+            <p>This app is a bridge between your Allen Bradley PLC and PC. It can read tags, write to tags, trend tags, and monitor tags for changes with the ability to read and write tags when the monitored tag reads a set value.</p>\
+            <h2>Getting Started</h2>\
+            <p>First, you need to connect to your PLC. To do this, enter your IP address and click the "Connect" button in the top left corner of the app.</p>\
+            <h2>General Infomation</h2>\
+            <p>When entering tags to interface with, you may enter more than one but they must be seperated by a comma. If the tag is an array, you can read the entire array or a portion of it if you format the tag correctly.</p>\
+            <ul>\
+            <li>Tag_Name[Index] - Reads the tag at the specified index</li>\
+            <li>Tag_Name[starting position]{{number of tags to read in array}} - Reads the specified number of tags starting at the specified index</li>\
+            <li>Tag_Name.Child_Tag - Reads just the UDTs child tag</li>\
+            </ul>\
+            <p>If you omit the [Index] or {{number of tags to read in array}} from an array tag. The index will be assumed to be [0] and the number of tags to read will be assumed to be 1 only.</p>\
+            <p>When writing to multiple tags, you must also seperate the values with commas.</p>\
+            <h2>Reading and Writing to Files</h2>\
+            <p>Tag results can be stored in a YAML or CSV file if you select the "Store To File" checkbox. The format in the drop down to the right of this is the file format it will be saved in.</p>\
+            <p>When reading from a file, the file must be in YAML or CSV format and the format must be selected in the drop down to the right of the "Read From File" checkbox. A good way to ensure you have the file formatted correctly is to first read the tags and store the results to a file and then edit that file with your changes. This ensures that there are no issues with the formatting when reading from it.</p>\
+            <h2>Trending Tags</h2>\
+            <p>To trend tags, enter the tags you want to trend in the "Tags" field and click the "Trend" button. During or after the trend, you can look at a plot of the values by clicking "Show Trend Plot". This will open a window where you can select the tags to trend if you have more then one. The results will be stored to a file if the option is selected.</p>\
+            <h2>Monitoring Tags</h2>\
+            <p>Monitoring tags is a good way to watch for a tag to be a certain value. Enter the tag to moniotor and the value to look for and when the tag reads equals your value, the timestamp will be logged.</p>\
+            <p>When the tag equals your inputted value, you can enable an option to read or write to other tags. This can be helpful if you want to monitor for a certain fault bit to be high and then reset it by writing a 0 to the tag or get the values of other tags. You can read tags once or for a time period after the monitor event triggers.</p>\
+            <h2>Notes</h2>\
+            <p>This app was developed as a side project and there will be bugs from time to time. If you find a bug, please report it to me so I can fix it. I am also open to suggestions for new features.</p>\
+            <p>Thanks for using my app!</p>'\
+
+
+        self.text_browser.setOpenExternalLinks(True)
+        self.text_browser.setHtml(text)
+
+        # self.text_browser.setLineWrapMode(QTextEdit.NoWrap)
+        self.text_browser.setReadOnly(True)
+        self.text_browser.setAlignment(Qt.AlignCenter)
+
+        layout.addWidget(self.text_browser)
+        self.setLayout(layout)
+
+
+class PlotWindow(QWidget):
+    """
+    This "window" is a QWidget. If it has no parent, it
+    will appear as a free-floating window as we want.
+    """
+
+    def __init__(self, store, main_window):
+        super().__init__()
+
+        self.store = store
+        self.tags = store.tags
+        self.main_window = main_window
+        self.checkboxes = []
+
+        self.layout = QVBoxLayout()
+        self.group_box = QGroupBox("Tags")
+        self.group_box.setLayout(QVBoxLayout())
+
+        self.plot_button = QPushButton("Plot")
+
+        # a running trend is shown as a strip chart of the last minute by default
+        self.window_input = QSpinBox()
+        self.window_input.setRange(0, 86400)
+        self.window_input.setSuffix(" s")
+        self.window_input.setSpecialValueText("Whole trend")
+        self.window_input.setValue(60 if store is main_window.trender.store and main_window.trender.running else 0)
+        self.window_input.setToolTip(
+            "Only the last seconds of the trend are shown and kept in memory, use the scroll bar under the chart to look back.")
+
+        # the data types come from the store so trend files can be plotted without a PLC connection
+        for tag, data_type in zip(self.tags, store.data_types):
+            checkbox = QCheckBox(tag, self)
+
+            if data_type in ['DINT', 'INT', 'SINT', 'REAL', 'BOOL', 'LREAL', 'LINT', 'UINT', 'USINT', 'UDINT']:
+                checkbox.setEnabled(True)
+            else:
+                checkbox.setEnabled(False)
+
+            self.checkboxes.append(checkbox)
+            self.group_box.layout().addWidget(checkbox)
+            # self.layout.addWidget(checkbox)
+
+        self.layout.addWidget(self.group_box)
+        self.layout.addWidget(QLabel("Rolling window"))
+        self.layout.addWidget(self.window_input)
+        self.layout.addWidget(self.plot_button)
+
+        self.plot_button.clicked.connect(self.get_checked_tags)
+        self.setLayout(self.layout)
+
+    def show_chart_window(self, store, columns):
+        window = self.window_input.value() * 1000 or None
+        self.main_window.show_chart_window(store, columns, window)
+
+    def get_checked_tags(self):
+        columns = []
+
+        for i, checkbox in enumerate(self.checkboxes):
+            if checkbox.isChecked():
+                columns.append(i)
+
+        if len(columns) == 0:
+            msgBox = QMessageBox()
+            msgBox.setIcon(QMessageBox.Information)
+            msgBox.setText("No tags selected!")
+            msgBox.setWindowTitle("Error")
+            msgBox.setStandardButtons(QMessageBox.Ok)
+
+            returnValue = msgBox.exec()
+        else:
+            self.show_chart_window(self.store, columns)
+
+
+class ToolTip(QGraphicsTextItem):
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setPlainText("")
+
+    def updateText(self, point):
+        self.setPlainText(f"{point.x()}: {point.y()}")
+        self.setVisible(True)
+
+
+class CustomChartView(QChartView):
+    def __init__(self, chart, find_point, parent=None):
+        super().__init__(chart, parent)
+        self.find_point = find_point
+        self.tooltip = ToolTip()
+        chart.scene().addItem(self.tooltip)
+        self.tooltip.hide()
+
+    def mouseMoveEvent(self, event: QMouseEvent):
+        point = self.find_point(event.position())
+
+        if point is not None:
+            self.tooltip.setPos(event.position().x(), event.position().y())
+            self.tooltip.updateText(point)
+        else:
+            self.tooltip.hide()
+
+        super().mouseMoveEvent(event)
+
+
+class TrendChart(QMainWindow):
+    """
+    A chart of trend samples that follows a running trend.
+
+    The samples of each tag are kept in NumPy arrays, the series only get a
+    Largest-Triangle-Three-Buckets downsample of them with about one point
+    per pixel of the plot area, set with one replaceNp call. Samples of a
+    running trend are added with apply and the series are redrawn together
+    on a timer, so a trend of millions of samples draws as fast as a short
+    one. The point under the mouse is found with a bisect over the
+    timestamps instead of a scan of every point.
+
+    With a rolling window the chart is a strip chart, only the samples of
+    the last window are kept and older ones are dropped as new ones come
+    in, so the memory used stays the same however long the trend runs. The
+    scroll bar under the chart pans back in time, the samples of the
+    window shown are then read from the store, which only loads the spill
+    or trend file chunks that overlap it.
+
+    Attributes:
+    - store (TrendStore or TrendFileReader): the samples plotted
+    - columns (list): the store column of each series
+    - window (float): the width of the rolling window in milliseconds, None to show every sample
+    - count (int): the number of rows of the store added so far
+    - x (list): the timestamps kept of each series, from starts[i] to sizes[i]
+    - y (list): the values kept of each series, from starts[i] to sizes[i]
+    - starts (list): the first kept point of each series
+    - sizes (list): the end of the kept points of each series
+    - latest (float): the newest timestamp added, None if there are none
+    - history (tuple): the first and last time and the (x, y) of each series last read from the store for panning, None if none were read
+    - shown (list): the (x, y) of each series in the time shown, before downsampling
+    - scroll_bar (QScrollBar): pans the rolling window, at its maximum the chart follows the newest samples
+    - dirty (bool): whether the points shown changed since the series were drawn
+    - timer (QTimer): redraws the series when points were added or the chart was resized
+    - steps (StepHolder): fills in the values left out of a trend recorded by exception, None if every sample was recorded
+    - closed (Signal): a signal with the store plotted, emitted when the chart is closed
+    """
+
+    closed = Signal(object)
+
+    # milliseconds between redraws
+    REDRAW_INTERVAL = 100
+
+    # pixels from a point within which the mouse shows its value
+    HOVER_DISTANCE = 10
+
+    def __init__(self, store, columns, window=None):
+        super().__init__()
+
+        self.store = store
+        self.columns = list(columns)
+        self.window = window
+        self.count = 0
+        self.x = [np.empty(1024) for _ in self.columns]
+        self.y = [np.empty(1024) for _ in self.columns]
+        self.starts = [0] * len(self.columns)
+        self.sizes = [0] * len(self.columns)
+        self.latest = None
+        self.history = None
+        self.shown = [(np.empty(0), np.empty(0)) for _ in self.columns]
+        self.threshold = 0
+        self.dirty = True
+        self.steps = StepHolder() if store.recording else None
+
+        self.chart = QChart()
+        self.chart.setTheme(QChart.ChartThemeDark)
+        self.series_list = []
+
+        self.x_axis = QValueAxis()
+        self.y_axis = QValueAxis()
+        self.x_axis.setTitleText("Time (msec)")
+        self.y_axis.setTitleText("Value")
+        self.chart.addAxis(self.x_axis, Qt.AlignBottom)
+        self.chart.addAxis(self.y_axis, Qt.AlignLeft)
+
+        for i in self.columns:
+            series = QLineSeries()
+            series.setName(store.tags[i])
+            self.chart.addSeries(series)
+            series.attachAxis(self.x_axis)
+            series.attachAxis(self.y_axis)
+            self.series_list.append(series)
+
+        if self.window is None:
+            for timestamps, valid, values in store.chunks():
+                self.add(timestamps, valid, values)
+                self.count += len(timestamps)
+        else:
+            # only the last window is loaded, earlier samples are read when the chart is panned back
+            time_range = store.time_range()
+
+            if time_range is not None:
+                self.add(*store.window(time_range[1] - self.window, time_range[1]))
+
+            self.count = len(store)
+
+        self.chart.legend().setVisible(True)
+        self.chart.setTitle("Tag Plot")
+
+        self._chart_view = CustomChartView(self.chart, self.hover_point)
+        self._chart_view.setRenderHint(QPainter.Antialiasing)
+
+        self.scroll_bar = QScrollBar(Qt.Horizontal)
+        self.scroll_bar.setRange(0, 0)
+        self.scroll_bar.setVisible(self.window is not None)
+        self.scroll_bar.valueChanged.connect(self.scrolled)
+
+        layout = QVBoxLayout()
+        layout.addWidget(self._chart_view)
+        layout.addWidget(self.scroll_bar)
+        widget = QWidget()
+        widget.setLayout(layout)
+
+        self.setCentralWidget(widget)
+
+        self.timer = QTimer(self)
+        self.timer.setInterval(self.REDRAW_INTERVAL)
+        self.timer.timeout.connect(self.redraw)
+        self.timer.start()
+
+    def closeEvent(self, event):
+        self.timer.stop()
+        self.closed.emit(self.store)
+        super().closeEvent(event)
+
+    def add(self, timestamps, valid, values):
+        """
+        Adds samples to the series, missing values mark a gap where the connection was lost and are left out.
+
+        Values left out of a trend recorded by exception are filled in with
+        the last value recorded first, so they are drawn as steps.
+
+        Args:
+            timestamps (numpy.ndarray): The timestamp of each sample in milliseconds.
+            valid (numpy.ndarray): A row per sample and a column per tag, False where the value is missing.
+            values (list): The values of each tag.
+
+        Returns:
+            None
+        """
+        if len(timestamps) == 0:
+            return
+
+        self.latest = timestamps[-1]
+
+        # a value left out by the recording policies is the last one recorded, so it is drawn as a step
+        if self.steps is not None:
+            valid, values = self.steps.fill(valid, values)
+
+        for n, column in enumerate(self.columns):
+            mask = valid[:, column]
+            x = timestamps[mask]
+            y = values[column][mask].astype(np.float64)
+
+            start, size = self.starts[n], self.sizes[n]
+
+            if size + len(y) > len(self.x[n]):
+                # the points dropped from the front are reused before the arrays grow
+                kept = size - start
+                self.x[n][:kept] = self.x[n][start:size]
+                self.y[n][:kept] = self.y[n][start:size]
+                start, size = 0, kept
+
+                # the arrays double when full so adding stays O(1) amortized
+                if size + len(y) > len(self.x[n]):
+                    capacity = max(2 * len(self.x[n]), size + len(y))
+                    self.x[n] = np.resize(self.x[n], capacity)
+                    self.y[n] = np.resize(self.y[n], capacity)
+
+            self.x[n][size:size + len(y)] = x
+            self.y[n][size:size + len(y)] = y
+            size += len(y)
+
+            if self.window is not None:
+                start += int(np.searchsorted(self.x[n][start:size], self.latest - self.window))
+
+            self.starts[n], self.sizes[n] = start, size
+
+        self.dirty = True
+
+    def apply(self, delta):
+        """
+        Adds the new samples of a running trend, rows that were already added are skipped.
+
+        Args:
+            delta (TrendDelta): The new samples.
+
+        Returns:
+            None
+        """
+        skip = max(0, self.count - delta.start)
+
+        if skip >= len(delta):
+            return
+
+        self.add(delta.timestamps[skip:], delta.valid[skip:], [column[skip:] for column in delta.columns])
+        self.count = delta.start + len(delta)
+
+    def following(self):
+        """
+        Gets whether the chart shows every sample or the newest window, rather than a window panned back to.
+
+        Returns:
+            bool: True if the newest samples are shown.
+        """
+        return self.window is None or self.scroll_bar.value() >= self.scroll_bar.maximum()
+
+    def scrolled(self):
+        self.dirty = True
+        self.redraw()
+
+    def update_scroll_bar(self):
+        """
+        Sets the range of the scroll bar to the times of the store, keeping it at the end if the chart follows the newest samples.
+
+        Returns:
+            None
+        """
+        time_range = self.store.time_range()
+
+        if time_range is None:
+            return
+
+        following = self.following()
+        maximum = int(time_range[1])
+        minimum = min(int(time_range[0] + self.window), maximum)
+
+        self.scroll_bar.blockSignals(True)
+        self.scroll_bar.setRange(minimum, maximum)
+        self.scroll_bar.setPageStep(int(self.window))
+        self.scroll_bar.setSingleStep(max(1, int(self.window / 10)))
+
+        if following:
+            self.scroll_bar.setValue(maximum)
+
+        self.scroll_bar.blockSignals(False)
+
+    def read_history(self, start, end):
+        """
+        Gets the samples of each series between two times from the store.
+
+        A window on each side of the time shown is read as well, so panning
+        a little does not read the store again.
+
+        Args:
+            start (float): The first time in milliseconds.
+            end (float): The last time in milliseconds.
+
+        Returns:
+            list: The (x, y) of each series.
+        """
+        if self.history is None or start < self.history[0] or end > self.history[1]:
+            first, last = start - self.window, end + self.window
+            timestamps, valid, values = self.store.window(first, last)
+            series = []
+
+            if self.steps is not None:
+                valid, values = hold_steps(valid, values)
+
+            for column in self.columns:
+                mask = valid[:, column]
+                series.append((timestamps[mask], values[column][mask].astype(np.float64)))
+
+            self.history = (first, last, series)
+
+        shown = []
+
+        for x, y in self.history[2]:
+            low = np.searchsorted(x, start, side='left')
+            high = np.searchsorted(x, end, side='right')
+            shown.append((x[low:high], y[low:high]))
+
+        return shown
+
+    def redraw(self):
+        """
+        Sets the downsampled points of each series and the axis ranges, if anything changed since the last redraw.
+
+        Returns:
+            None
+        """
+        threshold = max(3, int(self.chart.plotArea().width()))
+
+        if not self.isVisible() or (not self.dirty and threshold == self.threshold):
+            return
+
+        self.dirty = False
+        self.threshold = threshold
+
+        if self.window is not None:
+            self.update_scroll_bar()
+
+        if self.following():
+            self.shown = [(x[start:size], y[start:size])
+                          for x, y, start, size in zip(self.x, self.y, self.starts, self.sizes)]
+            end = self.latest
+        else:
+            end = self.scroll_bar.value()
+            self.shown = self.read_history(end - self.window, end)
+
+        for series, (x, y) in zip(self.series_list, self.shown):
+            x, y = lttb(x, y, threshold)
+            series.replaceNp(np.ascontiguousarray(x), np.ascontiguousarray(y))
+
+        shown = [(x, y) for x, y in self.shown if len(x)]
+
+        if self.window is not None and end is not None:
+            self.x_axis.setRange(end - self.window, end)
+        elif shown:
+            x_min = min(x[0] for x, _ in shown)
+            x_max = max(x[-1] for x, _ in shown)
+            self.x_axis.setRange(x_min, x_max if x_max > x_min else x_min + 1)
+
+        if shown:
+            y_min = min(y.min() for _, y in shown)
+            y_max = max(y.max() for _, y in shown)
+
+            # increase the y axis slightly in both directions
+            chart_addition = (y_max - y_min) * .05 or 1
+
+            self.y_axis.setRange(y_min - chart_addition, y_max + chart_addition)
+
+    def hover_point(self, position):
+        """
+        Finds the sample closest to a position in the chart view.
+
+        Args:
+            position (QPointF): The position in the chart view.
+
+        Returns:
+            QPointF or None: The timestamp and value of the sample, None if no sample is close enough.
+        """
+        value = self.chart.mapToValue(position)
+        closest = None
+
+        for series, (x, y) in zip(self.series_list, self.shown):
+            index = nearest(x, value.x())
+
+            if index is None:
+                continue
+
+            point = QPointF(float(x[index]), float(y[index]))
+            distance = (self.chart.mapToPosition(point, series) - position).manhattanLength()
+
+            if distance < self.HOVER_DISTANCE and (closest is None or distance < closest[0]):
+                closest = (distance, point)
+
+        return closest[1] if closest is not None else None
+
+
+class LogConsole(QPlainTextEdit):
+    """
+    The results console, messages are queued and shown together on a timer.
+
+    Workers can send a message for every tag of every sample, so adding
+    each one to the document as it arrives would keep the GUI thread busy
+    laying out text. Messages are queued instead and written in one edit
+    about 30 times a second, and the document keeps only the last lines.
+
+    Attributes:
+    - max_lines (int): the number of lines kept in the console
+    - pending (deque): the (text, color, newline) messages not shown yet, the oldest are dropped when it is full
+    - timer (QTimer): flushes the queued messages, only running while messages are queued
+    """
+
+    def __init__(self, max_lines=5000, interval=33, parent=None):
+        super().__init__(parent)
+        self.max_lines = max_lines
+        self.pending = deque(maxlen=max_lines)
+        self.setReadOnly(True)
+        self.setMaximumBlockCount(max_lines)
+        self.timer = QTimer(self)
+        self.timer.setInterval(interval)
+        self.timer.timeout.connect(self.flush)
+
+    def log(self, text, color='white', newline=True):
+        """
+        Queues a message.
+
+        Args:
+            text (str): The message, lines are separated by <br>.
+            color (str, optional): The color of the text.
+            newline (bool, optional): Whether to end the line after the message.
+
+        Returns:
+            None
+        """
+        self.pending.append((text, color, newline))
+
+        if not self.timer.isActive():
+            self.timer.start()
+
+    def flush(self):
+        """
+        Writes the queued messages to the console in one edit.
+
+        Returns:
+            None
+        """
+        if not self.pending:
+            self.timer.stop()
+            return
+
+        # split the messages into lines of (text, color) spans, the first continues the last line shown
+        lines = [[]]
+
+        while self.pending:
+            text, color, newline = self.pending.popleft()
+            parts = (f'{text}<br>' if newline else f'{text}').split('<br>')
+
+            for i, part in enumerate(parts):
+                if i > 0:
+                    lines.append([])
+                if part:
+                    lines[-1].append((part, color))
+
+        # older lines would be removed from the document straight away, the lines kept start after the last line shown
+        if len(lines) > self.max_lines:
+            lines = [[]] + lines[-(self.max_lines - 1):]
+
+        scroll_bar = self.verticalScrollBar()
+        follow = scroll_bar.value() == scroll_bar.maximum()
+
+        cursor = QTextCursor(self.document())
+        cursor.movePosition(QTextCursor.End)
+        cursor.beginEditBlock()
+
+        for i, spans in enumerate(lines):
+            if i > 0:
+                cursor.insertBlock()
+            if spans:
+                cursor.insertHtml(''.join(f"<span style='color: {color};'>{part}</span>" for part, color in spans))
+
+        cursor.endEditBlock()
+
+        if follow:
+            scroll_bar.setValue(scroll_bar.maximum())
+
+    def clear(self):
+        self.pending.clear()
+        super().clear()
+
+
+class ValueNode:
+    """
+    A tag or member shown in the results tree.
+
+    Attributes:
+    - name (str): the name shown in the tree
+    - value (str): the value shown in the tree, '' for structures
+    - parent (ValueNode): the node above, None for the root
+    - row (int): the position under the parent
+    - children (list): the nodes below, in the order they were added
+    - index (dict): the nodes below keyed by name
+    """
+
+    __slots__ = ('name', 'value', 'parent', 'row', 'children', 'index')
+
+    def __init__(self, name='', value='', parent=None, row=0):
+        self.name = name
+        self.value = value
+        self.parent = parent
+        self.row = row
+        self.children = []
+        self.index = {}
+
+
+def expand_values(data):
+    """
+    Gets the (name, value) of each row a value adds to its parent, list items are added as name[i].
+
+    Args:
+        data (dict or list): The values to add.
+
+    Returns:
+        list: The (name, value) pairs.
+    """
+    if isinstance(data, list):
+        items = [(f'{i}', value) for i, value in enumerate(data)]
+    else:
+        items = list(data.items())
+
+    rows = []
 
-                            if not self.read_once:
-                                self.read_loop_enabled = True
-                                self.read_time_timestamp_start = datetime.datetime.now()
+    for name, value in items:
+        if isinstance(value, list):
+            rows.extend(expand_values({f'{name}[{i}]': item for i, item in enumerate(value)}))
+        else:
+            rows.append((name, value))
 
-                        elif self.read_write_tag_list != None and self.write_selected:
+    return rows
 
-                            tag_write_data = []
 
-                            for i, value in enumerate([t.strip() for t in self.values_to_write.split(',')]):
-                                tag_write_data.append(
-                                    (self.read_write_tag_list[i], set_data_type(value, self.tags_to_read_write[i])))
+class ValueTreeModel(QAbstractItemModel):
+    """
+    A tree model of the tag values read, trended and monitored.
 
-                            self.plc.write(*tag_write_data)
-                            self.update.emit(
-                                f'Successfully wrote to tags: {self.tags_to_read_write}<br>', 'white')
+    Each node keeps its children in a list and an index by name, so an
+    update finds the row of a value without scanning its siblings. Values
+    that are already shown are changed in place and one dataChanged signal
+    is sent for each run of changed rows, new rows are added with one
+    insert per parent. The view only asks for the rows it shows.
+    """
 
-                        self.yaml_data.append(yaml_temp)
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.root = ValueNode()
 
-                    if result.value != self.value:
-                        self.hold = False
+    def node(self, index):
+        if index.isValid():
+            return index.internalPointer()
+        return self.root
 
-                except Exception as e:
-                    print(f"Error in monitorer: {e}")
+    def node_index(self, node, column=0):
+        if node is self.root:
+            return QModelIndex()
 
-            QThread.msleep(self.interval)
+        return self.createIndex(node.row, column, node)
 
-    def stop(self):
-        """
-        Stops the monitoring process.
-        """
-        self.running = False
-        self.finished.emit()
+    def index(self, row, column, parent=QModelIndex()):
+        children = self.node(parent).children
 
+        if row < 0 or row >= len(children) or column < 0 or column > 1:
+            return QModelIndex()
 
-class AboutWindow(QWidget):
-    """
-    This "window" is a QWidget. If it has no parent, it
-    will appear as a free-floating window as we want.
-    """
+        return self.createIndex(row, column, children[row])
 
-    def __init__(self):
-        super().__init__()
-        self.setWindowTitle("About")
-        layout = QVBoxLayout()
-        self.name_label = QLabel("PLC Tag Utility")
-        self.version_label = QLabel("Version 1.0")
-        self.author_label = QLabel("Created by: Parker Mojsiejenko")
-        self.description_label = QLabel(
-            "This app is a bridge between you Allen Bradley PLC and your PC. It has many features including reading and writing tags, trending tags, and monitoring tags for changes. It can also read and write to files in YAML and CSV format.")
-        self.description_label.setWordWrap(True)
-        self.about_label = QLabel(
-            "This project relies on the pycomm3 library made by ottowayi for communicating with Allen-Bradley PLCs and would not be possible without it.")
-        self.name_label.setAlignment(Qt.AlignCenter)
-        self.version_label.setAlignment(Qt.AlignCenter)
-        self.author_label.setAlignment(Qt.AlignCenter)
-        self.about_label.setAlignment(Qt.AlignCenter)
-        self.description_label.setAlignment(Qt.AlignCenter)
-        self.name_label.setFont(QtGui.QFont("Arial", 20))
-        layout.addWidget(self.name_label)
-        layout.addWidget(self.version_label)
-        layout.addWidget(self.author_label)
-        layout.addWidget(self.about_label)
-        layout.addWidget(self.description_label)
-        self.setLayout(layout)
+    def parent(self, index):
+        if not index.isValid():
+            return QModelIndex()
 
+        return self.node_index(index.internalPointer().parent)
 
-class HelpWindow(QWidget):
-    """
-    This "window" is a QWidget. If it has no parent, it
-    will appear as a free-floating window as we want.
-    """
+    def rowCount(self, parent=QModelIndex()):
+        if parent.column() > 0:
+            return 0
 
-    def __init__(self):
-        super().__init__()
-        self.setWindowTitle("Help")
+        return len(self.node(parent).children)
 
-        layout = QVBoxLayout()
+    def columnCount(self, parent=QModelIndex()):
+        return 2
 
-        self.text_browser = QTextBrowser()
-        text = '<h1>PLC Tag Utility Help</h1>\
-            <p>This app is a bridge between your Allen Bradley PLC and PC. It can read tags, write to tags, trend tags, and monitor tags for changes with the ability to read and write tags when the monitored tag reads a set value.</p>\
-            <h2>Getting Started</h2>\
-            <p>First, you need to connect to your PLC. To do this, enter your IP address and click the "Connect" button in the top left corner of the app.</p>\
-            <h2>General Infomation</h2>\
-            <p>When entering tags to interface with, you may enter more than one but they must be seperated by a comma. If the tag is an array, you can read the entire array or a portion of it if you format the tag correctly.</p>\
-            <ul>\
-            <li>Tag_Name[Index] - Reads the tag at the specified index</li>\
-            <li>Tag_Name[starting position]{{number of tags to read in array}} - Reads the specified number of tags starting at the specified index</li>\
-            <li>Tag_Name.Child_Tag - Reads just the UDTs child tag</li>\
-            </ul>\
-            <p>If you omit the [Index] or {{number of tags to read in array}} from an array tag. The index will be assumed to be [0] and the number of tags to read will be assumed to be 1 only.</p>\
-            <p>When writing to multiple tags, you must also seperate the values with commas.</p>\
-            <h2>Reading and Writing to Files</h2>\
-            <p>Tag results can be stored in a YAML or CSV file if you select the "Store To File" checkbox. The format in the drop down to the right of this is the file format it will be saved in.</p>\
-            <p>When reading from a file, the file must be in YAML or CSV format and the format must be selected in the drop down to the right of the "Read From File" checkbox. A good way to ensure you have the file formatted correctly is to first read the tags and store the results to a file and then edit that file with your changes. This ensures that there are no issues with the formatting when reading from it.</p>\
-            <h2>Trending Tags</h2>\
-            <p>To trend tags, enter the tags you want to trend in the "Tags" field and click the "Trend" button. During or after the trend, you can look at a plot of the values by clicking "Show Trend Plot". This will open a window where you can select the tags to trend if you have more then one. The results will be stored to a file if the option is selected.</p>\
-            <h2>Monitoring Tags</h2>\
-            <p>Monitoring tags is a good way to watch for a tag to be a certain value. Enter the tag to moniotor and the value to look for and when the tag reads equals your value, the timestamp will be logged.</p>\
-            <p>When the tag equals your inputted value, you can enable an option to read or write to other tags. This can be helpful if you want to monitor for a certain fault bit to be high and then reset it by writing a 0 to the tag or get the values of other tags. You can read tags once or for a time period after the monitor event triggers.</p>\
-            <h2>Notes</h2>\
-            <p>This app was developed as a side project and there will be bugs from time to time. If you find a bug, please report it to me so I can fix it. I am also open to suggestions for new features.</p>\
-            <p>Thanks for using my app!</p>'\
+    def data(self, index, role=Qt.DisplayRole):
+        if index.isValid() and role == Qt.DisplayRole:
+            node = index.internalPointer()
+            return node.name if index.column() == 0 else node.value
 
+        return None
 
-        self.text_browser.setOpenExternalLinks(True)
-        self.text_browser.setHtml(text)
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if orientation == Qt.Horizontal and role == Qt.DisplayRole:
+            return ['Tag', 'Value'][section]
 
-        # self.text_browser.setLineWrapMode(QTextEdit.NoWrap)
-        self.text_browser.setReadOnly(True)
-        self.text_browser.setAlignment(Qt.AlignCenter)
+        return None
 
-        layout.addWidget(self.text_browser)
-        self.setLayout(layout)
+    def update(self, data, list_of_items=False):
+        """
+        Adds values to the tree or changes the values already shown.
 
+        Args:
+            data (dict or list): The values keyed by tag, or a list of them if list_of_items is True.
+            list_of_items (bool, optional): Whether data is a list of dictionaries of values.
 
-class PlotWindow(QWidget):
-    """
-    This "window" is a QWidget. If it has no parent, it
-    will appear as a free-floating window as we want.
-    """
+        Returns:
+            None
+        """
+        if list_of_items:
+            rows = [row for item in data if isinstance(item, (dict, list)) for row in expand_values(item)]
+        else:
+            rows = expand_values(data)
 
-    def __init__(self, tags, results, timestamps, main_window):
-        super().__init__()
+        self.merge(self.root, rows)
 
-        self.tags = tags
-        self.timestamps = timestamps
-        self.main_window = main_window
+    def merge(self, node, rows):
+        new = []
+        seen = set()
 
-        if not isinstance(self.tags, list):
-            self.tags = [self.tags]
-            self.results = [results]
-        else:
-            self.results = results
-        self.checkboxes = []
+        for name, value in rows:
+            if name not in node.index and name not in seen:
+                new.append(name)
+                seen.add(name)
 
-        self.layout = QVBoxLayout()
-        self.group_box = QGroupBox("Tags")
-        self.group_box.setLayout(QVBoxLayout())
+        if new:
+            first = len(node.children)
+            self.beginInsertRows(self.node_index(node), first, first + len(new) - 1)
 
-        self.plot_button = QPushButton("Plot")
+            for row, name in enumerate(new, start=first):
+                child = ValueNode(name, '', node, row)
+                node.children.append(child)
+                node.index[name] = child
 
-        for tag in self.tags:
-            checkbox = QCheckBox(tag, self)
+            self.endInsertRows()
 
-            pattern = r'\[\d+\]'
+        changed = []
 
-            tag_stripped = re.sub(pattern, '', tag)
+        for name, value in rows:
+            child = node.index[name]
 
-            if tag_types[tag_stripped]['data_type'] in ['DINT', 'INT', 'SINT', 'REAL', 'BOOL']:
-                checkbox.setEnabled(True)
+            if isinstance(value, dict):
+                self.merge(child, expand_values(value))
+                text = ''
             else:
-                checkbox.setEnabled(False)
+                text = str(value)
 
-            self.checkboxes.append(checkbox)
-            self.group_box.layout().addWidget(checkbox)
-            # self.layout.addWidget(checkbox)
+            if child.value != text:
+                child.value = text
+                changed.append(child.row)
 
-        self.layout.addWidget(self.group_box)
-        self.layout.addWidget(self.plot_button)
+        # one signal for each run of consecutive changed rows
+        changed.sort()
+        start = 0
 
-        self.plot_button.clicked.connect(self.get_checked_tags)
-        self.setLayout(self.layout)
+        for i in range(1, len(changed) + 1):
+            if i == len(changed) or changed[i] != changed[i - 1] + 1:
+                self.dataChanged.emit(self.createIndex(changed[start], 1, node.children[changed[start]]),
+                                      self.createIndex(changed[i - 1], 1, node.children[changed[i - 1]]))
+                start = i
 
-    def show_chart_window(self, tags, results, timestamps):
-        self.main_window.show_chart_window(tags, results, timestamps)
+    def clear(self):
+        self.beginResetModel()
+        self.root = ValueNode()
+        self.endResetModel()
 
-    def get_checked_tags(self):
-        checked_tags = []
-        results = []
-        timestamps = self.timestamps
+    def to_dict(self, node=None):
+        """
+        Gets the values shown in the tree.
 
-        for i, checkbox in enumerate(self.checkboxes):
-            if checkbox.isChecked():
-                checked_tags.append(self.tags[i])
-                results.append(self.results[i])
+        Args:
+            node (ValueNode, optional): The node to start from, the root if not given.
 
-        if len(checked_tags) == 0:
-            msgBox = QMessageBox()
-            msgBox.setIcon(QMessageBox.Information)
-            msgBox.setText("No tags selected!")
-            msgBox.setWindowTitle("Error")
-            msgBox.setStandardButtons(QMessageBox.Ok)
+        Returns:
+            dict: The value of each node keyed by name, nested for nodes with children.
+        """
+        node = self.root if node is None else node
 
-            returnValue = msgBox.exec()
-        else:
-            self.show_chart_window(checked_tags, results, timestamps)
+        return {child.name: self.to_dict(child) if child.children else child.value
+                for child in node.children}
 
 
-class ToolTip(QGraphicsTextItem):
-    def __init__(self, parent=None):
+class TagCompleterModel(QAbstractItemModel):
+    """
+    A tree model over the tag index used by the tag completer.
+
+    Rows are made from the index nodes only when the completer asks for
+    them, so typing a tag only lists the members of the structure being
+    typed instead of every tag in the PLC.
+    """
+
+    def __init__(self, tag_index, parent=None):
         super().__init__(parent)
-        self.setPlainText("")
+        self.tag_index = tag_index
 
-    def updateText(self, point):
-        self.setPlainText(f"{point.x()}: {point.y()}")
-        self.setVisibile(True)
+    def node(self, index):
+        if index.isValid():
+            return index.internalPointer()
+        return self.tag_index.root
 
+    def index(self, row, column, parent=QModelIndex()):
+        names = self.node(parent).child_names()
 
-class CustomChartView(QChartView):
-    def __init__(self, chart, parent=None):
-        super().__init__(chart, parent)
-        self.tooltip = ToolTip()
-        chart.scene().addItem(self.tooltip)
-        self.tooltip.hide()
+        if column != 0 or row < 0 or row >= len(names):
+            return QModelIndex()
 
-    def mouseMoveEvent(self, event: QMouseEvent):
-        chart_pos = self.chart().mapToValue(event.position())
-
-        for series in self.chart().series():
-            for i in range(series.count()):
-                point = series.at(i)
-
-                dx = point.x() - chart_pos.x()
-                dy = point.y() - chart_pos.y()
-                distance = (dx**2 + dy**2)**0.5
-                if distance < 2:
-                    self.tooltip.setPos(
-                        event.position().x(), event.position().y())
-                    self.tooltip.updateText(point)
-                    return
-        self.tooltip.hide()
-        super().mouseMoveEvent(event)
+        return self.createIndex(row, column, self.node(parent).children[names[row]])
 
+    def parent(self, index):
+        if not index.isValid():
+            return QModelIndex()
 
-class TrendChart(QMainWindow):
-    def __init__(self, tags, results, timestamps):
-        super().__init__()
+        parent = index.internalPointer().parent
 
-        self.chart = QChart()
-        self.chart.setTheme(QChart.ChartThemeDark)
-        self.series_list = []
+        if parent is None or parent.parent is None:
+            return QModelIndex()
 
-        min = 99999999999
-        max = 0
+        return self.createIndex(parent.row(), 0, parent)
 
-        for i, tag in enumerate(tags):
-            self.series = QLineSeries()
-            self.series.setName(tag)
-            self.series.setPointsVisible(True)
-            for x, result in enumerate(results[i]):
-                if result < min:
-                    min = result
+    def rowCount(self, parent=QModelIndex()):
+        if parent.column() > 0:
+            return 0
 
-                if result > max:
-                    max = result
+        return len(self.node(parent).child_names())
 
-                self.series.append(timestamps[x], result)
+    def columnCount(self, parent=QModelIndex()):
+        return 1
 
-            self.series_list.append(self.series)
+    def data(self, index, role=Qt.DisplayRole):
+        if index.isValid() and role in (Qt.DisplayRole, Qt.EditRole):
+            return index.internalPointer().name
 
-            self.chart.addSeries(self.series)
+        return None
 
-        self.chart.createDefaultAxes()
-        self.x_axis = self.chart.axes()[0]
-        self.y_axis = self.chart.axes()[1]
-        self.x_axis.setTitleText("Time (msec)")
-        self.y_axis.setTitleText("Value")
 
-        chart_addition = (max - min) * .05
+class TagCompleter(QCompleter):
+    """
+    Completes the tag being typed one member at a time from a TagCompleterModel.
+
+    Only the last tag of a comma seperated list is completed and any
+    indexes already typed are kept.
+    """
 
-        if len(self.series_list) > 1:
-            # increase the y axis slightly in both directions
-            self.y_axis.setMin(min - chart_addition)
-            self.y_axis.setMax(max + chart_addition)
-        self.chart.legend().setVisible(True)
-        self.chart.setTitle("Tag Plot")
+    def split_text(self, text):
+        head, comma, current = text.rpartition(',')
+        tag = current.lstrip()
 
-        self._chart_view = CustomChartView(self.chart)
-        self._chart_view.setRenderHint(QPainter.Antialiasing)
+        return head + comma + current[:len(current) - len(tag)], tag
+
+    def splitPath(self, path):
+        tag = self.split_text(path)[1]
+
+        return split_tag_path(parse_tag_address(tag).base)
 
-        self.setCentralWidget(self._chart_view)
+    def pathFromIndex(self, index):
+        node = index.internalPointer()
+        head, tag = self.split_text(self.widget().text() if self.widget() else '')
+
+        # keep the members already typed, including their indexes
+        if node.parent is not None and node.parent.parent is not None:
+            head += tag[:tag.rfind('.') + 1]
+
+        return head + node.name
 
 
 class MainWindow(QMainWindow):
 
     # TODO - Skip the checkbox window when only one tag trended
-    def show_chart_window(self, tags, results, timestamps):
-        self.chart_window = TrendChart(tags, results, timestamps)
+    def show_chart_window(self, store, columns, window=None):
+        self.chart_window = TrendChart(store, columns, window)
+        self.chart_window.closed.connect(self.close_trend_reader)
         self.chart_window.setWindowTitle("Trend Chart")
         self.chart_window.resize(600, 600)
         self.plot_setup_window.close()
@@ -1392,12 +2387,69 @@ class MainWindow(QMainWindow):
             self.help_window.resize(600, 600)
         self.help_window.show()
 
-    def show_plot_setup_window(self, tags, results, timestamps):
-        self.plot_setup_window = PlotWindow(tags, results, timestamps, self)
+    def show_plot_setup_window(self, store):
+        if store is None or len(store) == 0:
+            self.print_results("No trend data to plot yet.<br>")
+            return
+
+        self.plot_setup_window = PlotWindow(store, self)
         self.plot_setup_window.setWindowTitle("Select Tags To Plot")
         self.plot_setup_window.setFixedWidth(400)
         self.plot_setup_window.show()
 
+    def open_trend_file(self):
+        file_name = QFileDialog.getOpenFileName(
+            self, 'Open Trend File', '', f'Trend File (*{TREND_FILE_EXTENSION})')[0]
+
+        if file_name == '':
+            return
+
+        try:
+            reader = TrendFileReader(file_name)
+        except (OSError, ValueError) as e:
+            self.print_results(f"Error opening {file_name}: {e}<br>", 'red')
+            return
+
+        # the windows of the previous file read from it, so they are closed with it
+        if self.trend_reader is not None:
+            if self.chart_window is not None and self.chart_window.store is self.trend_reader:
+                self.chart_window.close()
+            if self.plot_setup_window is not None and self.plot_setup_window.store is self.trend_reader:
+                self.plot_setup_window.close()
+
+            self.close_trend_reader(self.trend_reader)
+
+        self.trend_reader = reader
+        self.show_plot_setup_window(reader)
+
+    def close_trend_reader(self, store):
+        # only the trend file opened last is closed, a running trend store stays open
+        if store is not None and store is self.trend_reader:
+            self.trend_reader.close()
+            self.trend_reader = None
+
+    def export_trend_file(self):
+        file_name = QFileDialog.getOpenFileName(
+            self, 'Open Trend File', '', f'Trend File (*{TREND_FILE_EXTENSION})')[0]
+
+        if file_name == '':
+            return
+
+        csv_name = QFileDialog.getSaveFileName(
+            self, 'Export To CSV', os.path.splitext(file_name)[0] + '.csv', 'CSV (*.csv)')[0]
+
+        if csv_name == '':
+            return
+
+        try:
+            with TrendFileReader(file_name) as reader:
+                export_csv(reader, csv_name)
+        except (OSError, ValueError) as e:
+            self.print_results(f"Error exporting {file_name}: {e}<br>", 'red')
+            return
+
+        self.print_results(f"Trend exported to {csv_name}<br>")
+
     def showConnectedDialog(self):
         msgBox = QMessageBox()
         msgBox.setIcon(QMessageBox.Information)
@@ -1415,25 +2467,38 @@ class MainWindow(QMainWindow):
         ipRegex = QRegularExpression(
             r"^(?:(?:25[0-5]|2[0-4][0-9]|[01]?[0-9][0-9]?)\.){3}(?:25[0-5]|2[0-4][0-9]|[01]?[0-9][0-9]?)$")
         tagRegex = QRegularExpression(
-            r"^(?:Program:)?[A-Za-z_][A-Za-z\d_]*(?:\[\d+\])?(?:\.[A-Za-z_][A-Za-z\d_]*(?:\[\d+\])?)*(?:\{\d+\})?(?:,\s*[A-Za-z_][A-Za-z\d_]*(?:\[\d+\])?(?:\.[A-Za-z_][A-Za-z\d_]*(?:\[\d+\])?)*(?:\{\d+\})?)*$")
+            r"^(?:[A-Za-z_][A-Za-z\d_]*::)?(?:Program:)?[A-Za-z_][A-Za-z\d_]*(?:\[\d+\])?(?:\.[A-Za-z_][A-Za-z\d_]*(?:\[\d+\])?)*(?:\{\d+\})?(?:,\s*(?:[A-Za-z_][A-Za-z\d_]*::)?[A-Za-z_][A-Za-z\d_]*(?:\[\d+\])?(?:\.[A-Za-z_][A-Za-z\d_]*(?:\[\d+\])?)*(?:\{\d+\})?)*$")
         fileRegex = r"^[a-zA-Z0-9_-]+(\.(csv|yaml))?$"
         ipValidator = QRegularExpressionValidator(ipRegex)
         tagValidator = QRegularExpressionValidator(tagRegex)
         fileValidator = QRegularExpressionValidator(fileRegex)
 
-        self.tree = QTreeWidget()
-        self.tree.setColumnCount(2)
-        self.tree.setHeaderLabels(['Tag', 'Value'])
+        self.tree_model = ValueTreeModel(self)
+        self.tree = QTreeView()
+        self.tree.setModel(self.tree_model)
+        # every row has the same height so the view only lays out the rows it shows
+        self.tree.setUniformRowHeights(True)
+        self.tree.header().setSectionResizeMode(0, QHeaderView.Interactive)
+        self.tree.header().setSectionResizeMode(1, QHeaderView.Stretch)
+        self.tree.header().resizeSection(0, 250)
 
         self.about_window = None
         self.chart_window = None
         self.plot_window = None
+        self.plot_setup_window = None
+        self.trend_reader = None
         self.help_window = None
         self.setWindowTitle("PLC Read/Write")
 
         self.menubar = self.menuBar()
         self.menubar.addAction("About")
         self.menubar.addAction("Help")
+        self.menubar.addAction("Refresh Tags")
+        self.menubar.addAction("Add PLC")
+        self.menubar.addAction("Remove PLC")
+        self.trend_file_menu = self.menubar.addMenu("Trend File")
+        self.trend_file_menu.addAction("Open And Plot")
+        self.trend_file_menu.addAction("Export To CSV")
         self.menu_status = QLabel("Disconnected", self)
         self.menu_status.setFixedWidth(500)
 
@@ -1446,11 +2511,24 @@ class MainWindow(QMainWindow):
         # open about window and help window when their respective actions are triggered
         self.menubar.actions()[0].triggered.connect(self.show_about_window)
         self.menubar.actions()[1].triggered.connect(self.show_help_window)
-
-        # Create timer for checking PLC connection
-        self.plc_connection_check_timer = QTimer()
-        self.plc_connection_check_timer.timeout.connect(
-            lambda: check_plc_connection(plc, self))
+        self.menubar.actions()[2].triggered.connect(lambda: refresh_tags(self))
+        self.menubar.actions()[3].triggered.connect(lambda: add_plc(self))
+        self.menubar.actions()[4].triggered.connect(lambda: remove_plc(self))
+        self.trend_file_menu.actions()[0].triggered.connect(self.open_trend_file)
+        self.trend_file_menu.actions()[1].triggered.connect(self.export_trend_file)
+
+        # Connection supervisor thread and signals
+        self.connection_supervisor = ConnectionSupervisor()
+        self.connection_supervisor_thread = QThread()
+        self.connection_supervisor.moveToThread(self.connection_supervisor_thread)
+        self.connection_supervisor_thread.started.connect(
+            self.connection_supervisor.run)
+        self.connection_supervisor.finished.connect(
+            self.connection_supervisor_thread.quit)
+        self.connection_supervisor.state_changed.connect(
+            self.plc_connection_state_changed)
+        self.connection_supervisor.latency_updated.connect(
+            self.plc_latency_updated)
 
         # Trender thread and signals
         self.trender = Trender()
@@ -1459,9 +2537,8 @@ class MainWindow(QMainWindow):
         self.trend_thread.started.connect(self.trender.run)
         self.trender.update.connect(self.print_results)
         self.trender.finished.connect(self.trend_thread.quit)
+        self.trender.finished.connect(lambda: self.trend_button.setText("Start Trend"))
         self.trender.update_trend_data.connect(self.update_trend_data)
-        self.trender_results = []
-        self.trender_timestamps = []
         self.trender.add_to_tree.connect(self.add_to_tree)
 
         # Actioner thread and signals
@@ -1475,12 +2552,32 @@ class MainWindow(QMainWindow):
         self.sequencer.write_tag.connect(self.seq_write_tag)
         self.sequencer.toggle_button.connect(self.toggle_sequencer_text)
 
+        # Structure reader thread and signals
+        self.structure_reader = StructureReader()
+        self.structure_reader_thread = QThread()
+        self.structure_reader.moveToThread(self.structure_reader_thread)
+        self.structure_reader_thread.started.connect(self.structure_reader.run)
+        self.structure_reader.finished.connect(self.structure_reader_thread.quit)
+        self.structure_reader.update.connect(self.print_results)
+        self.structure_reader.progress.connect(self.structure_read_progress)
+        self.structure_reader.structure_read.connect(self.build_value_tree)
+
+        # File writer thread and signals
+        self.file_writer = FileWriter()
+        self.file_writer_thread = QThread()
+        self.file_writer.moveToThread(self.file_writer_thread)
+        self.file_writer_thread.started.connect(self.file_writer.run)
+        self.file_writer.finished.connect(self.file_writer_thread.quit)
+        self.file_writer.update.connect(self.print_results)
+        self.file_writer.finished.connect(self.file_write_finished)
+
         # Monitorer thread and signals
         self.monitorer = Monitorer()
         self.monitor_thread = QThread()
         self.monitorer.moveToThread(self.monitor_thread)
         self.monitor_thread.started.connect(self.monitorer.run)
         self.monitorer.finished.connect(self.monitor_thread.quit)
+        self.monitorer.finished.connect(lambda: self.sequencer_button.setText("Start Monitor"))
         self.monitorer.update.connect(self.print_results)
         self.monitorer.add_to_tree.connect(self.add_to_tree)
 
@@ -1543,6 +2640,7 @@ class MainWindow(QMainWindow):
         # Create widgets
         self.write_button = QPushButton("Write")
         self.generate_button = QPushButton("Generate Stucture")
+        self.generate_progress = QProgressBar()
         self.write_value = QLineEdit()
 
         self.value_tree = QTreeWidget()
@@ -1552,9 +2650,12 @@ class MainWindow(QMainWindow):
         # Set parameters
         self.write_value.setPlaceholderText("Value")
         self.write_button.setDisabled(True)
+        self.generate_progress.setFormat("Reading %v of %m tags")
+        self.generate_progress.hide()
 
         # Add to layouts
         write_tab_layout.addWidget(self.generate_button)
+        write_tab_layout.addWidget(self.generate_progress)
         write_tab_layout.addWidget(self.value_tree)
         write_tab_layout.addWidget(self.write_button)
 
@@ -1566,8 +2667,14 @@ class MainWindow(QMainWindow):
         self.trend_button = QPushButton("Start Trend")
         self.trend_plot_button = QPushButton("Show Trend Plot")
         self.trend_rate = QDoubleSpinBox()
+        self.trend_catch_up = QCheckBox("Catch up missed samples")
+        self.trend_binary = QCheckBox("Save trend as a binary trend file (.ptrend)")
+        self.trend_groups = QLineEdit()
+        self.trend_recording = QLineEdit()
 
         # Set parameters
+        self.trend_recording.setPlaceholderText("Record by exception: Level @ 0.5 every 60; Status @ change; * @ 1%")
+        self.trend_groups.setPlaceholderText("Slower tags: Tag1, Tag2 @ 5; Tag3 @ 60")
         self.trend_rate.setRange(0.1, 60)
         self.trend_rate.setValue(1)
         self.trend_rate.setSuffix(" seconds between reads")
@@ -1577,6 +2684,10 @@ class MainWindow(QMainWindow):
 
         # Add to layouts
         trend_tab_layout.addWidget(self.trend_rate)
+        trend_tab_layout.addWidget(self.trend_groups)
+        trend_tab_layout.addWidget(self.trend_recording)
+        trend_tab_layout.addWidget(self.trend_catch_up)
+        trend_tab_layout.addWidget(self.trend_binary)
         trend_tab_layout.addWidget(self.trend_button)
         trend_tab_layout.addWidget(self.trend_plot_button)
 
@@ -1629,7 +2740,7 @@ class MainWindow(QMainWindow):
         self.file_browser = QPushButton("Browse")
         self.connect_button = QPushButton("Connect")
         self.results_label = QLabel("Results")
-        self.results = QTextEdit()
+        self.results = LogConsole()
         self.file_format_selection = QComboBox()
         self.file_format = 0
         self.tree_label = QLabel("Read History")
@@ -1642,7 +2753,6 @@ class MainWindow(QMainWindow):
         self.file_name.setPlaceholderText("File Name")
         self.ip_input.setMaxLength(15)
         self.ip_input.setPlaceholderText("IP Address")
-        self.results.setReadOnly(True)
         self.file_format_selection.addItems(["YAML", "CSV"])
         self.file_name.setValidator(fileValidator)
         self.file_name.textChanged.connect(self.on_file_text_changed)
@@ -1714,6 +2824,15 @@ class MainWindow(QMainWindow):
             "Adds the tag in the tag input field to the list.")
         self.trend_rate.setToolTip(
             "Enter the interval between reads in seconds.")
+        self.trend_groups.setToolTip(
+            "Trend more tags at their own periods in seconds, groups are separated by semicolons. Groups due at the same time are read together.")
+        self.trend_recording.setToolTip(
+            "Only record a tag when it changes (change), moves more than a deadband (0.5) or a percent of its last value (1%), "
+            "and at least every so many seconds (every 60). Policies are separated by semicolons, * sets every other tag.")
+        self.trend_catch_up.setToolTip(
+            "When a read takes longer than the interval, take the missed samples right away instead of skipping them.")
+        self.trend_binary.setToolTip(
+            "When saving to file, write the trend as a compact binary file that can be opened from the Trend File menu.")
         self.trend_plot_button.setToolTip("Plots the trend data.")
         self.write_value.setToolTip("Enter the value to write to the tag.")
 
@@ -1738,7 +2857,7 @@ class MainWindow(QMainWindow):
 
         self.trend_button.clicked.connect(self.trender_thread)
         self.trend_plot_button.clicked.connect(lambda: self.show_plot_setup_window(
-            self.trender.formatted_tags, self.trender_results, self.trender_timestamps))
+            self.trender.store))
         self.sequencer_button.clicked.connect(self.sequencer_button_clicked)
         self.connect_button.clicked.connect(self.connect_button_clicked)
         self.file_browser.clicked.connect(
@@ -1987,48 +3106,54 @@ class MainWindow(QMainWindow):
     
     @check_plc_connection_decorator
     def get_structure_for_value_tree(self, tags):
-        self.value_tree.clear()
+        if self.structure_reader_thread.isRunning():
+            return
 
-        # split tags by comma
-        tags = [t.strip() for t in tags.split(',')]
-
-        for tag in tags:
-            # remove both brackets from the tag
-            formatted_tag = re.sub(r"(\[\d+\])|(\{\d+\})", "", tag)
-            if tag in tag_types:
-                # check if the tag is an array
-                if '{' in tag or '}' in tag:
-                    # get the number of elements in the array
-                    num = re.search(r'\{(\d+)\}', self.tag_input.text()).group(1)
-
-                    print(f'num: {num}')
-
-                    # get the tag name without the array
-                    tag = re.sub(r'\{\d+\}', '', self.tag_input.text())
-
-                    print(f'tag: {tag}')
-
-                    if '[' in tag or ']' in tag:
-                        print('tag has []')
-                        # get the start index of the array
-                        start_index = int(re.search(r'\[(\d+)\]', tag).group(1))
-                        print(f'start_index: {start_index}')
-                        # get the tag name without the array
-                        tag = re.sub(r'\[\d+\]', '', tag)
-                        print(f'tag: {tag}')
-                    else:
-                        start_index = 0
+        # the tags are read on the structure reader thread, the tree is built when they arrive
+        self.generate_button.setDisabled(True)
+        self.generate_progress.setRange(0, max(1, len(parse_tag_list(tags))))
+        self.generate_progress.setValue(0)
+        self.generate_progress.show()
 
-                    for i in range(int(num)):
-                        self.add_data_to_write_tree(
-                            self.value_tree, f'{tag}[{start_index + i}]', plc.read(f'{tag}[{start_index + i}]').value)
-                else:
-                    self.add_data_to_write_tree(
-                        self.value_tree, tag, plc.read(tag).value)
-            else:
-                self.print_results(f'{tag} is not a valid tag<br>', 'red')
-        
+        self.structure_reader.tags = tags
+        self.structure_reader.plc = plc
+        self.structure_reader_thread.start()
+
+    def start_file_write(self, file_name, file_selection):
+        if self.file_writer_thread.isRunning():
+            self.print_results("A file is already being written.<br>", 'red')
+            return
+
+        # the connection and write controls are locked until the file is written
+        self.write_button.setDisabled(True)
+        self.connect_button.setDisabled(True)
+
+        self.file_writer.file_name = file_name
+        self.file_writer.file_selection = file_selection
+        self.file_writer.plc = plc
+        self.file_writer.running = True
+        self.file_writer_thread.start()
 
+    def file_write_finished(self):
+        self.connect_button.setDisabled(False)
+
+        if self.connection_supervisor.connected:
+            self.write_button.setDisabled(False)
+
+    def structure_read_progress(self, count, total):
+        self.generate_progress.setRange(0, total)
+        self.generate_progress.setValue(count)
+
+    def build_value_tree(self, items):
+        self.value_tree.setUpdatesEnabled(False)
+        self.value_tree.clear()
+
+        for tag, value in items:
+            self.add_data_to_write_tree(self.value_tree, tag, value)
+
+        self.value_tree.setUpdatesEnabled(True)
+        self.generate_progress.hide()
+        self.generate_button.setDisabled(False)
 
     def start_read_thread(self):
         self.read_thread.start()
@@ -2037,8 +3162,9 @@ class MainWindow(QMainWindow):
         self.read_thread.quit()
 
     def set_autocomplete(self):
-        self.completer = QCompleter(tag_types.keys(), self)
+        self.completer = TagCompleter(TagCompleterModel(tag_types, self), self)
         self.completer.setCaseSensitivity(Qt.CaseSensitive)
+        self.completer.setModelSorting(QCompleter.CaseSensitivelySortedModel)
         self.completer.setCompletionMode(QCompleter.InlineCompletion)
         self.tag_input.setCompleter(self.completer)
 
@@ -2051,34 +3177,14 @@ class MainWindow(QMainWindow):
         if file_name[0] != '':
             if file_name[1] == 'YAML (*.yaml)':
                 with open(file_name[0], 'w') as file:
-                    yaml.dump(self.get_data_from_tree(
-                        self.tree.invisibleRootItem()), file)
+                    yaml_io.dump(self.tree_model.to_dict(), file)
             elif file_name[1] == 'CSV (*.csv)':
-                tree_dict = self.get_data_from_tree(
-                    self.tree.invisibleRootItem())
+                tree_dict = self.tree_model.to_dict()
 
                 file_helper.write_to_csv([file_helper.flatten_dict(tree_dict)], file_name[0])
 
     def clear_tree(self):
-        self.tree.clear()
-
-    def get_data_from_tree(self, parent):
-        data = {}
-        for i in range(parent.childCount()):
-            child = parent.child(i)
-            if child.childCount() > 0:
-                data[child.text(0)] = self.get_data_from_tree(child)
-            else:
-                data[child.text(0)] = child.text(1)
-        return data
-
-    def convert_write_values(self, data, name):
-        if isinstance(data, dict):
-            return {key: self.convert_write_values(value, f'{name}.{key}') for key, value in data.items()}
-        elif isinstance(data, list):
-            return [self.convert_write_values(value, name) for value in data]
-        else:
-            return set_data_type(data, name)
+        self.tree_model.clear()
 
     def add_data_to_write_tree(self, parent, tag, value):
         if isinstance(value, dict):
@@ -2094,139 +3200,49 @@ class MainWindow(QMainWindow):
         else:
             item = QTreeWidgetItem(parent, [tag, str(value)])
             item.setFlags(item.flags() | Qt.ItemIsEditable)
+            # the value as read, only values changed from it are written
+            item.setData(1, Qt.UserRole, str(value))
 
         self.value_tree.header().setSectionResizeMode(0, QHeaderView.ResizeToContents)
         self.value_tree.header().setSectionResizeMode(1, QHeaderView.Stretch)
 
-    def get_value_tree_data(self, parent):
-        if parent.childCount() == 0:
-            return parent.text(1)
-
-        data = {}
+    def get_value_tree_changes(self, parent, path=''):
+        """
+        Finds the values in the write tree that were changed since they were read.
 
-        parent_name = parent.text(0)
+        Args:
+            parent (QTreeWidgetItem): The item to search below.
+            path (str): The tag path of the item.
 
-        _list = []
+        Returns:
+            list: The (tag path, item) of each changed value.
+        """
+        changes = []
 
         for i in range(parent.childCount()):
             child = parent.child(i)
-            child_data = self.get_value_tree_data(child)
-
-            tag = child.text(0)
+            name = child.text(0)
 
-            # tag is part of a list broken out to a dictionary. Need to reconvert to list.
-            if ' ' in tag:
-                _list.append(child_data)
+            if not path:
+                child_path = name
+            elif name.endswith(' '):
+                # list elements are shown as 'index '
+                child_path = f'{path}[{name.strip()}]'
             else:
-                if tag:
-                    data[tag] = child_data
+                child_path = f'{path}.{name}'
 
-        if _list != []:
-            data = _list
+            read_value = child.data(1, Qt.UserRole)
 
-        return data
-
-    def add_to_tree(self, data, parent, list_of_items=False):
-        if parent.childCount() > 0:
-            existing_keys = {parent.child(i).text(0): parent.child(
-                i) for i in range(parent.childCount())}
-        else:
-            existing_keys = {}
+            if child.childCount() > 0:
+                changes.extend(self.get_value_tree_changes(child, child_path))
+            elif read_value is not None and child.text(1) != read_value:
+                # empty structures and arrays have no value as read, so there is nothing to write
+                changes.append((child_path, child))
 
-        if list_of_items:
-            for data in data:
-                if isinstance(data, dict):
-                    for key, value in data.items():
-                        if key in existing_keys:
-                            item = existing_keys[key]
-                            if isinstance(value, dict):
-                                self.add_to_tree(value, item)
-                            else:
-                                item.setText(1, str(value))
-                        else:
-                            if isinstance(value, dict):
-                                new_item = QTreeWidgetItem(
-                                    parent, [key, ''])
-                                self.add_to_tree(value, new_item)
-                            elif isinstance(value, list):
-                                for i, v in enumerate(value):
-                                    if isinstance(v, dict):
-                                        new_item = QTreeWidgetItem(
-                                            parent, [f'{key}[{i}]', ''])
-                                        self.add_to_tree(v, new_item)
-                                    else:
-                                        new_item = QTreeWidgetItem(
-                                            parent, [f'{key}[{i}]', str(v)])
-                                        self.add_to_tree(v, new_item)
-                            else:
-                                new_item = QTreeWidgetItem(
-                                    parent, [key, str(value)])
-                if isinstance(data, list):
-                    for i, value in enumerate(data):
-                        if isinstance(value, dict):
-                            new_item = QTreeWidgetItem(parent, [f'{i}', ''])
-                            self.add_to_tree(value, new_item)
-                        elif isinstance(value, list):
-                            for j, v in enumerate(value):
-                                if isinstance(v, dict):
-                                    new_item = QTreeWidgetItem(
-                                        parent, [f'{i}[{j}]', ''])
-                                    self.add_to_tree(v, new_item)
-                                else:
-                                    new_item = QTreeWidgetItem(
-                                        parent, [f'{i}[{j}]', str(v)])
-                                    self.add_to_tree(v, new_item)
-                        else:
-                            new_item = QTreeWidgetItem(
-                                parent, [f'{i}', str(value)])
-        else:
-            if isinstance(data, dict):
-                for key, value in data.items():
-                    if key in existing_keys:
-                        item = existing_keys[key]
-                        if isinstance(value, dict):
-                            self.add_to_tree(value, item)
-                        else:
-                            item.setText(1, str(value))
-                    else:
-                        if isinstance(value, dict):
-                            new_item = QTreeWidgetItem(
-                                parent, [key, ''])
-                            self.add_to_tree(value, new_item)
-                        elif isinstance(value, list):
-                            for i, v in enumerate(value):
-                                if isinstance(v, dict):
-                                    new_item = QTreeWidgetItem(
-                                        parent, [f'{key}[{i}]', ''])
-                                    self.add_to_tree(v, new_item)
-                                else:
-                                    new_item = QTreeWidgetItem(
-                                        parent, [f'{key}[{i}]', str(v)])
-                                    self.add_to_tree(v, new_item)
-                        else:
-                            new_item = QTreeWidgetItem(
-                                parent, [key, str(value)])
-            if isinstance(data, list):
-                for i, value in enumerate(data):
-                    if isinstance(value, dict):
-                        new_item = QTreeWidgetItem(parent, [f'{i}', ''])
-                        self.add_to_tree(value, new_item)
-                    elif isinstance(value, list):
-                        for j, v in enumerate(value):
-                            if isinstance(v, dict):
-                                new_item = QTreeWidgetItem(
-                                    parent, [f'{i}[{j}]', ''])
-                                self.add_to_tree(v, new_item)
-                            else:
-                                new_item = QTreeWidgetItem(
-                                    parent, [f'{i}[{j}]', str(v)])
-                                self.add_to_tree(v, new_item)
-                    else:
-                        new_item = QTreeWidgetItem(
-                            parent, [f'{i}', str(value)])
+        return changes
 
-        self.tree.header().setSectionResizeMode(0, QHeaderView.ResizeToContents)
-        self.tree.header().setSectionResizeMode(1, QHeaderView.Stretch)
+    def add_to_tree(self, data, list_of_items=False):
+        self.tree_model.update(data, list_of_items)
 
     def handle_list_selection_changed(self):
         self.remove_tag_button.setEnabled(
@@ -2244,7 +3260,7 @@ class MainWindow(QMainWindow):
 
     def add_to_list(self):
         if check_plc_connection(plc, self):
-            tags = [t.strip() for t in self.tag_input.text().split(',')]
+            tags = split_tag_list(self.tag_input.text())
             for tag in tags:
                 if self.tag_input.hasAcceptableInput():
                     if self.is_valid_tag_input(tag, tag_types):
@@ -2368,19 +3384,12 @@ class MainWindow(QMainWindow):
 
     def is_valid_tag_input(self, tags, tag_types):
         # Validate format
-        pattern = r"^(?:Program:)?[A-Za-z_][A-Za-z\d_]*(?:\[\d+\])?(?:\.\w+(?:\[\d+\])?)*(?:\{\d+\})?(?:,\s*(?:Program:)?[A-Za-z_][A-Za-z\d_]*(?:\[\d+\])?(?:\.\w+(?:\[\d+\])?)*(?:\{\d+\})?)*$"
-        if not re.match(pattern, tags):
+        if not is_valid_format(tags):
             return False
 
-        # Process input by removing [x] and {x}
-        stripped_input = re.sub(r"(\[\d+\])|(\{\d+\})", "", tags)
-        input_tags = [tag.strip() for tag in stripped_input.split(',')]
-
-        # Check against dictionary
-        for input_tag in input_tags:
-            tag_components = input_tag.split('.')
-            # if not any(all(tc == kc.split('.')[i] for i, tc in enumerate(input_tag) if i < len(kc.split('.'))) for kc in tag_types):
-            if input_tag not in tag_types:
+        # Check against dictionary with [x] and {x} removed
+        for address in parse_tag_list(tags):
+            if address.base not in tag_types:
                 return False
 
         return True
@@ -2465,35 +3474,27 @@ class MainWindow(QMainWindow):
         
     @check_tag_decorator
     def write_from_tree(self):
-        data = self.get_value_tree_data(
-            self.value_tree.invisibleRootItem())
-
-        tags = []
-        formatted_tags = []
-        values = []
-
-        for key, value in data.items():
+        # only the values edited since the tree was read are written, members the PLC changed meanwhile are left alone
+        changes = self.get_value_tree_changes(self.value_tree.invisibleRootItem())
 
-            tags.append(key)
+        if not changes:
+            self.print_results("No values were changed.<br>")
+            return
 
-            # remove the [] from the tag name
-            key = re.sub(r'\[\d+\]', '', key)
+        tags = [tag for tag, _ in changes]
+        values = [set_data_type(item.text(1), parse_tag_address(tag).base) for tag, item in changes]
 
-            formatted_tags.append(key)
+        results = write_tag(tags, values, self, plc)
 
-            values.append(self.convert_write_values(value, key))
-
-        if len(tags) == 1:
-            tags = tags[0]
-            values = values[0]
-            formatted_tags = formatted_tags[0]
-
-        write_tag(tags, values, self, plc)
+        if results is not None:
+            for (_, item), result in zip(changes, results):
+                if not result.error:
+                    item.setData(1, Qt.UserRole, item.text(1))
 
     def verify_write_values(self):
         if not self.write_value.text() == '':
             values = [v.strip() for v in self.write_value.text().split(',')]
-            tags = [t.strip() for t in self.tag_input.text().split(',')]
+            tags = split_tag_list(self.tag_input.text())
 
             if len(values) != len(tags):
                 self.print_results(
@@ -2504,32 +3505,21 @@ class MainWindow(QMainWindow):
             self.print_results("No value entered.<br>", 'red')
 
     def print_results(self, results, color='white', newline=True):
+        self.results.log(results, color, newline)
 
-        cursor = self.results.textCursor()
-        cursor.movePosition(QTextCursor.End)
+    def update_trend_data(self):
+        deltas = self.trender.deltas
 
-        if newline:
-            cursor.insertHtml(
-                f"<span style='color: {color};'>{results}</span><br>")
-            # set scroll bar to bottom
-            self.results.verticalScrollBar().setValue(
-                self.results.verticalScrollBar().maximum())
-        else:
-            cursor.insertHtml(
-                f"<span style='color: {color};'>{results}</span>")
+        while deltas:
+            delta = deltas.popleft()
 
-    def update_trend_data(self, results, timestamps):
-        self.trender_results = results
-        self.trender_timestamps = timestamps
+            # a chart of the running trend is kept up to date
+            if self.chart_window is not None and self.chart_window.store is self.trender.store:
+                self.chart_window.apply(delta)
 
     def trender_thread(self):
         if self.trender.running:
-            if self.file_name.text() != '':
-                file_name = self.check_and_convert_file_name()
-            else:
-                file_name = ''
-            process_trend_data(self.trender.tags, self.trender.results, self.trender.timestamps, self.trender.single_tag,
-                               self.file_enabled.isChecked(), file_name, self.file_format_selection.currentIndex())
+            # the trend file is closed by the trender when it stops
             self.trender.stop()
             self.trend_button.setText("Start Trend")
         else:
@@ -2537,6 +3527,24 @@ class MainWindow(QMainWindow):
                 if self.tag_input.hasAcceptableInput():
                     if self.is_valid_tag_input(self.tag_input.text(), tag_types):
 
+                        try:
+                            groups = parse_trend_groups(self.trend_groups.text())
+                        except ValueError as e:
+                            self.print_results(f"{e}<br>", 'red')
+                            return
+
+                        if not all(self.is_valid_tag_input(tags, tag_types) for tags, _ in groups):
+                            self.print_results(
+                                "Tag or tags in the trend groups do not exist in PLC.", 'red')
+                            return
+
+                        try:
+                            trended = TrendGroups([(self.tag_input.text(), 1)] + groups).tags
+                            RecordingFilter(trended, parse_recording_policies(self.trend_recording.text()))
+                        except ValueError as e:
+                            self.print_results(f"{e}<br>", 'red')
+                            return
+
                         self.save_history()
 
                         if not self.trend_thread.isRunning():
@@ -2544,6 +3552,12 @@ class MainWindow(QMainWindow):
                             self.trender.tags = self.tag_input.text()
                             self.trender.interval = (
                                 self.trend_rate.value() * 1000)
+                            self.trender.groups = self.trend_groups.text()
+                            self.trender.policies = self.trend_recording.text()
+                            self.trender.catch_up = self.trend_catch_up.isChecked()
+                            self.trender.file_enabled = self.file_enabled.isChecked()
+                            self.trender.file_name = self.check_and_convert_file_name() if self.file_name.text() != '' else ''
+                            self.trender.file_format = 2 if self.trend_binary.isChecked() else self.file_format_selection.currentIndex()
                             self.trender.plc = plc
                             self.trender.main_window = self
                             self.trender.running = True
@@ -2571,7 +3585,7 @@ class MainWindow(QMainWindow):
             with open(file_name, 'w') as f:
 
                 if self.file_format == 0:
-                    yaml.safe_dump(yaml_data, f, default_flow_style=False)
+                    yaml_io.dump_items(yaml_data, f)
                 else:
                     writer = csv.writer(f, lineterminator='\n')
                     yaml_data_keys = yaml_data[0].keys()
@@ -2630,11 +3644,41 @@ class MainWindow(QMainWindow):
             else:
                 self.showNotConnectedDialog()
 
-    def start_plc_connection_check(self):
-        self.plc_connection_check_timer.start(5000)
+    def start_plc_connection_check(self, ip):
+        # a previous check may still be opening its driver to the old IP, it has to finish before starting again
+        if self.connection_supervisor_thread.isRunning():
+            self.connection_supervisor.stop()
+            # finished is queued to this thread, which is about to block, so the thread is told to quit directly
+            self.connection_supervisor_thread.quit()
+            self.connection_supervisor_thread.wait()
+
+        self.connection_supervisor.ip = ip
+        self.connection_supervisor.connected = True
+        self.connection_supervisor.running = True
+        self.connection_supervisor_thread.start()
+
+    def plc_connection_state_changed(self, connected):
+        if plc is None:
+            return
+
+        if connected:
+            self.print_results(f"Connection to PLC restored.<br>")
+            self.menu_status.setText(
+                f"Connected to {plc.info.get('name')} at {self.connection_supervisor.ip}")
+            self.enable_buttons()
+        else:
+            self.print_results(f"Lost connection to PLC.<br>", 'red')
+            self.menu_status.setText(
+                f"Lost connection to {self.connection_supervisor.ip}")
+            self.disable_buttons()
+
+    def plc_latency_updated(self, latency):
+        if plc is not None and self.connection_supervisor.connected:
+            self.menu_status.setText(
+                f"Connected to {plc.info.get('name')} at {self.connection_supervisor.ip} ({latency:.0f} ms)")
 
     def stop_plc_connection_check(self):
-        self.plc_connection_check_timer.stop()
+        self.connection_supervisor.stop()
         self.connect_button.setText("Connect")
         self.menu_status.setText("Disconnected")
         self.disable_buttons()
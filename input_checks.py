@@ -1,4 +1,4 @@
-import re
+from tag_address import parse_tag_address
 
 
 def check_if_tag_is_list(tag, tag_types):
@@ -7,7 +7,7 @@ def check_if_tag_is_list(tag, tag_types):
 
     Args:
         tag (str): The tag to check.
-        tag_types (dict): A dictionary containing tag types and their dimensions.
+        tag_types (TagIndex): The tag type index.
 
     Returns:
         bool: True if the tag is a list, False otherwise.
@@ -15,11 +15,11 @@ def check_if_tag_is_list(tag, tag_types):
     if tag_types is not None:
 
         # strip out the brackets
-        formatted_tag = re.sub(r"(\[\d+\])|(\{\d+\})", "", tag)
+        formatted_tag = parse_tag_address(tag).base
 
         if formatted_tag in tag_types:
-            dimensions = tag_types[formatted_tag]['dimensions']
-            if dimensions == [0, 0, 0]:
+            dimensions = tag_types[formatted_tag].dimensions
+            if dimensions == (0, 0, 0):
                 return False
             elif dimensions[0] > 0 or dimensions[1] > 0 or dimensions[2] > 0:
                 return True
@@ -39,40 +39,28 @@ def check_tag_range(tag, tag_types):
 
     Args:
         tag (str): The tag to be checked.
-        tag_types (dict): A dictionary containing information about tag types.
+        tag_types (TagIndex): The tag type index.
 
     Returns:
         bool: True if the tag is within the range of a tag, False otherwise.
     """
     if tag_types is not None:
-        # strip out the brackets
-        formatted_tag = re.sub(r"(\[\d+\])|(\{\d+\})", "", tag)
+        address = parse_tag_address(tag)
 
-        if formatted_tag in tag_types:
-            dimensions = tag_types[formatted_tag]['dimensions']
+        if address.base in tag_types:
+            dimensions = tag_types[address.base].dimensions
 
             # if tag is a list
             if dimensions[0] > 0:
+                list_size = address.element_count
+                start_pos = address.linear_index(dimensions)
 
-                # get the size of the tag inputted if it has {}
-                if '{' in tag and '}' in tag:
-                    list_size = int(tag[tag.find('{')+1:tag.find('}')])
-
-                    # get the start position of the tag inputted if it has []
-                    if '[' in tag and ']' in tag:
-                        start_pos = int(tag[tag.find('[')+1:tag.find(']')])
-                    else:
-                        start_pos = 0
-                else:
-                    list_size = 1
+                total_size = 1
+                for dimension in dimensions:
+                    if dimension > 0:
+                        total_size *= dimension
 
-                    # get the start position of the tag inputted if it has []
-                    if '[' in tag and ']' in tag:
-                        start_pos = int(tag[tag.find('[')+1:tag.find(']')])
-                    else:
-                        start_pos = 0
-
-                if start_pos + list_size <= dimensions[0]:
+                if start_pos + list_size <= total_size:
                     return True
                 else:
                     return False
@@ -95,10 +83,7 @@ def get_tag_length(tag):
         int: The length of the tag. If the tag is enclosed in curly braces,
              the length is extracted from the tag. Otherwise, the length is 1.
     """
-    if '{' in tag and '}' in tag:
-        return int(tag[tag.find('{')+1:tag.find('}')])
-    else:
-        return 1
+    return parse_tag_address(tag).element_count
 
 
 def get_tag_start_pos(tag):
@@ -111,10 +96,7 @@ def get_tag_start_pos(tag):
     Returns:
     int: The start position of the tag if it has [], otherwise 0.
     """
-    if '[' in tag and ']' in tag:
-        return int(tag[tag.find('[')+1:tag.find(']')])
-    else:
-        return 0
+    return parse_tag_address(tag).start_index
 
 
 def get_tag_type(tag, tag_types):
@@ -123,16 +105,16 @@ def get_tag_type(tag, tag_types):
 
     Parameters:
     tag (str): The tag name.
-    tag_types (dict): A dictionary containing tag names as keys and their corresponding data types as values.
+    tag_types (TagIndex): The tag type index.
 
     Returns:
     str or None: The data type of the tag if it exists in the tag_types dictionary, None otherwise.
     """
-    formatted_tag = re.sub(r"(\[\d+\])|(\{\d+\})", "", tag)
+    formatted_tag = parse_tag_address(tag).base
 
     if tag_types is not None:
         if formatted_tag in tag_types:
-            return tag_types[formatted_tag]['data_type']
+            return tag_types[formatted_tag].data_type
         else:
             return None
     else:
@@ -148,17 +130,17 @@ def check_value_type(tag, value, tag_types):
     Args:
         tag (str): The tag to check the value against.
         value (str): The value to be checked.
-        tag_types (dict): A dictionary containing the data types and dimensions of tags.
+        tag_types (TagIndex): The tag type index.
 
     Returns:
         bool: True if the value matches the expected type, False otherwise.
     """
-    formatted_tag = re.sub(r"(\[\d+\])|(\{\d+\})", "", tag)
+    formatted_tag = parse_tag_address(tag).base
 
     if tag_types is not None:
         if formatted_tag in tag_types:
-            type = tag_types[formatted_tag]['data_type']
-            dimensions = tag_types[formatted_tag]['dimensions']
+            type = tag_types[formatted_tag].data_type
+            dimensions = tag_types[formatted_tag].dimensions
 
         if dimensions[0] == 0:
             if type == 'BOOL':
@@ -199,12 +181,12 @@ def check_value_length(tag, value, tag_types):
     Args:
         tag (str): The tag name.
         value (str): The value to be checked.
-        tag_types (list): List of tag types.
+        tag_types (TagIndex): The tag type index.
 
     Returns:
         bool: True if the length matches, False otherwise.
     """
-    formatted_tag = re.sub(r"(\[\d+\])|(\{\d+\})", "", tag)
+    formatted_tag = parse_tag_address(tag).base
 
     if tag_types is not None:
         if formatted_tag in tag_types:
@@ -14,8 +14,11 @@ class Tag:
 
 class LogixDriver():
 
-    def __init__(self, ip):
+    def __init__(self, ip, **kwargs):
         self.connected = False
+        self.info = {'name': 'Logix', 'serial': 'offline', 'revision': {'major': 0, 'minor': 0}}
+        self._tags = {}
+        self._data_types = {}
 
         with open('tag_list.json') as f:
             self.tags_json = json.loads(f.read())
@@ -75,5 +78,8 @@ class LogixDriver():
     def open(self):
         self.connected = True
 
+    def get_tag_list(self, program=None):
+        return list(self.tags_json.values())
+
     def get_plc_name(self):
         return "Logix"
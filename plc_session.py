@@ -0,0 +1,163 @@
+import time
+import threading
+
+from pycomm3.exceptions import CommError
+
+
+class ConnectionLost(CommError):
+    """
+    Raised when a request fails because the connection to the PLC was lost.
+    """
+
+
+class PLCSession:
+    """
+    A connection to a PLC shared by the GUI and the worker threads.
+
+    Requests are made one at a time so threads never interleave messages on
+    the driver's socket. When a request fails with a communication error the
+    connection is closed and ConnectionLost is raised, the caller can then
+    wait for reconnect() and replay the request. Reconnecting re-opens the
+    same driver, so the tag definitions loaded on connect are kept and do
+    not have to be uploaded again.
+
+    Attributes:
+    - driver (LogixDriver): the driver used for requests
+    - retry_delay (float): the seconds to wait after the first failed reconnect
+    - max_retry_delay (float): the longest wait between reconnect attempts
+    - backoff (float): the factor the wait is multiplied by after each failed attempt
+    - lost_at (float): the time.time() the connection was lost, None while connected
+    """
+
+    def __init__(self, driver, retry_delay=0.5, max_retry_delay=30, backoff=2):
+        self.driver = driver
+        self.retry_delay = retry_delay
+        self.max_retry_delay = max_retry_delay
+        self.backoff = backoff
+        self.lost_at = None
+        self.closed = False
+        self.lock = threading.RLock()
+
+    def __getattr__(self, name):
+        # anything not wrapped here (info, tags, tags_json...) comes from the driver
+        return getattr(self.driver, name)
+
+    @property
+    def connected(self):
+        return self.driver.connected
+
+    def open(self):
+        """
+        Opens the connection to the PLC.
+
+        Returns:
+            bool: True if the connection was opened, False otherwise.
+        """
+        with self.lock:
+            self.closed = False
+
+            if self.driver.open():
+                self.lost_at = None
+                return True
+
+            return False
+
+    def close(self):
+        """
+        Closes the connection and stops any reconnect in progress.
+
+        Returns:
+            None
+        """
+        with self.lock:
+            self.closed = True
+            self._close_driver()
+
+    def _close_driver(self):
+        try:
+            self.driver.close()
+        except CommError:
+            pass
+
+    def request(self, method, *args, **kwargs):
+        """
+        Makes a request with the driver, opening the connection first if it was lost.
+
+        Args:
+            method (str): The name of the driver method to call.
+            *args: The arguments of the request.
+            **kwargs: The keyword arguments of the request.
+
+        Returns:
+            The result of the driver method.
+
+        Raises:
+            ConnectionLost: If the PLC could not be reached.
+        """
+        with self.lock:
+            if self.closed:
+                raise ConnectionLost('connection is closed')
+
+            try:
+                if not self.driver.connected and not self.driver.open():
+                    raise CommError('failed to open a connection')
+
+                result = getattr(self.driver, method)(*args, **kwargs)
+            except (CommError, OSError) as e:
+                if self.lost_at is None:
+                    self.lost_at = time.time()
+                self._close_driver()
+                raise ConnectionLost(str(e)) from e
+
+            self.lost_at = None
+
+            return result
+
+    def read(self, *tags):
+        return self.request('read', *tags)
+
+    def write(self, *tags_values):
+        return self.request('write', *tags_values)
+
+    def get_plc_name(self):
+        return self.request('get_plc_name')
+
+    def reconnect(self, keep_trying=None):
+        """
+        Re-opens the connection, waiting longer after each failed attempt.
+
+        The lock is only held while an attempt is made so other threads are
+        not blocked while waiting between attempts.
+
+        Args:
+            keep_trying (callable, optional): Called before each attempt, reconnecting stops when it returns False.
+
+        Returns:
+            bool: True if the connection was opened, False if it was closed or keep_trying returned False.
+        """
+        delay = self.retry_delay
+
+        while not self.closed and (keep_trying is None or keep_trying()):
+            with self.lock:
+                if self.driver.connected:
+                    self.lost_at = None
+                    return True
+
+                try:
+                    if self.driver.open():
+                        self.lost_at = None
+                        return True
+                except (CommError, OSError) as e:
+                    print(f"Reconnect to PLC failed, retrying in {delay:.1f} s: {e}")
+
+                self._close_driver()
+
+            wait_until = time.monotonic() + delay
+            while time.monotonic() < wait_until:
+                if self.closed or (keep_trying is not None and not keep_trying()):
+                    return False
+                time.sleep(0.1)
+
+            delay = min(delay * self.backoff, self.max_retry_delay)
+
+        return False
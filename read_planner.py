@@ -0,0 +1,245 @@
+from pycomm3 import Tag
+
+from tag_address import parse_tag_address
+
+# read the whole structure once at least this share of its members are requested
+STRUCTURE_READ_RATIO = 0.5
+
+# never read a whole structure for fewer members than this
+MIN_STRUCTURE_MEMBERS = 2
+
+
+def split_member(address):
+    """
+    Splits the last member from a tag address.
+
+    Args:
+        address (TagAddress): The parsed tag address.
+
+    Returns:
+        tuple: The parent address and member name, or (None, None) if the address has no parent structure.
+    """
+    name = address.name
+    position = name.rfind('.')
+
+    if position == -1 or name.startswith('Program:') and name.count('.') == 1:
+        return None, None
+
+    return name[:position], name[position + 1:]
+
+
+class ReadPlan:
+    """
+    The requests needed to read a list of tags with as few services as possible.
+
+    Tags are deduplicated, members of the same structure are read with one
+    read of the structure when enough of them are asked for, and
+    overlapping or adjacent ranges of the same array are merged into one
+    ranged read. The values of the requests are then handed back out to
+    the tags as they were asked for. When a merged request fails its tags
+    are read one by one, so one element or member that cannot be read
+    does not fail the tags read with it.
+
+    A plan only depends on the tags and tag types, so workers that read
+    the same tags every interval build it once.
+
+    Attributes:
+    - tags (list): the tag addresses as asked for
+    - requests (list): the tag addresses sent to the PLC
+    - sources (list): for each tag, the request index, the element offset and
+      count to take from it (None to take the whole value) and the member
+      name and data type to take from it (None if the tag was read directly)
+    """
+
+    def __init__(self, tags, tag_types=None):
+        self.tags = [parse_tag_address(tag).tag for tag in tags]
+        self.requests = []
+        self.sources = []
+
+        targets = self.plan_structures(tag_types)
+        self.plan_ranges(targets)
+
+    def plan_structures(self, tag_types):
+        """
+        Decides which tags are read through their parent structure.
+
+        Args:
+            tag_types (TagIndex): The tag type index, structures are not collapsed without it.
+
+        Returns:
+            list: The (address to read, member) of each tag, the member is a (name, data type) tuple or None.
+        """
+        targets = [(tag, None) for tag in self.tags]
+
+        if tag_types is None:
+            return targets
+
+        members = {}
+
+        for i, tag in enumerate(self.tags):
+            address = parse_tag_address(tag)
+
+            if address.has_count or address.has_index:
+                continue
+
+            parent, member = split_member(address)
+
+            if parent is None:
+                continue
+
+            members.setdefault(parent, {}).setdefault(member, []).append(i)
+
+        for parent, requested in members.items():
+            if len(requested) < MIN_STRUCTURE_MEMBERS:
+                continue
+
+            parent_base = parse_tag_address(parent).base
+
+            if parent_base not in tag_types or not tag_types[parent_base].structure:
+                continue
+
+            children = tag_types.children(parent_base)
+
+            if any(member not in children for member in requested):
+                continue
+
+            if len(requested) < len(children) * STRUCTURE_READ_RATIO:
+                continue
+
+            for member, indexes in requested.items():
+                data_type = tag_types[f'{parent_base}.{member}'].data_type
+                for i in indexes:
+                    targets[i] = (parent, (member, data_type))
+
+        return targets
+
+    def plan_ranges(self, targets):
+        """
+        Merges the array ranges of the addresses to read and builds the requests.
+
+        Args:
+            targets (list): The (address to read, member) of each tag.
+
+        Returns:
+            None
+        """
+        ranges = {}
+        requests = {}
+
+        for i, (target, member) in enumerate(targets):
+            address = parse_tag_address(target)
+
+            if len(address.indices) == 1:
+                ranges.setdefault(address.array_name, []).append(
+                    (address.start_index, address.element_count, address.has_count, i))
+            else:
+                requests.setdefault(target, []).append((None, member, i))
+
+        for array_name, elements in ranges.items():
+            elements.sort()
+
+            merged = []
+            for start, count, has_count, i in elements:
+                if merged and start <= merged[-1][1]:
+                    merged[-1][1] = max(merged[-1][1], start + count)
+                    merged[-1][2].append((start, count, has_count, i))
+                else:
+                    merged.append([start, start + count, [(start, count, has_count, i)]])
+
+            for start, end, members in merged:
+                if all(s == start and s + c == end for s, c, _, _ in members):
+                    # nothing to merge, read the address as given
+                    for _, _, _, i in members:
+                        target, member = targets[i]
+                        requests.setdefault(target, []).append((None, member, i))
+                    continue
+
+                request = f'{array_name}[{start}]{{{end - start}}}'
+
+                for s, c, has_count, i in members:
+                    requests.setdefault(request, []).append(
+                        ((s - start, c if has_count else None), targets[i][1], i))
+
+        self.sources = [None] * len(targets)
+
+        for request, tags in requests.items():
+            for elements, member, i in tags:
+                self.sources[i] = (len(self.requests), elements, member)
+            self.requests.append(request)
+
+    def read(self, plc):
+        """
+        Reads the tags of the plan.
+
+        Args:
+            plc (LogixDriver): The driver or PLC session to read with.
+
+        Returns:
+            list: A pycomm3 Tag for each tag in the order they were asked for.
+        """
+        results = plc.read(*self.requests)
+
+        if not isinstance(results, list):
+            results = [results]
+
+        tags = self.fan_out(results)
+
+        # tags taken from a merged range or structure read that failed are read on their own
+        retry = [i for i, (request, elements, member) in enumerate(self.sources)
+                 if results[request].error and (elements is not None or member is not None)]
+
+        if retry:
+            addresses = list(dict.fromkeys(self.tags[i] for i in retry))
+            retried = plc.read(*addresses)
+
+            if not isinstance(retried, list):
+                retried = [retried]
+
+            retried = dict(zip(addresses, retried))
+
+            for i in retry:
+                result = retried[self.tags[i]]
+                tags[i] = Tag(self.tags[i], result.value, result.type, result.error)
+
+        return tags
+
+    def fan_out(self, results):
+        """
+        Takes the value of each tag from the results of the requests.
+
+        Args:
+            results (list): The pycomm3 Tag for each request.
+
+        Returns:
+            list: A pycomm3 Tag for each tag in the order they were asked for.
+        """
+        tags = []
+
+        for tag, (request, elements, member) in zip(self.tags, self.sources):
+            result = results[request]
+            value = result.value
+            data_type = result.type
+            error = result.error
+
+            if error is None and elements is not None:
+                offset, count = elements
+                data_type = data_type.split('[')[0] if data_type else data_type
+
+                if count is None:
+                    value = value[offset]
+                else:
+                    value = value[offset:offset + count]
+                    data_type = f'{data_type}[{count}]'
+
+            if error is None and member is not None:
+                name, data_type = member
+
+                if isinstance(value, dict) and name in value:
+                    value = value[name]
+                else:
+                    value = None
+                    error = f'Member {name} not found in {result.tag}'
+
+            tags.append(Tag(tag, value, data_type, error))
+
+        return tags
@@ -0,0 +1,400 @@
+import numpy as np
+
+from tag_address import parse_tag_address, split_tag_list
+
+# recording modes, every sample, changed values only, or values outside a deadband
+MODES = ('all', 'change', 'absolute', 'percent')
+
+
+class RecordingPolicy:
+    """
+    Decides which values read from a tag are recorded.
+
+    A value is recorded when it differs from the last value recorded, by
+    more than the deadband for absolute and percent modes, or when the
+    heartbeat has passed since the last value recorded. Deadbands only
+    apply to numbers, other values are recorded when they change. A value
+    that is not recorded is the same as the last one recorded, within the
+    deadband, so the trend can be rebuilt as a step series.
+
+    Attributes:
+    - mode (str): 'all', 'change', 'absolute' or 'percent'
+    - deadband (float): the change needed to record a number, in the units of the tag or in percent of the last value recorded
+    - heartbeat (float): the longest time between recorded values in seconds, None for no limit
+    - last_value (any): the last value recorded
+    - last_time (float): the time of the last value recorded in milliseconds, None before the first
+    """
+
+    def __init__(self, mode='all', deadband=0.0, heartbeat=None):
+        if mode not in MODES:
+            raise ValueError(f'Unknown recording mode {mode}')
+
+        self.mode = mode
+        self.deadband = deadband
+        self.heartbeat = heartbeat
+        self.last_value = None
+        self.last_time = None
+
+    def describe(self):
+        """
+        Gets the settings of the policy, as stored in trend files.
+
+        Returns:
+            dict: The mode, deadband and heartbeat.
+        """
+        return {'mode': self.mode, 'deadband': self.deadband, 'heartbeat': self.heartbeat}
+
+    def reset(self):
+        """
+        Forgets the last value recorded so the next value is recorded, after a gap in the trend.
+
+        Returns:
+            None
+        """
+        self.last_value = None
+        self.last_time = None
+
+    def changed(self, value):
+        """
+        Checks a value against the last value recorded.
+
+        Args:
+            value (any): The value read.
+
+        Returns:
+            bool: True if the value should be recorded.
+        """
+        last = self.last_value
+
+        if self.mode == 'all' or self.last_time is None:
+            return True
+
+        numbers = (isinstance(value, (int, float)) and isinstance(last, (int, float))
+                   and not isinstance(value, bool) and not isinstance(last, bool))
+
+        if self.mode == 'change' or not numbers:
+            return value != last
+
+        if self.mode == 'absolute':
+            return abs(value - last) > self.deadband
+
+        return abs(value - last) > abs(last) * self.deadband / 100 or (last == 0 and value != 0)
+
+    def record(self, timestamp, value):
+        """
+        Decides if a value is recorded and keeps it as the last value if it is.
+
+        Args:
+            timestamp (float): The time of the value in milliseconds.
+            value (any): The value read.
+
+        Returns:
+            bool: True if the value is recorded.
+        """
+        due = (self.heartbeat is not None and self.last_time is not None
+               and timestamp - self.last_time >= self.heartbeat * 1000)
+
+        if due or self.changed(value):
+            self.last_value = value
+            self.last_time = timestamp
+            return True
+
+        return False
+
+
+def parse_policy(rule):
+    """
+    Parses a recording rule, a mode followed by an optional heartbeat.
+
+    Examples: "change", "0.5", "2%", "change every 60", "every 60"
+
+    Args:
+        rule (str): The rule.
+
+    Returns:
+        RecordingPolicy: The policy.
+
+    Raises:
+        ValueError: If the rule is not valid.
+    """
+    words = rule.split()
+    heartbeat = None
+
+    if len(words) >= 2 and words[-2].lower() == 'every':
+        try:
+            heartbeat = float(words[-1])
+        except ValueError:
+            raise ValueError(f"Recording rule '{rule}' has an invalid heartbeat") from None
+
+        if heartbeat <= 0:
+            raise ValueError(f"Recording rule '{rule}' needs a heartbeat above 0")
+
+        words = words[:-2]
+
+    if len(words) > 1:
+        raise ValueError(f"Recording rule '{rule}' is not valid")
+
+    # a heartbeat alone records changes, a rule with nothing in it is a mistake
+    if not words and heartbeat is None:
+        raise ValueError(f"Recording rule '{rule}' is not valid, use all, change, a deadband or a percent")
+
+    word = words[0].lower() if words else 'change'
+
+    if word in ('all', 'change'):
+        return RecordingPolicy(word, heartbeat=heartbeat)
+
+    mode = 'percent' if word.endswith('%') else 'absolute'
+
+    try:
+        deadband = float(word.rstrip('%'))
+    except ValueError:
+        raise ValueError(f"Recording rule '{rule}' is not valid, use all, change, a deadband or a percent") from None
+
+    if deadband < 0:
+        raise ValueError(f"Recording rule '{rule}' needs a deadband of 0 or more")
+
+    return RecordingPolicy(mode, deadband, heartbeat)
+
+
+def parse_recording_policies(text):
+    """
+    Parses recording policies written as tags and a rule, policies are separated by semicolons, * is every other tag.
+
+    Example: "Level, Flow @ 0.5 every 60; Status @ change; * @ 1%"
+
+    Args:
+        text (str): The recording policies.
+
+    Returns:
+        list: The (tags, rule) of each policy.
+
+    Raises:
+        ValueError: If a policy has no tags or an invalid rule.
+    """
+    policies = []
+
+    for entry in text.split(';'):
+        if not entry.strip():
+            continue
+
+        tags, separator, rule = entry.rpartition('@')
+
+        if not separator or not tags.strip():
+            raise ValueError(f"Recording policy '{entry.strip()}' needs tags and a rule, e.g. Tag1 @ 0.5 every 60")
+
+        parse_policy(rule.strip())
+        policies.append((tags.strip(), rule.strip()))
+
+    return policies
+
+
+class RecordingFilter:
+    """
+    Applies the recording policy of each tag of a trend to its samples.
+
+    Values that are not recorded are left out of the sample as missing
+    values, and a sample with no value recorded is not kept at all. The
+    last value read of each tag that was left out is held, and written by
+    flush before a gap or at the end of the trend, so every value left out
+    is the same as the one recorded before it and the trend can be
+    rebuilt exactly as a step series with hold_steps.
+
+    Attributes:
+    - tags (list): the tag of each column
+    - policies (list): the RecordingPolicy of each column
+    - held (dict): the (timestamp, value) of the last value read of each column that was not recorded
+    - last_time (float): the time of the last sample kept in milliseconds, None before the first
+    """
+
+    def __init__(self, tags, policies=()):
+        self.tags = list(tags)
+        self.held = {}
+        self.last_time = None
+
+        rules = {}
+        default = 'all'
+        columns = {parse_tag_address(tag).tag: i for i, tag in enumerate(self.tags)}
+
+        for tags_text, rule in policies:
+            for tag in split_tag_list(tags_text):
+                if tag.strip() == '*':
+                    default = rule
+                elif parse_tag_address(tag).tag in columns:
+                    rules[columns[parse_tag_address(tag).tag]] = rule
+                else:
+                    raise ValueError(f'{tag} has a recording policy but is not trended')
+
+        self.policies = [parse_policy(rules.get(i, default)) for i in range(len(self.tags))]
+
+    @property
+    def records_all(self):
+        """
+        bool: Whether every value is recorded.
+        """
+        return all(policy.mode == 'all' and policy.heartbeat is None for policy in self.policies)
+
+    def describe(self):
+        """
+        Gets the settings of each column, as stored in trend files.
+
+        Returns:
+            list: The settings of each column.
+        """
+        return [policy.describe() for policy in self.policies]
+
+    def apply(self, timestamp, values, read):
+        """
+        Leaves the values that are not recorded out of a sample.
+
+        Args:
+            timestamp (float): The time of the sample in milliseconds.
+            values (list): The value of each column.
+            read (list): False for each column that was not read in the sample.
+
+        Returns:
+            tuple: The values and read flags to keep, None if no value is recorded.
+        """
+        values = list(values)
+        read = list(read)
+
+        for i, policy in enumerate(self.policies):
+            if not read[i]:
+                continue
+
+            if policy.record(timestamp, values[i]):
+                self.held.pop(i, None)
+            else:
+                self.held[i] = (timestamp, values[i])
+                values[i] = None
+                read[i] = False
+
+        if not any(read):
+            return None
+
+        self.last_time = timestamp
+
+        return values, read
+
+    def flush(self):
+        """
+        Takes the held values, to be written as a last sample before a gap or at the end of the trend.
+
+        Only the values that differ from the last value recorded are taken,
+        the others are already rebuilt by holding the last value. The sample
+        is stamped after the last sample kept, so it is never a second
+        sample at the same time.
+
+        Returns:
+            tuple: The timestamp, values and read flags of the sample, None if no held value differs.
+        """
+        held = {i: (held_time, value) for i, (held_time, value) in self.held.items()
+                if value != self.policies[i].last_value}
+        self.held = {}
+
+        if not held:
+            return None
+
+        timestamp = max(held_time for held_time, _ in held.values())
+
+        if self.last_time is not None and timestamp <= self.last_time:
+            timestamp = float(np.nextafter(self.last_time, np.inf))
+
+        values = [None] * len(self.tags)
+        read = [False] * len(self.tags)
+
+        for i, (_, value) in held.items():
+            values[i] = value
+            read[i] = True
+            self.policies[i].last_value = value
+            self.policies[i].last_time = timestamp
+
+        self.last_time = timestamp
+
+        return timestamp, values, read
+
+    def reset(self):
+        """
+        Starts over after a gap, the next value of every tag is recorded.
+
+        Returns:
+            None
+        """
+        self.held = {}
+        self.last_time = None
+
+        for policy in self.policies:
+            policy.reset()
+
+
+def hold_steps(valid, columns):
+    """
+    Rebuilds the values left out of a trend recorded by exception, each missing value is the last value recorded before it.
+
+    Rows where every value is missing are gaps, values are not held across them.
+
+    Args:
+        valid (numpy.ndarray): A row per sample and a column per tag, False where the value is missing.
+        columns (list): The values of each tag.
+
+    Returns:
+        tuple: The valid mask and columns with the held values filled in.
+    """
+    gaps = ~valid.any(axis=1)
+    filled_valid = np.empty_like(valid)
+    filled = []
+
+    for i, column in enumerate(columns):
+        # the row of the last value recorded, or of the last gap, at or before each row
+        rows = np.arange(len(column))
+        source = np.maximum.accumulate(np.where(valid[:, i] | gaps, rows, -1))
+
+        has_source = source >= 0
+        source = np.where(has_source, source, 0)
+        filled_valid[:, i] = has_source & valid[source, i] & ~gaps
+        filled.append(column[source])
+
+    return filled_valid, filled
+
+
+class StepHolder:
+    """
+    Rebuilds the values left out of a trend recorded by exception block by block, with hold_steps.
+
+    The last row of each block is kept so the values recorded in one block
+    are held into the next, as they would be if the trend was one block.
+
+    Attributes:
+    - last (tuple): the valid mask and values of the last row filled in, None before the first block
+    """
+
+    def __init__(self):
+        self.last = None
+
+    def fill(self, valid, columns):
+        """
+        Fills in the held values of the next block of the trend.
+
+        Args:
+            valid (numpy.ndarray): A row per sample and a column per tag, False where the value is missing.
+            columns (list): The values of each tag.
+
+        Returns:
+            tuple: The valid mask and columns with the held values filled in.
+        """
+        if len(valid) == 0:
+            return valid, columns
+
+        # the last row filled in leads the block, a gap row stays a gap so nothing is held across it
+        if self.last is not None:
+            valid = np.concatenate([self.last[0], valid])
+            columns = [np.concatenate([last, column]) for last, column in zip(self.last[1], columns)]
+
+        filled_valid, filled = hold_steps(valid, columns)
+
+        if self.last is not None:
+            filled_valid = filled_valid[1:]
+            filled = [column[1:] for column in filled]
+
+        self.last = (filled_valid[-1:].copy(), [column[-1:].copy() for column in filled])
+
+        return filled_valid, filled
@@ -0,0 +1,141 @@
+import math
+import time
+
+
+class FixedRateScheduler:
+    """
+    Wakes at evenly spaced deadlines on the monotonic clock.
+
+    Each deadline is the start time plus a whole number of periods, so the
+    time spent reading and formatting a sample never pushes the following
+    samples back. When a sample takes longer than a period the missed ticks
+    are either skipped, keeping samples on the original grid, or made up by
+    running them back to back.
+
+    Attributes:
+    - period (float): the time between samples in seconds
+    - catch_up (bool): run missed ticks back to back instead of skipping them
+    - start (float): the monotonic time of the first tick
+    - tick (int): the number of the current tick, the first is 0
+    - samples (int): the number of ticks run
+    - overruns (int): the number of times a sample took longer than a period
+    - dropped (int): the number of ticks skipped because of overruns
+    """
+
+    def __init__(self, period, catch_up=False):
+        self.period = period
+        self.catch_up = catch_up
+        self.start = None
+        self.tick = 0
+        self.samples = 0
+        self.overruns = 0
+        self.dropped = 0
+
+        # running mean and variance of how late each tick woke up (Welford)
+        self.jitter_mean = 0.0
+        self.jitter_m2 = 0.0
+        self.jitter_max = 0.0
+
+    def skip_missed(self):
+        """
+        Moves the schedule past the ticks missed during a pause without counting them as overruns.
+
+        Returns:
+            None
+        """
+        if self.start is not None:
+            self.tick = max(self.tick, math.floor(self.elapsed() / self.period))
+
+    @property
+    def deadline(self):
+        """
+        float: The monotonic time the current tick is due.
+        """
+        return self.start + self.tick * self.period
+
+    def elapsed(self):
+        """
+        Gets the time since the first tick.
+
+        Returns:
+            float: The elapsed time in seconds.
+        """
+        return time.monotonic() - self.start
+
+    def wait(self, keep_running=None, resolution=0.1):
+        """
+        Waits until the next tick is due.
+
+        The first call returns right away and starts the schedule. Long waits
+        are made in steps so a stop request is noticed quickly.
+
+        Args:
+            keep_running (callable, optional): Checked while waiting, the wait ends early when it returns False.
+            resolution (float, optional): The longest single sleep in seconds.
+
+        Returns:
+            bool: True when the tick is due, False if keep_running returned False.
+        """
+        now = time.monotonic()
+
+        if self.start is None:
+            self.start = now
+            self.record(0.0)
+            return True
+
+        self.tick += 1
+
+        if now > self.deadline:
+            self.overruns += 1
+
+            if not self.catch_up:
+                # move to the first deadline still ahead, skipping the missed ticks
+                missed = math.ceil((now - self.deadline) / self.period)
+                self.tick += missed
+                self.dropped += missed
+
+        while True:
+            remaining = self.deadline - time.monotonic()
+
+            if remaining <= 0:
+                break
+
+            if keep_running is not None and not keep_running():
+                return False
+
+            time.sleep(min(remaining, resolution))
+
+        self.record(time.monotonic() - self.deadline)
+
+        return True
+
+    def record(self, lateness):
+        self.samples += 1
+
+        delta = lateness - self.jitter_mean
+        self.jitter_mean += delta / self.samples
+        self.jitter_m2 += delta * (lateness - self.jitter_mean)
+        self.jitter_max = max(self.jitter_max, lateness)
+
+    @property
+    def jitter_stdev(self):
+        """
+        float: The standard deviation of how late the ticks woke up in seconds.
+        """
+        return math.sqrt(self.jitter_m2 / self.samples) if self.samples else 0.0
+
+    def stats(self):
+        """
+        Gets the timing statistics of the run.
+
+        Returns:
+            dict: The samples, overruns, dropped ticks and the jitter mean, standard deviation and maximum in ms.
+        """
+        return {
+            'samples': self.samples,
+            'overruns': self.overruns,
+            'dropped': self.dropped,
+            'jitter_mean_ms': self.jitter_mean * 1000,
+            'jitter_stdev_ms': self.jitter_stdev * 1000,
+            'jitter_max_ms': self.jitter_max * 1000,
+        }
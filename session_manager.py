@@ -0,0 +1,304 @@
+from collections.abc import Mapping
+from concurrent.futures import ThreadPoolExecutor
+
+from pycomm3 import Tag
+
+from tag_address import PLC_SEPARATOR, split_plc_name
+
+
+class SessionManager:
+    """
+    A pool of named PLC sessions used as one connection.
+
+    Tags are addressed to a PLC by prefixing them with its name
+    (Line2::Foo.Bar), tags without a name go to the PLC connected from the
+    main window, which is stored under the name ''. Reads and writes that
+    address more than one PLC are split per PLC and sent on seperate
+    threads at the same time, then put back together in the order the tags
+    were given. Attributes not defined here come from the main session.
+
+    Attributes:
+    - sessions (dict): the PLCSession of each PLC keyed by name
+    - indexes (dict): the TagIndex of each PLC keyed by name
+    - tag_types (SessionTagTypes): the tag types of every PLC, keyed by the prefixed tag
+    """
+
+    def __init__(self):
+        self.sessions = {}
+        self.indexes = {}
+        self.tag_types = SessionTagTypes(self)
+        self.executor = None
+        self.workers = 0
+
+    def __getattr__(self, name):
+        if name == 'sessions' or '' not in self.sessions:
+            raise AttributeError(name)
+
+        return getattr(self.sessions[''], name)
+
+    @property
+    def default(self):
+        """
+        PLCSession: The session of the PLC connected from the main window.
+        """
+        return self.get('')
+
+    @property
+    def connected(self):
+        return '' in self.sessions and self.default.connected
+
+    @property
+    def lost_at(self):
+        """
+        float: The earliest time a session lost its connection, None if all are connected.
+        """
+        lost = [session.lost_at for session in self.sessions.values() if session.lost_at is not None]
+
+        return min(lost) if lost else None
+
+    def add(self, name, session, tag_types):
+        """
+        Adds a connected session to the pool, replacing any session with the same name.
+
+        Args:
+            name (str): The name used to address the PLC, '' for the main PLC.
+            session (PLCSession): The open session.
+            tag_types (TagIndex): The tag type index of the PLC.
+
+        Returns:
+            None
+        """
+        if name in self.sessions:
+            self.remove(name)
+
+        self.sessions[name] = session
+        self.indexes[name] = tag_types
+
+    def remove(self, name):
+        """
+        Closes a session and removes it from the pool.
+
+        Args:
+            name (str): The name of the PLC.
+
+        Returns:
+            None
+        """
+        session = self.sessions.pop(name, None)
+        self.indexes.pop(name, None)
+
+        if session is not None:
+            session.close()
+
+    def get(self, name):
+        """
+        Gets the session of a PLC.
+
+        Args:
+            name (str): The name of the PLC.
+
+        Returns:
+            PLCSession: The session.
+
+        Raises:
+            KeyError: If there is no PLC with the name.
+        """
+        try:
+            return self.sessions[name]
+        except KeyError:
+            raise KeyError(f'No PLC named {name}' if name else 'Not connected to a PLC') from None
+
+    def names(self):
+        """
+        Gets the names of the additional PLCs.
+
+        Returns:
+            list: The sorted PLC names, without the main PLC.
+        """
+        return sorted(name for name in self.sessions if name)
+
+    def close(self):
+        """
+        Closes every session.
+
+        Returns:
+            None
+        """
+        for name in list(self.sessions):
+            self.remove(name)
+
+        if self.executor is not None:
+            self.executor.shutdown(wait=False)
+            self.executor = None
+            self.workers = 0
+
+    def reconnect(self, keep_trying=None):
+        """
+        Reconnects every session that lost its connection.
+
+        Args:
+            keep_trying (callable, optional): Called before each attempt, reconnecting stops when it returns False.
+
+        Returns:
+            bool: True if every session is connected, False otherwise or if there are no sessions left to read from.
+        """
+        # after a disconnect there is nothing to reconnect, callers stop rather than read an empty pool again
+        if not self.sessions:
+            return False
+
+        for session in list(self.sessions.values()):
+            if not session.connected and not session.reconnect(keep_trying):
+                return False
+
+        return True
+
+    def group(self, items, key=lambda item: item):
+        """
+        Groups requests by the PLC they are addressed to.
+
+        Args:
+            items (list): The requests.
+            key (callable, optional): Gets the tag address of a request.
+
+        Returns:
+            dict: The list of (position, tag without the PLC name, request) keyed by PLC name.
+        """
+        groups = {}
+
+        for position, item in enumerate(items):
+            name, tag = split_plc_name(key(item))
+            groups.setdefault(name, []).append((position, tag, item))
+
+        return groups
+
+    def run(self, groups, request):
+        """
+        Makes a request to each PLC, at the same time when there is more than one.
+
+        Args:
+            groups (dict): The requests keyed by PLC name.
+            request (callable): Called with the session and requests of a PLC, returns a list of results.
+
+        Returns:
+            dict: The list of results keyed by PLC name.
+        """
+        sessions = {name: self.get(name) for name in groups}
+
+        if len(groups) == 1:
+            name = next(iter(groups))
+            return {name: request(sessions[name], groups[name])}
+
+        if self.workers < len(groups):
+            if self.executor is not None:
+                self.executor.shutdown(wait=False)
+            self.workers = len(groups)
+            self.executor = ThreadPoolExecutor(
+                max_workers=self.workers, thread_name_prefix='plc')
+
+        futures = {name: self.executor.submit(request, sessions[name], requests)
+                   for name, requests in groups.items()}
+
+        return {name: future.result() for name, future in futures.items()}
+
+    def gather(self, tags, groups, results):
+        """
+        Puts the results of each PLC back in the order the tags were given.
+
+        Args:
+            tags (list): The tag addresses as given.
+            groups (dict): The requests keyed by PLC name.
+            results (dict): The results keyed by PLC name.
+
+        Returns:
+            Tag or list: The result if one tag was given or a list of results.
+        """
+        ordered = [None] * len(tags)
+
+        for name, requests in groups.items():
+            plc_results = results[name]
+
+            if not isinstance(plc_results, list):
+                plc_results = [plc_results]
+
+            for (position, _, _), result in zip(requests, plc_results):
+                ordered[position] = Tag(tags[position], result.value, result.type, result.error)
+
+        return ordered[0] if len(ordered) == 1 else ordered
+
+    def read(self, *tags):
+        groups = self.group(tags)
+        results = self.run(groups, lambda session, requests: session.read(
+            *[tag for _, tag, _ in requests]))
+
+        return self.gather(tags, groups, results)
+
+    def write(self, *tags_values):
+        groups = self.group(tags_values, key=lambda item: item[0])
+        results = self.run(groups, lambda session, requests: session.write(
+            *[(tag, item[1]) for _, tag, item in requests]))
+
+        return self.gather([item[0] for item in tags_values], groups, results)
+
+
+class SessionTagTypes(Mapping):
+    """
+    The tag types of every PLC in a SessionManager, looked up by prefixed tag (Line2::Foo.Bar).
+
+    Tags without a PLC name are looked up in the index of the main PLC.
+    """
+
+    def __init__(self, manager):
+        self.manager = manager
+
+    def index(self, tag):
+        """
+        Gets the index and the tag path within it.
+
+        Args:
+            tag (str): The tag path, optionally prefixed with a PLC name.
+
+        Returns:
+            tuple: The TagIndex, None if there is no PLC with the name, and the tag path without the PLC name.
+        """
+        name, tag = split_plc_name(tag)
+
+        return self.manager.indexes.get(name), tag
+
+    @property
+    def root(self):
+        return self.manager.indexes[''].root
+
+    def find_node(self, tag):
+        index, tag = self.index(tag)
+
+        return None if index is None else index.find_node(tag)
+
+    def __getitem__(self, tag):
+        index, path = self.index(tag)
+
+        if index is None:
+            raise KeyError(tag)
+
+        return index[path]
+
+    def __contains__(self, tag):
+        if not isinstance(tag, str):
+            return False
+
+        index, tag = self.index(tag)
+
+        return index is not None and tag in index
+
+    def __len__(self):
+        return sum(len(index) for index in self.manager.indexes.values())
+
+    def __iter__(self):
+        for name, index in list(self.manager.indexes.items()):
+            prefix = f'{name}{PLC_SEPARATOR}' if name else ''
+            for tag in index:
+                yield prefix + tag
+
+    def children(self, tag=''):
+        index, tag = self.index(tag)
+
+        return [] if index is None else index.children(tag)
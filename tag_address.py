@@ -0,0 +1,196 @@
+import re
+from functools import lru_cache
+from typing import NamedTuple, Tuple
+
+# Maximum number of distinct tag strings kept by the parsers
+CACHE_SIZE = 4096
+
+# matches an element index ([3] or [1,2]) or an element count ({10})
+_INDEX_PATTERN = re.compile(r"\[(\d+(?:\s*,\s*\d+)*)\]|\{(\d+)\}")
+
+# commas that separate tags, not the ones inside a multi-dimensional index
+_LIST_SEPARATOR = re.compile(r",(?![^\[]*\])")
+
+# separates the name of a PLC from the tag (Line2::Program:Foo.Bar)
+PLC_SEPARATOR = '::'
+
+_TAG = r"(?:[A-Za-z_][A-Za-z\d_]*::)?(?:Program:)?[A-Za-z_][A-Za-z\d_]*(?:\[\d+\])?(?:\.\w+(?:\[\d+\])?)*(?:\{\d+\})?"
+TAG_LIST_PATTERN = re.compile(rf"^{_TAG}(?:,\s*{_TAG})*$")
+
+
+class TagAddress(NamedTuple):
+    """
+    A parsed tag address such as Program:Foo.Bar[3]{10}.
+
+    Attributes:
+    - tag (str): the address as entered, with surrounding whitespace removed
+    - base (str): the tag path with every index and element count removed (Program:Foo.Bar)
+    - name (str): the address without the element count (Program:Foo.Bar[3])
+    - array_name (str): the name with the index of the last member removed, other indexes are kept
+    - indices (tuple): the index of the last member, one value per dimension
+    - element_count (int): the number of elements to read or write, 1 if not given
+    - has_count (bool): whether an element count was given
+    """
+
+    tag: str
+    base: str
+    name: str
+    array_name: str
+    indices: Tuple[int, ...]
+    element_count: int
+    has_count: bool
+
+    @property
+    def start_index(self):
+        """
+        int: The first index of the last member or 0 if it has none.
+        """
+        return self.indices[0] if self.indices else 0
+
+    @property
+    def has_index(self):
+        """
+        bool: Whether the last member has an index.
+        """
+        return bool(self.indices)
+
+    def element(self, offset):
+        """
+        Gets the address of an element relative to the start index.
+
+        Args:
+            offset (int): The offset from the start index.
+
+        Returns:
+            str: The address of the element (Program:Foo.Bar[3 + offset]).
+        """
+        return f'{self.array_name}[{self.start_index + offset}]'
+
+    def linear_index(self, dimensions):
+        """
+        Gets the position of the start element when a multi-dimensional array is laid out flat.
+
+        Args:
+            dimensions (list): The dimensions of the array.
+
+        Returns:
+            int: The flat position of the start element.
+        """
+        position = 0
+
+        for i, index in enumerate(self.indices):
+            size = 1
+            for dimension in dimensions[i + 1:len(self.indices)]:
+                size *= dimension
+            position += index * size
+
+        return position
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def parse_tag_address(tag):
+    """
+    Parses a single tag address.
+
+    Results are cached so parsing the same tag again is a dictionary lookup.
+
+    Args:
+        tag (str): The tag address to parse.
+
+    Returns:
+        TagAddress: The parsed address.
+    """
+    tag = tag.strip()
+
+    base = []
+    name = []
+    indices = ()
+    index_end = None
+    element_count = 1
+    has_count = False
+    position = 0
+    last_member = tag.rfind('.') + 1
+
+    for match in _INDEX_PATTERN.finditer(tag):
+        base.append(tag[position:match.start()])
+        name.append(tag[position:match.start()])
+
+        if match.group(1) is not None:
+            name.append(match.group(0))
+
+            if match.start() >= last_member:
+                indices = tuple(int(i) for i in match.group(1).split(','))
+                index_end = len(''.join(name))
+        else:
+            element_count = int(match.group(2))
+            has_count = True
+
+        position = match.end()
+
+    base.append(tag[position:])
+    name.append(tag[position:])
+    name = ''.join(name)
+
+    if index_end is not None:
+        index_start = name.rfind('[', 0, index_end)
+        array_name = name[:index_start] + name[index_end:]
+    else:
+        array_name = name
+
+    return TagAddress(tag, ''.join(base), name, array_name, indices, element_count, has_count)
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def parse_tag_list(tags):
+    """
+    Parses a comma seperated list of tag addresses.
+
+    Args:
+        tags (str): The tag addresses to parse.
+
+    Returns:
+        tuple: The parsed TagAddress for each tag in the list.
+    """
+    return tuple(parse_tag_address(tag) for tag in _LIST_SEPARATOR.split(tags))
+
+
+def split_tag_list(tags):
+    """
+    Splits a comma seperated list of tag addresses.
+
+    Args:
+        tags (str): The tag addresses to split.
+
+    Returns:
+        list: The tag addresses with surrounding whitespace removed.
+    """
+    return [address.tag for address in parse_tag_list(tags)]
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def is_valid_format(tags):
+    """
+    Checks that a comma seperated list of tag addresses is formatted correctly.
+
+    Args:
+        tags (str): The tag addresses to check.
+
+    Returns:
+        bool: True if every address is formatted correctly, False otherwise.
+    """
+    return TAG_LIST_PATTERN.match(tags) is not None
+
+
+def split_plc_name(tag):
+    """
+    Splits the PLC name from a tag address.
+
+    Args:
+        tag (str): The tag address, optionally starting with a PLC name (Line2::Foo.Bar).
+
+    Returns:
+        tuple: The PLC name, '' if none was given, and the tag address without it.
+    """
+    plc_name, _, address = tag.strip().rpartition(PLC_SEPARATOR)
+
+    return plc_name, address
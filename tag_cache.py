@@ -0,0 +1,193 @@
+import os
+import re
+import pickle
+import operator
+from functools import reduce
+
+# Bump when the layout of the cached data changes so stale files are ignored
+CACHE_VERSION = 4
+
+CACHE_DIR = os.path.join(os.path.expanduser('~'), '.plc_tag_utility', 'tag_cache')
+
+
+def get_plc_identity(plc):
+    """
+    Builds the identity used to key the tag cache for a connected PLC.
+
+    Args:
+        plc (LogixDriver): An open LogixDriver instance.
+
+    Returns:
+        tuple: The (program name, serial number, revision) of the controller.
+    """
+    info = plc.info
+    revision = info.get('revision', {})
+
+    return (info.get('name') or plc.get_plc_name(),
+            info.get('serial', ''),
+            f"{revision.get('major', 0)}.{revision.get('minor', 0)}")
+
+
+def get_cache_file(identity, cache_dir=CACHE_DIR):
+    """
+    Gets the path of the cache file for a PLC identity.
+
+    Args:
+        identity (tuple): The identity returned by get_plc_identity.
+        cache_dir (str, optional): The directory the cache files are stored in.
+
+    Returns:
+        str: The path of the cache file.
+    """
+    file_name = re.sub(r'[^A-Za-z0-9_.-]', '_', '_'.join(identity))
+
+    return os.path.join(cache_dir, f'{file_name}.pkl')
+
+
+def load_tag_cache(identity, cache_dir=CACHE_DIR):
+    """
+    Loads the cached tag definitions for a PLC.
+
+    Args:
+        identity (tuple): The identity returned by get_plc_identity.
+        cache_dir (str, optional): The directory the cache files are stored in.
+
+    Returns:
+        dict or None: The cached 'tags_json' or None if there is no usable cache.
+    """
+    try:
+        with open(get_cache_file(identity, cache_dir), 'rb') as f:
+            cache = pickle.load(f)
+    except (OSError, EOFError, pickle.UnpicklingError, AttributeError, ImportError):
+        return None
+
+    if not isinstance(cache, dict):
+        return None
+
+    if cache.get('version') != CACHE_VERSION or cache.get('identity') != identity:
+        return None
+
+    return cache
+
+
+def save_tag_cache(identity, tags_json, cache_dir=CACHE_DIR):
+    """
+    Stores the tag definitions of a PLC to disk.
+
+    The file is written to a temporary name and then moved into place so a
+    crash part way through never leaves a truncated cache behind.
+
+    Args:
+        identity (tuple): The identity returned by get_plc_identity.
+        tags_json (dict): The tag definitions from LogixDriver.tags_json.
+        cache_dir (str, optional): The directory the cache files are stored in.
+
+    Returns:
+        None
+    """
+    cache_file = get_cache_file(identity, cache_dir)
+
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+
+        with open(f'{cache_file}.tmp', 'wb') as f:
+            pickle.dump({
+                'version': CACHE_VERSION,
+                'identity': identity,
+                'tags_json': tags_json,
+            }, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+        os.replace(f'{cache_file}.tmp', cache_file)
+    except OSError as e:
+        print(f"Error in save_tag_cache: {e}")
+
+
+def restore_driver_tags(tags_json):
+    """
+    Rebuilds the tag definitions LogixDriver needs to read and write from the JSON safe copy.
+
+    LogixDriver.tags_json drops the type classes used to encode and decode
+    values, so they are rebuilt here from the template information that is
+    kept. Each data type is only built once no matter how many tags use it.
+
+    Args:
+        tags_json (dict): The tag definitions from LogixDriver.tags_json.
+
+    Returns:
+        tuple: The tag definitions and data types to assign to LogixDriver._tags and LogixDriver._data_types.
+    """
+    from pycomm3.cip import DataTypes, Array
+
+    data_types = {}
+
+    for tag_info in tags_json.values():
+        if tag_info['tag_type'] == 'struct':
+            tag_info['data_type'] = restore_data_type(
+                tag_info['data_type'], data_types)
+            type_class = tag_info['data_type']['type_class']
+        else:
+            type_class = DataTypes.get(tag_info['data_type'])
+
+        if tag_info.get('dim'):
+            total_elements = reduce(
+                operator.mul, tag_info['dimensions'][:tag_info['dim']], 1)
+            type_class = Array(length_=total_elements, element_type_=type_class)
+
+        tag_info['type_class'] = type_class
+
+    return tags_json, data_types
+
+
+def restore_data_type(data_type, data_types):
+    """
+    Rebuilds the type class of a structure data type and its members.
+
+    Args:
+        data_type (dict): The JSON safe data type definition.
+        data_types (dict): The data types already rebuilt, keyed by name.
+
+    Returns:
+        dict: The data type definition with its type class restored.
+    """
+    from pycomm3.cip import DataTypes, Array
+    from pycomm3.custom_types import StructTag, FixedSizeString
+
+    if data_type['name'] in data_types:
+        return data_types[data_type['name']]
+
+    struct_members = []
+    bit_members = {}
+    private_members = set(data_type['internal_tags']) - set(data_type['attributes'])
+
+    for member, info in data_type['internal_tags'].items():
+        if info['tag_type'] == 'struct':
+            info['data_type'] = restore_data_type(info['data_type'], data_types)
+            type_class = info['data_type']['type_class']
+        else:
+            type_class = DataTypes.get(info['data_type'])
+
+        if info['data_type_name'] == 'BOOL' and 'bit' in info:
+            bit_members[member] = (info['offset'], info['bit'])
+        elif info.get('array'):
+            type_class = Array(length_=info['array'], element_type_=type_class)
+
+        info['type_class'] = type_class
+
+        if member not in bit_members:
+            struct_members.append((type_class(member), info['offset']))
+
+    if 'string' in data_type:
+        data_type['type_class'] = FixedSizeString(
+            data_type['template']['structure_size'] - 4)
+    else:
+        data_type['_struct_members'] = (struct_members, bit_members)
+        data_type['type_class'] = StructTag(
+            *struct_members,
+            bit_members=bit_members,
+            struct_size=data_type['template']['structure_size'],
+            private_members=private_members,
+        )
+
+    data_types[data_type['name']] = data_type
+
+    return data_type
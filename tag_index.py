@@ -0,0 +1,359 @@
+import sys
+from bisect import bisect_left
+from collections.abc import Mapping
+
+# shared records and dimension tuples, most UDT members repeat the same few combinations
+_tag_infos = {}
+_dimensions = {}
+
+
+class TagInfo:
+    """
+    The type information of a tag or structure member.
+
+    Records are shared between every tag with the same information so they must not be changed.
+
+    Attributes:
+    - data_type (str): the data type name
+    - dimensions (tuple): the array length of each of the 3 dimensions, 0 if unused
+    - structure (bool): whether the data type is a structure with members
+    """
+
+    __slots__ = ('data_type', 'dimensions', 'structure')
+
+    def __init__(self, data_type, dimensions, structure):
+        self.data_type = data_type
+        self.dimensions = dimensions
+        self.structure = structure
+
+    def __getstate__(self):
+        return (self.data_type, self.dimensions, self.structure)
+
+    def __setstate__(self, state):
+        self.data_type, self.dimensions, self.structure = state
+
+    def __eq__(self, other):
+        if not isinstance(other, TagInfo):
+            return NotImplemented
+        return self.__getstate__() == other.__getstate__()
+
+    def __hash__(self):
+        return hash(self.__getstate__())
+
+    def __repr__(self):
+        return f'TagInfo({self.data_type!r}, {self.dimensions!r}, {self.structure!r})'
+
+
+def tag_info(data_type, dimensions=(0, 0, 0), structure=False):
+    """
+    Gets the shared TagInfo record for a set of type information.
+
+    Args:
+        data_type (str): The data type name.
+        dimensions (list or tuple, optional): The array length of each dimension.
+        structure (bool, optional): Whether the data type is a structure with members.
+
+    Returns:
+        TagInfo: The shared record.
+    """
+    dimensions = tuple(dimensions)
+    dimensions = _dimensions.setdefault(dimensions, dimensions)
+    key = (data_type, dimensions, structure)
+
+    info = _tag_infos.get(key)
+
+    if info is None:
+        info = TagInfo(sys.intern(data_type), dimensions, structure)
+        _tag_infos[key] = info
+
+    return info
+
+
+def split_tag_path(tag):
+    """
+    Splits a tag path into its members.
+
+    Program scoped tags keep the program name with the tag (Program:Main.Tag.Member -> Program:Main.Tag, Member).
+
+    Args:
+        tag (str): The tag path with any [] and {} removed.
+
+    Returns:
+        list: The members of the path.
+    """
+    segments = tag.split('.')
+
+    if segments[0].startswith('Program:') and len(segments) > 1:
+        segments[0:2] = [f'{segments[0]}.{segments[1]}']
+
+    return segments
+
+
+class TagNode:
+    """
+    A node of the tag index, one per member of a tag path.
+
+    The members of a structure are only added the first time they are
+    asked for, from the data type definition kept on the node until then.
+
+    Attributes:
+    - name (str): the member name of this node
+    - parent (TagNode): the node this member belongs to, None for the root
+    - children (dict): the member nodes keyed by member name, None if there are no members
+    - info (TagInfo): the tag type information or None if the path is not a tag
+    - definition (dict): the internal tags of a structure that has not been expanded yet
+    """
+
+    __slots__ = ('name', 'parent', '_children', 'info', 'definition', '_sorted')
+
+    def __init__(self, name='', parent=None, info=None, definition=None):
+        self.name = name
+        self.parent = parent
+        self._children = None
+        self.info = info
+        self.definition = definition
+        self._sorted = None
+
+    @property
+    def children(self):
+        if self.definition is not None:
+            self.expand()
+
+        return self._children
+
+    def expand(self):
+        """
+        Adds the members of a structure from its data type definition.
+
+        Hidden members and the members of STRING types are skipped. Member
+        structures keep their own definition and are expanded when needed.
+
+        Returns:
+            None
+        """
+        definition = self.definition
+        self.definition = None
+
+        for child_name, child_info in definition.items():
+            if child_name.startswith('_') or child_name.startswith('ZZZZZZZZZZ'):
+                continue
+
+            child_data_type = child_info['data_type']
+            dimensions = (child_info.get('array', 0), 0, 0)
+
+            if child_info['tag_type'] == 'atomic':
+                self.add_child(child_name, tag_info(child_data_type, dimensions))
+            elif child_info['tag_type'] == 'struct':
+                is_string = child_data_type['name'] == 'STRING'
+                self.add_child(child_name, tag_info(child_data_type['name'], dimensions, not is_string),
+                               None if is_string else child_data_type['internal_tags'])
+
+    def add_child(self, name, info=None, definition=None):
+        """
+        Adds a member to the node or updates the member if it already exists.
+
+        Args:
+            name (str): The member name.
+            info (TagInfo, optional): The type information of the member.
+            definition (dict, optional): The internal tags if the member is a structure.
+
+        Returns:
+            TagNode: The node of the member.
+        """
+        if self._children is None:
+            self._children = {}
+
+        node = self._children.get(name)
+
+        if node is None:
+            name = sys.intern(name)
+            node = TagNode(name, self, info, definition)
+            self._children[name] = node
+            self._sorted = None
+        elif info is not None:
+            node.info = info
+            node.definition = definition
+
+        return node
+
+    def child_names(self):
+        """
+        Gets the names of the children in sorted order.
+
+        The list is built the first time it is asked for and kept until a child is added.
+
+        Returns:
+            list: The sorted child names.
+        """
+        children = self.children
+
+        if self._sorted is None:
+            self._sorted = sorted(children) if children else []
+
+        return self._sorted
+
+    def row(self):
+        """
+        Gets the position of this node among its sorted siblings.
+
+        Returns:
+            int: The row of the node or 0 for the root.
+        """
+        if self.parent is None:
+            return 0
+
+        return bisect_left(self.parent.child_names(), self.name)
+
+
+class TagIndex(Mapping):
+    """
+    A prefix tree of tag type information keyed by dotted tag path.
+
+    Lookups walk one node per member of the path and listing the members
+    of a structure only touches that structure's node, so completing and
+    checking tags does not depend on the total number of tags. Structure
+    members are added the first time a path below them is looked up, so
+    building the index only costs one node per top level tag. Member names
+    are interned so the many structures sharing a UDT share the same name
+    strings.
+
+    Iterating or taking the length of the index expands every structure.
+    """
+
+    def __init__(self, tag_types=None):
+        self.root = TagNode()
+
+        if tag_types is not None:
+            for tag, info in tag_types.items():
+                self[tag] = info
+
+    def find_node(self, tag):
+        """
+        Finds the node for a tag path, expanding the structures along it.
+
+        Args:
+            tag (str): The tag path with any [] and {} removed.
+
+        Returns:
+            TagNode or None: The node for the path or None if it does not exist.
+        """
+        node = self.root
+
+        if tag == '':
+            return node
+
+        for segment in split_tag_path(tag):
+            children = node.children
+            if children is None:
+                return None
+            node = children.get(segment)
+            if node is None:
+                return None
+
+        return node
+
+    def add(self, tag, info, definition=None):
+        """
+        Adds a tag to the index.
+
+        Args:
+            tag (str): The tag path.
+            info (TagInfo): The type information of the tag.
+            definition (dict, optional): The internal tags if the tag is a structure.
+
+        Returns:
+            TagNode: The node of the tag.
+        """
+        node = self.root
+        segments = split_tag_path(tag)
+
+        for segment in segments[:-1]:
+            children = node.children
+            child = children.get(segment) if children else None
+            node = child if child is not None else node.add_child(segment)
+
+        return node.add_child(segments[-1], info, definition)
+
+    def __setitem__(self, tag, info):
+        self.add(tag, info)
+
+    def __getitem__(self, tag):
+        node = self.find_node(tag)
+
+        if node is None or node.info is None:
+            raise KeyError(tag)
+
+        return node.info
+
+    def __contains__(self, tag):
+        if not isinstance(tag, str):
+            return False
+
+        node = self.find_node(tag)
+
+        return node is not None and node.info is not None
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def __iter__(self):
+        stack = [(self.root, '')]
+
+        while stack:
+            node, path = stack.pop()
+
+            if node.info is not None:
+                yield path
+
+            for name in reversed(node.child_names()):
+                stack.append((node.children[name], f'{path}.{name}' if path else name))
+
+    def children(self, tag=''):
+        """
+        Gets the member names directly below a tag path.
+
+        Args:
+            tag (str, optional): The tag path, the top level tags are returned when empty.
+
+        Returns:
+            list: The sorted member names.
+        """
+        node = self.find_node(tag)
+
+        if node is None:
+            return []
+
+        return node.child_names()
+
+
+def build_tag_index(tags_json):
+    """
+    Builds the tag index from the tag definitions uploaded from the PLC.
+
+    Only the top level tags are added, structure members are added from
+    the data type definitions when they are first looked up. Tags of the
+    same data type share one definition.
+
+    Args:
+        tags_json (dict): The tag definitions from LogixDriver.tags_json.
+
+    Returns:
+        TagIndex: The tag index.
+    """
+    index = TagIndex()
+    definitions = {}
+
+    for tag_name, definition in tags_json.items():
+        data_type = definition['data_type']
+        dimensions = definition.get('dimensions', (0, 0, 0))
+
+        if definition['tag_type'] == 'atomic':
+            index.add(tag_name, tag_info(data_type, dimensions))
+        elif definition['tag_type'] == 'struct':
+            if data_type['name'] == 'STRING':
+                index.add(tag_name, tag_info(data_type['name'], dimensions))
+            else:
+                internal_tags = definitions.setdefault(data_type['name'], data_type['internal_tags'])
+                index.add(tag_name, tag_info(data_type['name'], dimensions, True), internal_tags)
+
+    return index
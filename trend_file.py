@@ -0,0 +1,527 @@
+"""
+A compact binary file format for trend captures (.ptrend).
+
+The file starts with a header holding the tag names and column types,
+followed by chunks of samples. Each chunk stores the timestamps, the valid
+mask and one fixed-width column per tag, each section optionally compressed
+with zlib or lzma. Structure, string and array values are stored as JSON.
+An index of the chunks and their time ranges is added when the file is
+closed, so a reader can find a time window without reading the chunks
+before it. Files that were not closed, for example after a crash, are
+still readable, the chunk headers are scanned instead.
+
+When a trend is recorded by exception the header also holds the
+recording policy of each column, a missing value is then the last value
+recorded before it, except in the all missing rows that mark a gap.
+
+Layout (little endian):
+    'PTRD' version:u16 header_length:u32 header:json
+    'CHNK' rows:u32 first_time:f64 last_time:f64 sections:u16 section_length:u64 * sections payloads
+    ...
+    'PTRI' chunks:u32 (offset:u64 rows:u32 first_time:f64 last_time:f64) * chunks index_offset:u64 'PEND'
+"""
+import os
+import csv
+import json
+import lzma
+import mmap
+import time
+import zlib
+import struct
+from bisect import bisect_left, bisect_right
+
+import numpy as np
+
+from recording import StepHolder
+from trend_store import column_dtype, column_value
+
+FILE_MAGIC = b'PTRD'
+CHUNK_MAGIC = b'CHNK'
+INDEX_MAGIC = b'PTRI'
+END_MAGIC = b'PEND'
+VERSION = 1
+
+EXTENSION = '.ptrend'
+
+# samples per chunk, a chunk is the smallest part of the file that is read
+DEFAULT_CHUNK_ROWS = 4096
+
+COMPRESSORS = {
+    None: (lambda data: data, lambda data: data),
+    'zlib': (zlib.compress, zlib.decompress),
+    'lzma': (lzma.compress, lzma.decompress),
+}
+
+_FILE_HEADER = struct.Struct('<4sHI')
+_CHUNK_HEADER = struct.Struct('<4sIddH')
+_SECTION_LENGTH = struct.Struct('<Q')
+_INDEX_HEADER = struct.Struct('<4sI')
+_INDEX_ENTRY = struct.Struct('<QIdd')
+_FOOTER = struct.Struct('<Q4s')
+
+
+def encode_column(values, dtype):
+    """
+    Encodes the values of a column for a chunk.
+
+    Args:
+        values (numpy.ndarray): The values.
+        dtype (numpy.dtype): The column type.
+
+    Returns:
+        bytes: The encoded values.
+    """
+    if dtype == object:
+        return json.dumps(values.tolist(), default=str).encode('utf-8')
+
+    return np.ascontiguousarray(values, dtype=dtype.newbyteorder('<')).tobytes()
+
+
+class TrendFileWriter:
+    """
+    Appends trend samples to a binary trend file.
+
+    Has the same interface as TrendWriter. Samples are buffered into
+    chunks, and a chunk is written, flushed and synced to disk when it is
+    full or the flush interval has passed.
+
+    Attributes:
+    - file_name (str): the name of the first file
+    - columns (list): the name of each value column
+    - data_types (list): the PLC data type of each column, None if unknown
+    - compression (str): None, 'zlib' or 'lzma'
+    - recording (list): the recording policy of each column, None if every sample is recorded
+    - files (list): the files written so far
+    """
+
+    def __init__(self, file_name, columns, data_types=None, compression=None, chunk_rows=DEFAULT_CHUNK_ROWS,
+                 flush_interval=1.0, max_bytes=None, max_age=None, recording=None):
+        if compression not in COMPRESSORS:
+            raise ValueError(f'Unknown compression {compression}')
+
+        self.file_name = file_name
+        self.columns = list(columns)
+        self.data_types = list(data_types) if data_types is not None else [None] * len(self.columns)
+        self.compression = compression
+        self.recording = recording
+        self.chunk_rows = chunk_rows
+        self.flush_interval = flush_interval
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.dtypes = None
+        self.files = []
+        self.index = []
+        self.file = None
+        self.opened_at = None
+        self.flushed_at = time.monotonic()
+        self.timestamps = []
+        self.rows = []
+
+    def open_next(self):
+        """
+        Closes the current file and starts the next one.
+
+        Returns:
+            None
+        """
+        self.close_file()
+
+        if self.files:
+            stem, extension = os.path.splitext(self.file_name)
+            file_name = f'{stem}_{len(self.files):03d}{extension}'
+        else:
+            file_name = self.file_name
+
+        header = json.dumps({
+            'tags': self.columns,
+            'data_types': self.data_types,
+            'dtypes': ['object' if dtype == object else dtype.newbyteorder('<').str for dtype in self.dtypes],
+            'compression': self.compression,
+            'recording': self.recording,
+        }).encode('utf-8')
+
+        self.file = open(file_name, 'wb')
+        self.file.write(_FILE_HEADER.pack(FILE_MAGIC, VERSION, len(header)))
+        self.file.write(header)
+        self.files.append(file_name)
+        self.index = []
+        self.opened_at = time.monotonic()
+
+    def write(self, timestamp, values):
+        """
+        Adds a sample, writing a chunk when it is full or the flush interval has passed.
+
+        Args:
+            timestamp (float): The time of the sample in milliseconds.
+            values (list): The value of each column, None for a value that is missing.
+
+        Returns:
+            None
+
+        Raises:
+            ValueError: If a value cannot be stored in its column, nothing of the sample is kept.
+        """
+        if self.dtypes is None:
+            if all(value is None for value in values):
+                # a gap before the first sample, the column types are not known yet
+                return
+
+            self.dtypes = [column_dtype(data_type, value, column)
+                           for column, data_type, value in zip(self.columns, self.data_types, values)]
+            self.open_next()
+
+        # a value that does not fit its column is rejected here rather than failing every flush of its chunk
+        values = [column_value(dtype, value) for dtype, value in zip(self.dtypes, values)]
+
+        self.timestamps.append(timestamp)
+        self.rows.append(values)
+
+        if (len(self.rows) >= self.chunk_rows
+                or time.monotonic() - self.flushed_at >= self.flush_interval):
+            self.flush()
+
+            if ((self.max_bytes is not None and self.file.tell() >= self.max_bytes)
+                    or (self.max_age is not None and time.monotonic() - self.opened_at >= self.max_age)):
+                self.open_next()
+
+    def flush(self):
+        """
+        Writes the buffered samples as a chunk and syncs the file to disk.
+
+        Returns:
+            None
+        """
+        if self.file is None:
+            return
+
+        if self.rows:
+            compress = COMPRESSORS[self.compression][0]
+            valid = np.array([[value is not None for value in row] for row in self.rows], dtype=np.bool_)
+
+            sections = [
+                np.asarray(self.timestamps, dtype='<f8').tobytes(),
+                valid.astype(np.uint8).tobytes(),
+            ]
+
+            for i, dtype in enumerate(self.dtypes):
+                if dtype == object:
+                    column = np.empty(len(self.rows), dtype=object)
+                    column[:] = [row[i] for row in self.rows]
+                else:
+                    column = np.zeros(len(self.rows), dtype=dtype)
+                    for row, values in enumerate(self.rows):
+                        if values[i] is not None:
+                            column[row] = values[i]
+
+                sections.append(encode_column(column, dtype))
+
+            sections = [compress(section) for section in sections]
+
+            offset = self.file.tell()
+            self.file.write(_CHUNK_HEADER.pack(
+                CHUNK_MAGIC, len(self.rows), self.timestamps[0], self.timestamps[-1], len(sections)))
+            self.file.write(b''.join(_SECTION_LENGTH.pack(len(section)) for section in sections))
+
+            for section in sections:
+                self.file.write(section)
+
+            self.index.append((offset, len(self.rows), self.timestamps[0], self.timestamps[-1]))
+            self.timestamps = []
+            self.rows = []
+
+        self.file.flush()
+        os.fsync(self.file.fileno())
+        self.flushed_at = time.monotonic()
+
+    def close_file(self):
+        if self.file is None:
+            return
+
+        self.flush()
+
+        index_offset = self.file.tell()
+        self.file.write(_INDEX_HEADER.pack(INDEX_MAGIC, len(self.index)))
+        for entry in self.index:
+            self.file.write(_INDEX_ENTRY.pack(*entry))
+        self.file.write(_FOOTER.pack(index_offset, END_MAGIC))
+
+        self.file.close()
+        self.file = None
+
+    def close(self):
+        """
+        Writes any buffered samples and the chunk index and closes the file.
+
+        Returns:
+            None
+        """
+        self.close_file()
+
+
+class TrendFileReader:
+    """
+    Reads a binary trend file through a memory map.
+
+    Only the chunk headers are read when the file is opened. Chunks are
+    decoded when asked for, and uncompressed numeric columns are returned
+    as views of the memory map without copying. Supports the same chunks(),
+    rows() and tags used by TrendStore, so trend files can be plotted and
+    exported the same way as a running trend.
+
+    Attributes:
+    - file_name (str): the file being read
+    - tags (list): the tag of each column
+    - data_types (list): the PLC data type of each column
+    - dtypes (list): the NumPy type of each column
+    - recording (list): the recording policy of each column, None if every sample was recorded, missing values are then the last value recorded
+    - index (list): the (offset, rows, first time, last time) of each chunk
+    """
+
+    def __init__(self, file_name):
+        self.file_name = file_name
+        self.file = open(file_name, 'rb')
+
+        try:
+            self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self.file.close()
+            raise ValueError(f'{file_name} is empty')
+
+        magic, version, header_length = _FILE_HEADER.unpack_from(self.map, 0)
+
+        if magic != FILE_MAGIC or version > VERSION:
+            self.close()
+            raise ValueError(f'{file_name} is not a trend file')
+
+        self.data_start = _FILE_HEADER.size + header_length
+        header = json.loads(self.map[_FILE_HEADER.size:self.data_start].decode('utf-8'))
+
+        self.tags = header['tags']
+        self.data_types = header['data_types']
+        self.dtypes = [np.dtype(object) if dtype == 'object' else np.dtype(dtype) for dtype in header['dtypes']]
+        self.decompress = COMPRESSORS[header['compression']][1]
+        self.compressed = header['compression'] is not None
+        self.recording = header.get('recording')
+
+        self.index = self.read_index()
+        self.first_times = [entry[2] for entry in self.index]
+        self.last_times = [entry[3] for entry in self.index]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def __len__(self):
+        return sum(entry[1] for entry in self.index)
+
+    def read_index(self):
+        """
+        Reads the chunk index from the end of the file, or scans the chunk headers if the file was not closed.
+
+        Returns:
+            list: The (offset, rows, first time, last time) of each chunk.
+        """
+        size = len(self.map)
+
+        if size >= self.data_start + _FOOTER.size:
+            index_offset, magic = _FOOTER.unpack_from(self.map, size - _FOOTER.size)
+
+            if magic == END_MAGIC:
+                _, count = _INDEX_HEADER.unpack_from(self.map, index_offset)
+                position = index_offset + _INDEX_HEADER.size
+                return [_INDEX_ENTRY.unpack_from(self.map, position + i * _INDEX_ENTRY.size)
+                        for i in range(count)]
+
+        index = []
+        position = self.data_start
+        sections = len(self.tags) + 2
+
+        while position + _CHUNK_HEADER.size <= size:
+            magic, rows, first_time, last_time, count = _CHUNK_HEADER.unpack_from(self.map, position)
+
+            if magic != CHUNK_MAGIC or count != sections:
+                break
+
+            lengths_start = position + _CHUNK_HEADER.size
+            if lengths_start + count * _SECTION_LENGTH.size > size:
+                break
+
+            end = lengths_start + count * _SECTION_LENGTH.size + sum(
+                _SECTION_LENGTH.unpack_from(self.map, lengths_start + i * _SECTION_LENGTH.size)[0]
+                for i in range(count))
+
+            # a chunk cut short by a crash is left out
+            if end > size:
+                break
+
+            index.append((position, rows, first_time, last_time))
+            position = end
+
+        return index
+
+    def chunk(self, number):
+        """
+        Decodes a chunk.
+
+        Args:
+            number (int): The chunk number.
+
+        Returns:
+            tuple: The timestamps, valid mask and list of columns of the chunk.
+        """
+        offset, rows, _, _ = self.index[number]
+        _, _, _, _, count = _CHUNK_HEADER.unpack_from(self.map, offset)
+
+        position = offset + _CHUNK_HEADER.size
+        lengths = [_SECTION_LENGTH.unpack_from(self.map, position + i * _SECTION_LENGTH.size)[0]
+                   for i in range(count)]
+        position += count * _SECTION_LENGTH.size
+
+        sections = []
+        for length in lengths:
+            if self.compressed:
+                sections.append(self.decompress(self.map[position:position + length]))
+            else:
+                sections.append((position, length))
+            position += length
+
+        def array(section, dtype, count):
+            if self.compressed:
+                return np.frombuffer(section, dtype=dtype, count=count)
+            return np.frombuffer(self.map, dtype=dtype, count=count, offset=section[0])
+
+        def raw(section):
+            if self.compressed:
+                return section
+            return self.map[section[0]:section[0] + section[1]]
+
+        timestamps = array(sections[0], '<f8', rows)
+        valid = array(sections[1], np.bool_, rows * len(self.tags)).reshape(rows, len(self.tags))
+
+        columns = []
+        for section, dtype in zip(sections[2:], self.dtypes):
+            if dtype == object:
+                column = np.empty(rows, dtype=object)
+                column[:] = json.loads(raw(section).decode('utf-8'))
+                columns.append(column)
+            else:
+                columns.append(array(section, dtype, rows))
+
+        return timestamps, valid, columns
+
+    def chunks(self):
+        """
+        Iterates over every chunk.
+
+        Yields:
+            tuple: The timestamps, valid mask and list of columns of a chunk.
+        """
+        for number in range(len(self.index)):
+            yield self.chunk(number)
+
+    def time_range(self):
+        """
+        Gets the timestamps of the first and last samples.
+
+        Returns:
+            tuple: The first and last timestamps in milliseconds, None if there are no samples.
+        """
+        if not self.index:
+            return None
+
+        return self.first_times[0], self.last_times[-1]
+
+    def window(self, start, end):
+        """
+        Reads the samples between two times, only the chunks that overlap the window are decoded.
+
+        Args:
+            start (float): The first time in milliseconds.
+            end (float): The last time in milliseconds.
+
+        Returns:
+            tuple: The timestamps, valid mask and list of columns of the samples in the window.
+        """
+        first = bisect_left(self.last_times, start)
+        last = bisect_right(self.first_times, end)
+
+        blocks = []
+        for number in range(first, last):
+            timestamps, valid, columns = self.chunk(number)
+            low = np.searchsorted(timestamps, start, side='left')
+            high = np.searchsorted(timestamps, end, side='right')
+            blocks.append((timestamps[low:high], valid[low:high], [column[low:high] for column in columns]))
+
+        if not blocks:
+            return (np.empty(0), np.empty((0, len(self.tags)), dtype=np.bool_),
+                    [np.empty(0, dtype=dtype) for dtype in self.dtypes])
+
+        if len(blocks) == 1:
+            return blocks[0]
+
+        return (np.concatenate([block[0] for block in blocks]),
+                np.concatenate([block[1] for block in blocks]),
+                [np.concatenate(columns) for columns in zip(*(block[2] for block in blocks))])
+
+    def rows(self):
+        """
+        Iterates over every row as Python values.
+
+        Yields:
+            tuple: The timestamp and the list of values of a row, None where a value is missing.
+        """
+        for timestamps, valid, columns in self.chunks():
+            values = [column.tolist() for column in columns]
+
+            for row, (timestamp, row_valid) in enumerate(zip(timestamps.tolist(), valid.tolist())):
+                yield timestamp, [column[row] if is_valid else None
+                                  for column, is_valid in zip(values, row_valid)]
+
+    def close(self):
+        """
+        Closes the file.
+
+        Returns:
+            None
+        """
+        try:
+            self.map.close()
+        except BufferError:
+            # arrays returned from the reader still use the map, it is closed when they are released
+            pass
+
+        self.file.close()
+
+
+def export_csv(source, file_name):
+    """
+    Writes trend samples to a CSV file.
+
+    A trend recorded by exception is written with the values left out
+    filled in, so every row has the value each tag had at its time.
+
+    Args:
+        source (TrendFileReader or TrendStore): The trend samples.
+        file_name (str): The CSV file to write.
+
+    Returns:
+        None
+    """
+    with open(file_name, 'w', newline='') as f:
+        writer = csv.writer(f, lineterminator='\n')
+        writer.writerow(['Trend Duration'] + list(source.tags))
+
+        chunks = source.chunks()
+
+        if source.recording:
+            steps = StepHolder()
+            chunks = ((timestamps, *steps.fill(valid, columns)) for timestamps, valid, columns in chunks)
+
+        for timestamps, valid, columns in chunks:
+            values = [column.tolist() for column in columns]
+
+            for row, (timestamp, row_valid) in enumerate(zip(timestamps.tolist(), valid.tolist())):
+                writer.writerow([timestamp] + [column[row] if is_valid else None
+                                               for column, is_valid in zip(values, row_valid)])
@@ -0,0 +1,160 @@
+import math
+from functools import reduce
+
+from read_planner import ReadPlan
+from tag_address import split_tag_list
+
+# the shortest scheduler tick in milliseconds, the fastest trend rate
+MIN_TICK_MS = 100
+
+
+def parse_trend_groups(text):
+    """
+    Parses trend groups written as tags and a period in seconds, groups are separated by semicolons.
+
+    Example: "Status1, Status2 @ 5; Counts @ 60"
+
+    Args:
+        text (str): The trend groups.
+
+    Returns:
+        list: The (tags, period in seconds) of each group.
+
+    Raises:
+        ValueError: If a group has no tags or no valid period.
+    """
+    groups = []
+
+    for group in text.split(';'):
+        if not group.strip():
+            continue
+
+        tags, separator, period = group.rpartition('@')
+
+        if not separator or not tags.strip():
+            raise ValueError(f"Trend group '{group.strip()}' needs tags and a period, e.g. Tag1, Tag2 @ 5")
+
+        try:
+            period = float(period)
+        except ValueError:
+            raise ValueError(f"Trend group '{group.strip()}' has an invalid period") from None
+
+        if period <= 0:
+            raise ValueError(f"Trend group '{group.strip()}' needs a period above 0")
+
+        groups.append((tags.strip(), period))
+
+    return groups
+
+
+class TrendGroup:
+    """
+    Tags trended at the same period.
+
+    Attributes:
+    - tags (list): the tag addresses of the group
+    - period (float): the time between samples in seconds
+    - every (int): the number of scheduler ticks between samples
+    - columns (list): the trend column of each tag
+    - slot (int): the last sample slot read, -1 before the first
+    """
+
+    def __init__(self, tags, period, every, columns):
+        self.tags = tags
+        self.period = period
+        self.every = every
+        self.columns = columns
+        self.slot = -1
+
+
+class TrendGroups:
+    """
+    The trend groups of a trend session, run on one scheduler.
+
+    The scheduler ticks at the greatest common divisor of the group
+    periods and a group is due on every tick that starts a new slot of its
+    period. When ticks are skipped after an overrun a group whose slot was
+    passed is read on the next tick, once. The tags of every group due on
+    the same tick are read with one merged ReadPlan, the plans are built
+    once for each combination of groups and kept.
+
+    When the common divisor of the periods is shorter than MIN_TICK_MS,
+    for example 1 s and 0.333 s would tick every millisecond, every period
+    is rounded to a multiple of MIN_TICK_MS so the scheduler does not wake
+    far more often than any group is read.
+
+    Each tag is a column of the trend, a sample only has values for the
+    columns of the groups read at its timestamp.
+
+    Attributes:
+    - groups (list): the TrendGroup of each group
+    - tags (list): the tag addresses of every column
+    - period (float): the scheduler period in seconds
+    - tag_types (TagIndex): the tag type index the plans are built with
+    - plans (dict): the ReadPlan and columns of each combination of groups read together
+    - adjusted (list): the tags, period asked for and period used of each group whose period was rounded
+    """
+
+    def __init__(self, groups, tag_types=None):
+        self.tags = []
+        self.groups = []
+        self.tag_types = tag_types
+        self.plans = {}
+        self.adjusted = []
+
+        # periods in whole milliseconds so their common divisor can be found
+        periods = [max(1, round(period * 1000)) for _, period in groups]
+        base = reduce(math.gcd, periods)
+
+        if base < MIN_TICK_MS:
+            periods = [max(1, round(milliseconds / MIN_TICK_MS)) * MIN_TICK_MS for milliseconds in periods]
+            base = reduce(math.gcd, periods)
+
+        self.period = base / 1000
+
+        for (tags, period), milliseconds in zip(groups, periods):
+            tags = split_tag_list(tags) if isinstance(tags, str) else list(tags)
+            columns = list(range(len(self.tags), len(self.tags) + len(tags)))
+
+            if milliseconds != max(1, round(period * 1000)):
+                self.adjusted.append((tags, period, milliseconds / 1000))
+
+            self.tags.extend(tags)
+            self.groups.append(TrendGroup(tags, milliseconds / 1000, milliseconds // base, columns))
+
+    def due(self, tick):
+        """
+        Gets the groups to read on a scheduler tick and marks them read.
+
+        Args:
+            tick (int): The scheduler tick.
+
+        Returns:
+            tuple: The indexes of the groups due.
+        """
+        due = []
+
+        for i, group in enumerate(self.groups):
+            slot = tick // group.every
+
+            if slot > group.slot:
+                group.slot = slot
+                due.append(i)
+
+        return tuple(due)
+
+    def plan(self, due):
+        """
+        Gets the merged read plan of groups read together.
+
+        Args:
+            due (tuple): The indexes of the groups.
+
+        Returns:
+            tuple: The ReadPlan and the trend column of each tag it reads.
+        """
+        if due not in self.plans:
+            columns = [column for i in due for column in self.groups[i].columns]
+            self.plans[due] = (ReadPlan([self.tags[column] for column in columns], self.tag_types), columns)
+
+        return self.plans[due]
@@ -0,0 +1,414 @@
+import os
+import shutil
+import tempfile
+import threading
+from typing import NamedTuple, List
+
+import numpy as np
+
+from tag_address import parse_tag_address
+
+# number of samples kept in memory before the oldest half is spilled to disk
+DEFAULT_CAPACITY = 100000
+
+# NumPy types of the atomic data types, anything else is stored as Python objects
+ATOMIC_DTYPES = {
+    'BOOL': np.bool_,
+    'SINT': np.int8,
+    'INT': np.int16,
+    'DINT': np.int32,
+    'LINT': np.int64,
+    'USINT': np.uint8,
+    'UINT': np.uint16,
+    'UDINT': np.uint32,
+    'ULINT': np.uint64,
+    'REAL': np.float32,
+    'LREAL': np.float64,
+}
+
+
+def column_dtype(data_type, value, tag=None):
+    """
+    Picks the NumPy type of a column from the tag data type and its first value.
+
+    Args:
+        data_type (str): The data type of the tag, None if unknown.
+        value (any): The first value read.
+        tag (str, optional): The tag address, a range of elements is read as a list.
+
+    Returns:
+        numpy.dtype: The type of the column.
+    """
+    ranged = tag is not None and parse_tag_address(tag).has_count
+
+    # the data type decides first, a failed first read of an atomic tag is then a missing value
+    if data_type in ATOMIC_DTYPES and not ranged and not isinstance(value, (list, dict, str)):
+        return np.dtype(ATOMIC_DTYPES[data_type])
+
+    if isinstance(value, (list, dict, str)) or value is None:
+        return np.dtype(object)
+
+    if isinstance(value, bool):
+        return np.dtype(np.bool_)
+    elif isinstance(value, int):
+        return np.dtype(np.int64)
+    elif isinstance(value, float):
+        return np.dtype(np.float64)
+
+    return np.dtype(object)
+
+
+def column_value(dtype, value):
+    """
+    Converts a value to the type of its column.
+
+    Args:
+        dtype (numpy.dtype): The type of the column.
+        value (any): The value read, None if it is missing.
+
+    Returns:
+        any: The value to store.
+
+    Raises:
+        ValueError: If the value cannot be stored in the column.
+    """
+    if dtype == object or value is None:
+        return value
+
+    if isinstance(value, (list, dict, str)):
+        raise ValueError(f'{type(value).__name__} values cannot be stored in a column of {dtype}')
+
+    try:
+        return dtype.type(value)
+    except (TypeError, OverflowError) as e:
+        raise ValueError(f'{value} cannot be stored in a column of {dtype}: {e}') from None
+
+
+class TrendDelta(NamedTuple):
+    """
+    A block of new trend samples.
+
+    Attributes:
+    - start (int): the row number of the first sample in the block
+    - timestamps (numpy.ndarray): the timestamp of each sample in milliseconds
+    - valid (numpy.ndarray): a row per sample and a column per tag, False where the value is missing
+    - columns (list): the values of each tag
+    """
+
+    start: int
+    timestamps: np.ndarray
+    valid: np.ndarray
+    columns: List[np.ndarray]
+
+    def __len__(self):
+        return len(self.timestamps)
+
+
+class TrendStore:
+    """
+    Columnar storage for trend samples.
+
+    Each tag gets a preallocated NumPy column typed from its data type,
+    structures, strings and arrays are kept in object columns. Appending a
+    sample writes one row in place. When the columns are full the oldest
+    half is written to a spill file and the rest is copied into new
+    columns, so appending stays O(1) amortized and memory stays bounded.
+
+    A value that could not be read, or every value of a row marking a
+    lost connection, is flagged as missing in the valid mask.
+
+    Rows already written are never changed, so the views returned by
+    timestamps, valid and column() can be read from another thread while
+    samples are still being added.
+
+    Attributes:
+    - tags (list): the tag of each column
+    - capacity (int): the number of rows kept in memory
+    - spilled (int): the number of rows written to spill files
+    - spill_files (list): the spill files, oldest first
+    - spill_times (list): the first and last timestamp of each spill file
+    - recording (list): the recording policy of each column, None if every sample is recorded
+    """
+
+    def __init__(self, tags, data_types=None, capacity=DEFAULT_CAPACITY, spill_dir=None, recording=None):
+        self.tags = list(tags)
+        self.data_types = list(data_types) if data_types is not None else [None] * len(self.tags)
+        self.recording = recording
+        self.capacity = max(2, capacity)
+        self.spill_dir = spill_dir
+        self.own_spill_dir = spill_dir is None
+        self.spill_files = []
+        self.spill_times = []
+        self.spilled = 0
+        self.size = 0
+        self.lock = threading.Lock()
+
+        self._timestamps = np.empty(self.capacity, dtype=np.float64)
+        self._valid = np.empty((self.capacity, len(self.tags)), dtype=np.bool_)
+        self._columns = None
+
+    def __len__(self):
+        return self.spilled + self.size
+
+    @property
+    def timestamps(self):
+        """
+        numpy.ndarray: The timestamps of the rows in memory in milliseconds.
+        """
+        with self.lock:
+            return self._timestamps[:self.size]
+
+    @property
+    def valid(self):
+        """
+        numpy.ndarray: A row per sample in memory and a column per tag, False where the value is missing.
+        """
+        with self.lock:
+            return self._valid[:self.size]
+
+    def column(self, index):
+        """
+        Gets the values of a tag for the rows in memory.
+
+        Args:
+            index (int): The column index.
+
+        Returns:
+            tuple: Views of the values and of the valid flags, missing values are undefined.
+        """
+        with self.lock:
+            if self._columns is None:
+                return np.empty(0), np.empty(0, dtype=np.bool_)
+
+            return self._columns[index][:self.size], self._valid[:self.size, index]
+
+    def append(self, timestamp, values, read=None):
+        """
+        Adds a sample.
+
+        Args:
+            timestamp (float): The time of the sample in milliseconds.
+            values (list): The value of each tag.
+            read (list, optional): False for each tag that was not read in this sample, its value is marked missing.
+
+        Returns:
+            None
+
+        Raises:
+            ValueError: If a value cannot be stored in its column, nothing of the sample is kept.
+        """
+        with self.lock:
+            if self._columns is None:
+                self._columns = [np.empty(self.capacity, dtype=column_dtype(data_type, value, tag))
+                                 for tag, data_type, value in zip(self.tags, self.data_types, values)]
+
+            # every value is converted before the row is written, so a value that does not fit leaves no partial row
+            values = [column_value(column.dtype, value) for column, value in zip(self._columns, values)]
+
+            if self.size == self.capacity:
+                self.spill()
+
+            row = self.size
+            self._timestamps[row] = timestamp
+
+            for i, (column, value) in enumerate(zip(self._columns, values)):
+                missing = value is None and (column.dtype != object or read is not None and not read[i])
+                self._valid[row, i] = not missing
+
+                if not missing or column.dtype == object:
+                    column[row] = value
+
+            self.size += 1
+
+    def append_gap(self, timestamp):
+        """
+        Adds a row marking that no sample could be taken.
+
+        Args:
+            timestamp (float): The time of the gap in milliseconds.
+
+        Returns:
+            None
+        """
+        with self.lock:
+            if self._columns is None:
+                return
+
+            if self.size == self.capacity:
+                self.spill()
+
+            row = self.size
+            self._timestamps[row] = timestamp
+            self._valid[row] = False
+
+            for column in self._columns:
+                if column.dtype == object:
+                    column[row] = None
+
+            self.size += 1
+
+    def spill(self):
+        """
+        Writes the oldest half of the rows to a spill file and keeps the rest in new columns.
+
+        Returns:
+            None
+        """
+        half = self.size // 2
+
+        if self.spill_dir is None:
+            self.spill_dir = tempfile.mkdtemp(prefix='plc_trend_')
+
+        file_name = os.path.join(self.spill_dir, f'chunk_{len(self.spill_files):06d}.npz')
+        np.savez(file_name, timestamps=self._timestamps[:half], valid=self._valid[:half],
+                 **{f'column_{i}': column[:half] for i, column in enumerate(self._columns)})
+
+        self.spill_files.append(file_name)
+        self.spill_times.append((self._timestamps[0], self._timestamps[half - 1]))
+        self.spilled += half
+
+        # new arrays rather than shifting in place, views handed out earlier stay valid
+        remaining = self.size - half
+        self._timestamps = self.move(self._timestamps, half, remaining)
+        self._valid = self.move(self._valid, half, remaining)
+        self._columns = [self.move(column, half, remaining) for column in self._columns]
+        self.size = remaining
+
+    def move(self, array, start, count):
+        moved = np.empty((self.capacity,) + array.shape[1:], dtype=array.dtype)
+        moved[:count] = array[start:start + count]
+
+        return moved
+
+    def delta(self, start):
+        """
+        Copies the rows from a row number onwards that are still in memory.
+
+        Args:
+            start (int): The row number of the first row to copy.
+
+        Returns:
+            TrendDelta: The rows, starting at the oldest row in memory if earlier rows were spilled.
+        """
+        with self.lock:
+            start = max(start, self.spilled)
+            first = start - self.spilled
+            columns = [column[first:self.size].copy() for column in self._columns] if self._columns else []
+
+            return TrendDelta(start, self._timestamps[first:self.size].copy(),
+                              self._valid[first:self.size].copy(), columns)
+
+    def chunks(self):
+        """
+        Iterates over every row in blocks, the spilled rows are loaded from disk one file at a time.
+
+        Yields:
+            tuple: The timestamps, valid mask and list of columns of a block.
+        """
+        for file_name in list(self.spill_files):
+            with np.load(file_name, allow_pickle=True) as chunk:
+                yield (chunk['timestamps'], chunk['valid'],
+                       [chunk[f'column_{i}'] for i in range(len(self.tags))])
+
+        with self.lock:
+            size = self.size
+            timestamps = self._timestamps[:size]
+            valid = self._valid[:size]
+            columns = [column[:size] for column in self._columns] if self._columns else []
+
+        if size:
+            yield timestamps, valid, columns
+
+    def time_range(self):
+        """
+        Gets the timestamps of the first and last rows.
+
+        Returns:
+            tuple: The first and last timestamps in milliseconds, None if there are no rows.
+        """
+        with self.lock:
+            if self.size == 0:
+                return None
+
+            first = self.spill_times[0][0] if self.spill_times else self._timestamps[0]
+
+            return first, self._timestamps[self.size - 1]
+
+    def window(self, start, end):
+        """
+        Gets the rows between two times, only the spill files that overlap the window are loaded.
+
+        Args:
+            start (float): The first time in milliseconds.
+            end (float): The last time in milliseconds.
+
+        Returns:
+            tuple: The timestamps, valid mask and list of columns of the rows in the window.
+        """
+        blocks = []
+
+        for file_name, (first, last) in zip(list(self.spill_files), list(self.spill_times)):
+            if last < start or first > end:
+                continue
+
+            with np.load(file_name, allow_pickle=True) as chunk:
+                blocks.append((chunk['timestamps'], chunk['valid'],
+                               [chunk[f'column_{i}'] for i in range(len(self.tags))]))
+
+        with self.lock:
+            if self._columns is not None:
+                blocks.append((self._timestamps[:self.size], self._valid[:self.size],
+                               [column[:self.size] for column in self._columns]))
+
+        selected = []
+
+        for timestamps, valid, columns in blocks:
+            low = np.searchsorted(timestamps, start, side='left')
+            high = np.searchsorted(timestamps, end, side='right')
+
+            if high > low:
+                selected.append((timestamps[low:high], valid[low:high], [column[low:high] for column in columns]))
+
+        if not selected:
+            return np.empty(0), np.empty((0, len(self.tags)), dtype=np.bool_), [np.empty(0) for _ in self.tags]
+
+        if len(selected) == 1:
+            return selected[0]
+
+        return (np.concatenate([block[0] for block in selected]),
+                np.concatenate([block[1] for block in selected]),
+                [np.concatenate(columns) for columns in zip(*(block[2] for block in selected))])
+
+    def rows(self):
+        """
+        Iterates over every row as Python values.
+
+        Yields:
+            tuple: The timestamp and the list of values of a row, the values are None for a gap.
+        """
+        for timestamps, valid, columns in self.chunks():
+            values = [column.tolist() for column in columns]
+
+            for row, (timestamp, row_valid) in enumerate(zip(timestamps.tolist(), valid.tolist())):
+                yield timestamp, [column[row] if is_valid else None
+                                  for column, is_valid in zip(values, row_valid)]
+
+    def close(self):
+        """
+        Removes the spill files.
+
+        Returns:
+            None
+        """
+        for file_name in self.spill_files:
+            try:
+                os.remove(file_name)
+            except OSError:
+                pass
+
+        if self.own_spill_dir and self.spill_dir is not None:
+            shutil.rmtree(self.spill_dir, ignore_errors=True)
+            self.spill_dir = None
+
+        self.spill_files = []
+        self.spill_times = []
@@ -0,0 +1,136 @@
+import os
+import csv
+import time
+
+import yaml_io
+
+# write the buffered samples at least this often, in seconds
+DEFAULT_FLUSH_INTERVAL = 1.0
+
+# write the buffered samples once this many are waiting
+DEFAULT_BATCH_SIZE = 500
+
+# start a new file once the current one reaches this many bytes, None to never rotate by size
+DEFAULT_MAX_BYTES = 100 * 1024 * 1024
+
+
+class TrendWriter:
+    """
+    Appends trend samples to a YAML or CSV file while the trend is running.
+
+    Samples are buffered and written in batches, and every write is flushed
+    and synced to disk, so a crash loses at most the samples of the last
+    flush interval and memory does not grow with the length of the trend.
+    The YAML file is written as a list that each batch adds items to, so
+    the file is valid at every flush.
+
+    Files are rotated when they reach max_bytes or are older than
+    max_age seconds. The first file uses the given name and the following
+    ones get a number added (trend.csv, trend_001.csv, trend_002.csv...).
+
+    Attributes:
+    - file_name (str): the name of the first file
+    - columns (list): the name of each value column
+    - file_format (int): 0 for YAML, 1 for CSV
+    - files (list): the files written so far
+    """
+
+    def __init__(self, file_name, columns, file_format=0, batch_size=DEFAULT_BATCH_SIZE,
+                 flush_interval=DEFAULT_FLUSH_INTERVAL, max_bytes=DEFAULT_MAX_BYTES, max_age=None):
+        self.file_name = file_name
+        self.columns = list(columns)
+        self.file_format = file_format
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.files = []
+        self.buffer = []
+        self.file = None
+        self.writer = None
+        self.opened_at = None
+        self.flushed_at = time.monotonic()
+
+        self.open_next()
+
+    def open_next(self):
+        """
+        Closes the current file and starts the next one.
+
+        Returns:
+            None
+        """
+        if self.file is not None:
+            self.file.close()
+
+        if self.files:
+            stem, extension = os.path.splitext(self.file_name)
+            file_name = f'{stem}_{len(self.files):03d}{extension}'
+        else:
+            file_name = self.file_name
+
+        self.file = open(file_name, 'w', newline='')
+        self.files.append(file_name)
+        self.opened_at = time.monotonic()
+
+        if self.file_format == 1:
+            self.writer = csv.writer(self.file, lineterminator='\n')
+            self.writer.writerow(['Trend Duration'] + self.columns)
+
+    def write(self, timestamp, values):
+        """
+        Adds a sample, writing the buffered samples when the batch is full or the flush interval has passed.
+
+        Args:
+            timestamp (float): The time of the sample in milliseconds.
+            values (list): The value of each column, None for a value that is missing.
+
+        Returns:
+            None
+        """
+        self.buffer.append((timestamp, values))
+
+        if (len(self.buffer) >= self.batch_size
+                or time.monotonic() - self.flushed_at >= self.flush_interval):
+            self.flush()
+
+            if ((self.max_bytes is not None and self.file.tell() >= self.max_bytes)
+                    or (self.max_age is not None and time.monotonic() - self.opened_at >= self.max_age)):
+                self.open_next()
+
+    def rows(self):
+        for timestamp, values in self.buffer:
+            row = {'Trend Duration': timestamp}
+            row.update(zip(self.columns, values))
+            yield row
+
+    def flush(self):
+        """
+        Writes the buffered samples and syncs the file to disk.
+
+        Returns:
+            None
+        """
+        if self.buffer:
+            if self.file_format == 0:
+                yaml_io.dump_items(self.rows(), self.file, len(self.buffer))
+            else:
+                self.writer.writerows([timestamp] + list(values) for timestamp, values in self.buffer)
+
+            self.buffer = []
+
+        self.file.flush()
+        os.fsync(self.file.fileno())
+        self.flushed_at = time.monotonic()
+
+    def close(self):
+        """
+        Writes any buffered samples and closes the file.
+
+        Returns:
+            None
+        """
+        if self.file is not None:
+            self.flush()
+            self.file.close()
+            self.file = None
@@ -0,0 +1,225 @@
+from pycomm3 import Tag
+
+from read_planner import split_member
+from tag_address import parse_tag_address
+
+
+class WritePlan:
+    """
+    The requests needed to write a list of tag values with as few services as possible.
+
+    Values written to consecutive elements of the same array are merged
+    into one ranged write (Arr[0], Arr[1]... Arr[999] becomes
+    Arr[0]{1000}), and values written to every member of a structure are
+    merged into one write of the structure, unless it has BOOL members.
+    BOOL arrays are not merged. Arrays that get more than one
+    value for the same element are written as given so the order of the
+    writes is kept.
+
+    The result of each request is handed back out to the tags as they were
+    given. When a merged request fails its tags are written one by one, so
+    the error of each tag is reported, not the error of the whole request.
+
+    Attributes:
+    - tags (list): the tag addresses as given
+    - values (list): the value of each tag
+    - requests (list): the (tag address, value) pairs sent to the PLC
+    - sources (list): for each request, the indexes of the tags it writes
+    - member_types (dict): the data type of each tag written through its structure, keyed by tag index
+    """
+
+    def __init__(self, tags_values, tag_types=None):
+        self.tags = [parse_tag_address(tag).tag for tag, _ in tags_values]
+        self.values = [value for _, value in tags_values]
+        self.requests = []
+        self.sources = []
+        self.member_types = {}
+
+        planned = []
+        self.plan_structures(tag_types, planned)
+        self.plan_ranges(tag_types, planned)
+
+        # send the requests in the order their first tag was given
+        for address, value, indexes in sorted(planned, key=lambda request: request[2][0]):
+            self.requests.append((address, value))
+            self.sources.append(indexes)
+
+    def plan_structures(self, tag_types, planned):
+        """
+        Merges values written to every member of a structure into a write of the structure.
+
+        Args:
+            tag_types (TagIndex): The tag type index, structures are not merged without it.
+            planned (list): The planned requests, each an (address, value, tag indexes) tuple.
+
+        Returns:
+            None
+        """
+        if tag_types is None:
+            return
+
+        members = {}
+
+        for i, tag in enumerate(self.tags):
+            address = parse_tag_address(tag)
+
+            if address.has_count or address.has_index:
+                continue
+
+            parent, member = split_member(address)
+
+            if parent is not None:
+                members.setdefault(parent, {}).setdefault(member, []).append(i)
+
+        for parent, requested in members.items():
+            parent_base = parse_tag_address(parent).base
+
+            if parent_base not in tag_types or not tag_types[parent_base].structure:
+                continue
+
+            # every member needs a value, and only one, for the structure to be written at once
+            if any(len(indexes) > 1 for indexes in requested.values()):
+                continue
+
+            if set(requested) != set(tag_types.children(parent_base)):
+                continue
+
+            # BOOL members are bits of hidden members that have no value here, so the structure cannot be encoded
+            if any(tag_types[f'{parent_base}.{member}'].data_type == 'BOOL' for member in requested):
+                continue
+
+            for member, indexes in requested.items():
+                self.member_types[indexes[0]] = tag_types[f'{parent_base}.{member}'].data_type
+
+            indexes = sorted(indexes[0] for indexes in requested.values())
+            value = {member: self.values[indexes[0]] for member, indexes in requested.items()}
+            planned.append((parent, value, indexes))
+
+    def plan_ranges(self, tag_types, planned):
+        """
+        Merges values written to consecutive elements of an array into ranged writes.
+
+        Args:
+            tag_types (TagIndex): The tag type index, arrays of structures are not merged.
+            planned (list): The planned requests, each an (address, value, tag indexes) tuple.
+
+        Returns:
+            None
+        """
+        done = {i for _, _, indexes in planned for i in indexes}
+        arrays = {}
+
+        for i, tag in enumerate(self.tags):
+            if i in done:
+                continue
+
+            address = parse_tag_address(tag)
+            value = self.values[i]
+
+            if len(address.indices) != 1 or isinstance(value, dict):
+                planned.append((tag, value, [i]))
+                continue
+
+            if address.has_count:
+                if not isinstance(value, (list, tuple)) or len(value) != address.element_count:
+                    planned.append((tag, value, [i]))
+                    continue
+                elements = list(value)
+            else:
+                elements = [value]
+
+            arrays.setdefault(address.array_name, []).append((address.start_index, elements, i))
+
+        for array_name, entries in arrays.items():
+            base = parse_tag_address(array_name).base
+            known = tag_types is not None and base in tag_types
+            structure = known and tag_types[base].structure
+
+            # BOOL arrays can only be written a whole DWORD at a time, so their elements are not merged
+            boolean = known and tag_types[base].data_type == 'BOOL'
+
+            entries.sort(key=lambda entry: entry[0])
+            overlapping = any(entries[j][0] < entries[j - 1][0] + len(entries[j - 1][1])
+                              for j in range(1, len(entries)))
+
+            if structure or boolean or overlapping:
+                for _, _, i in entries:
+                    planned.append((self.tags[i], self.values[i], [i]))
+                continue
+
+            runs = []
+            for start, elements, i in entries:
+                if runs and start == runs[-1][0] + len(runs[-1][1]):
+                    runs[-1][1].extend(elements)
+                    runs[-1][2].append(i)
+                else:
+                    runs.append([start, list(elements), [i]])
+
+            for start, elements, indexes in runs:
+                if len(indexes) == 1:
+                    i = indexes[0]
+                    planned.append((self.tags[i], self.values[i], [i]))
+                else:
+                    planned.append((f'{array_name}[{start}]{{{len(elements)}}}', elements, sorted(indexes)))
+
+    def write(self, plc):
+        """
+        Writes the values of the plan.
+
+        Args:
+            plc (LogixDriver): The driver or PLC session to write with.
+
+        Returns:
+            list: A pycomm3 Tag for each tag in the order they were given.
+        """
+        results = plc.write(*self.requests)
+
+        if not isinstance(results, list):
+            results = [results]
+
+        tags = self.fan_out(results)
+
+        # write the tags of failed merged requests one by one to find which of them failed
+        retry = [i for request, indexes in zip(results, self.sources)
+                 if request.error and len(indexes) > 1 for i in indexes]
+
+        if retry:
+            retried = plc.write(*[(self.tags[i], self.values[i]) for i in retry])
+
+            if not isinstance(retried, list):
+                retried = [retried]
+
+            for i, result in zip(retry, retried):
+                tags[i] = Tag(self.tags[i], self.values[i], result.type, result.error)
+
+        return tags
+
+    def fan_out(self, results):
+        """
+        Gives the result of each request to the tags it wrote.
+
+        Args:
+            results (list): The pycomm3 Tag for each request.
+
+        Returns:
+            list: A pycomm3 Tag for each tag in the order they were given.
+        """
+        tags = [None] * len(self.tags)
+
+        for result, indexes in zip(results, self.sources):
+            for i in indexes:
+                data_type = result.type
+
+                if i in self.member_types:
+                    data_type = self.member_types[i]
+                elif len(indexes) > 1 and data_type:
+                    # the element type, with the count of the tag if it wrote more than one element
+                    data_type = data_type.split('[')[0]
+                    address = parse_tag_address(self.tags[i])
+
+                    if address.has_count:
+                        data_type = f'{data_type}[{address.element_count}]'
+
+                tags[i] = Tag(self.tags[i], self.values[i], data_type, result.error)
+
+        return tags
@@ -0,0 +1,152 @@
+"""
+YAML reading and writing for every file the utility saves or loads.
+
+Uses the libyaml C loader and dumper when PyYAML was built with them,
+which are many times faster, and falls back to the pure Python safe
+loader and dumper otherwise. Both produce the same safe YAML.
+"""
+from itertools import islice
+
+import yaml
+from yaml.composer import Composer
+from yaml.constructor import SafeConstructor
+from yaml.resolver import Resolver
+
+# True when the libyaml C loader and dumper are used
+LIBYAML = hasattr(yaml, 'CSafeLoader') and hasattr(yaml, 'CSafeDumper')
+
+Loader = yaml.CSafeLoader if LIBYAML else yaml.SafeLoader
+Dumper = yaml.CSafeDumper if LIBYAML else yaml.SafeDumper
+
+# number of list items written per call when streaming
+DEFAULT_BATCH_SIZE = 1000
+
+
+class ItemDumper(Dumper):
+    """
+    A dumper that writes repeated objects out in full instead of as aliases.
+
+    Anchor names restart with every call, so aliases cannot be used when
+    several calls add to the same list.
+    """
+
+    def ignore_aliases(self, data):
+        return True
+
+
+if LIBYAML:
+    from yaml.cyaml import CParser
+
+    class ItemLoader(CParser, Composer, SafeConstructor, Resolver):
+        """
+        A safe loader that parses with libyaml but can compose one node at a time.
+        """
+
+        def __init__(self, stream):
+            CParser.__init__(self, stream)
+            Composer.__init__(self)
+            SafeConstructor.__init__(self)
+            Resolver.__init__(self)
+else:
+    ItemLoader = yaml.SafeLoader
+
+
+def load(stream):
+    """
+    Loads a YAML document.
+
+    Args:
+        stream (str or file): The YAML text or an open file.
+
+    Returns:
+        any: The loaded data.
+    """
+    return yaml.load(stream, Loader=Loader)
+
+
+def dump(data, stream=None):
+    """
+    Writes data as block style YAML.
+
+    Args:
+        data (any): The data to write.
+        stream (file, optional): The open file to write to.
+
+    Returns:
+        str or None: The YAML text if no stream was given, None otherwise.
+    """
+    return yaml.dump(data, stream, Dumper=Dumper, default_flow_style=False)
+
+
+def dump_items(items, stream, batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Writes items as a YAML list without holding them all in memory.
+
+    The items are written in batches that each add to the same list, so
+    items can come from a generator.
+
+    Args:
+        items (iterable): The list items.
+        stream (file): The open file to write to.
+        batch_size (int, optional): The number of items written per batch.
+
+    Returns:
+        int: The number of items written.
+    """
+    items = iter(items)
+    count = 0
+
+    while True:
+        batch = list(islice(items, batch_size))
+
+        if not batch:
+            break
+
+        yaml.dump(batch, stream, Dumper=ItemDumper, default_flow_style=False)
+        count += len(batch)
+
+    if count == 0:
+        stream.write('[]\n')
+
+    return count
+
+
+def iter_items(stream):
+    """
+    Reads the items of a YAML list one at a time.
+
+    Only one item is held in memory at a time, so large files such as
+    trend results can be processed without loading them whole. A document
+    that is not a list is returned as a single item, and an empty document
+    returns no items.
+
+    Args:
+        stream (str or file): The YAML text or an open file.
+
+    Yields:
+        any: Each item of the list.
+    """
+    loader = ItemLoader(stream)
+
+    try:
+        loader.get_event()
+
+        if loader.check_event(yaml.StreamEndEvent):
+            return
+
+        loader.get_event()
+
+        if not loader.check_event(yaml.SequenceStartEvent):
+            node = loader.compose_node(None, None)
+
+            if node.tag != 'tag:yaml.org,2002:null':
+                yield loader.construct_document(node)
+            return
+
+        loader.get_event()
+
+        while not loader.check_event(yaml.SequenceEndEvent):
+            node = loader.compose_node(None, None)
+            yield loader.construct_document(node)
+    finally:
+        loader.dispose()